@@ -0,0 +1,47 @@
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from central_pension_avalokan_engine.batch_corpus_calculation import PensionCompareParamsBatch
+
+
+# Named cohort sizes accepted by the benchmark runner
+COHORT_SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+# ------------------------------------------
+# Synthetic Cohorts
+# ------------------------------------------
+def generate_cohort_columns(size: int, seed: int = 0) -> dict:
+    """
+    Plausible, reproducible profile columns: the same `size` and `seed`
+    always give the same cohort. Fields not generated keep their defaults.
+    """
+    rng = np.random.default_rng(seed)
+    years_to_retire = rng.integers(1, 41, size)
+    return {
+        "current_service": rng.integers(0, 41 - years_to_retire),
+        "years_to_retire": years_to_retire,
+        "current_basic_pay": np.round(rng.uniform(18_000, 250_000, size), 2),
+        "current_da_rate": np.round(rng.uniform(0.3, 0.6, size), 4),
+        "current_total_nps_corpus": np.round(rng.uniform(0, 5_000_000, size), 2),
+        "withdrawal_percentage": np.round(rng.uniform(0, 0.6, size), 4),
+        "current_annual_expense": np.round(rng.uniform(100_000, 1_500_000, size), 2),
+    }
+
+
+def generate_cohort(size: int, seed: int = 0) -> PensionCompareParamsBatch:
+    return PensionCompareParamsBatch.from_columns(**generate_cohort_columns(size, seed))
+
+
+def write_cohort_csv(path: Path, size: int, seed: int = 0) -> Path:
+    """Write a synthetic cohort as a batch-mode input CSV with employee ids."""
+    columns = generate_cohort_columns(size, seed)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["employee_id"] + list(columns))
+        writer.writerows(
+            zip((f"E{i:07d}" for i in range(size)), *(column.tolist() for column in columns.values()))
+        )
+    return path
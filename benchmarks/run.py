@@ -0,0 +1,228 @@
+"""
+Benchmarks for the simulation hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.2
+
+Each benchmark reports the best and median seconds per call over several
+repeats; startup_import_cli minus startup_interpreter is the import time
+of the CLI. With --baseline, benchmarks slower than the baseline by more
+than the threshold are listed and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from central_pension_avalokan_engine.pension_compare_params import PensionCompareParams
+from central_pension_avalokan_engine.core import get_corpus_info
+from central_pension_avalokan_engine.corpus_info import update_pension_info
+from central_pension_avalokan_engine.corpus_growth_calculation import (
+    ENGINE_VERSION,
+    calculate_accumulated_corpus,
+    get_yearly_accumulated_corpus,
+)
+from central_pension_avalokan_engine.batch_corpus_calculation import get_corpus_info_batch
+
+from .cohorts import COHORT_SIZES, generate_cohort, write_cohort_csv
+
+
+HORIZONS = (1, 10, 20, 30, 40)
+DEFAULT_SIZES = ("1k", "100k")
+DEFAULT_THRESHOLD = 0.25
+
+BASE_PARAMS = PensionCompareParams(
+    current_service=10,
+    years_to_retire=20,
+    current_basic_pay=56100,
+    current_da_rate=0.5,
+    current_total_nps_corpus=1_500_000,
+    withdrawal_percentage=0.6,
+    current_annual_expense=600_000,
+)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[[], object]
+    repeat: int = 5
+
+
+# ------------------------------------------
+# Benchmark Definitions
+# ------------------------------------------
+def _run(command: List[str]) -> Callable[[], object]:
+    return lambda: subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _cli(*args: str) -> Callable[[], object]:
+    return _run([sys.executable, "-m", "central_pension_avalokan_engine", *args])
+
+
+def _python(code: str) -> Callable[[], object]:
+    """Fresh interpreter running `code`; compare against startup_interpreter."""
+    return _run([sys.executable, "-c", code])
+
+
+def collect_benchmarks(sizes: List[str], workdir: Path) -> List[Benchmark]:
+    params = BASE_PARAMS
+    history = get_corpus_info(replace(params, years_to_retire=40))
+    first_year = get_corpus_info(replace(params, years_to_retire=1)).last()
+    csv_path = workdir / "history.csv"
+
+    benchmarks = [
+        Benchmark("get_yearly_accumulated_corpus", lambda: get_yearly_accumulated_corpus(1e6, 0.1, 20000)),
+        Benchmark("calculate_accumulated_corpus", lambda: calculate_accumulated_corpus(2, params, first_year)),
+        Benchmark("update_pension_info", lambda: update_pension_info(history.last(), params)),
+        Benchmark("as_list_of_dict[40y]", history.as_list_of_dict),
+        Benchmark("save_to_csv[40y]", lambda: history.save_to_csv(csv_path)),
+    ]
+    for years in HORIZONS:
+        horizon_params = replace(params, years_to_retire=years)
+        benchmarks += [
+            Benchmark(f"get_corpus_info[{years}y]", lambda p=horizon_params: get_corpus_info(p)),
+            Benchmark(
+                f"get_corpus_info_final_only[{years}y]",
+                lambda p=horizon_params: get_corpus_info(p, final_only=True),
+            ),
+        ]
+
+    direct_args = [
+        "direct",
+        *(str(getattr(params, name)) for name in (
+            "current_service",
+            "years_to_retire",
+            "current_basic_pay",
+            "current_da_rate",
+            "current_total_nps_corpus",
+            "withdrawal_percentage",
+            "current_annual_expense",
+        )),
+    ]
+    benchmarks += [
+        Benchmark("startup_interpreter", _python("pass"), repeat=10),
+        Benchmark("startup_import_cli", _python("import central_pension_avalokan_engine.cli"), repeat=10),
+        Benchmark("cli_direct", _cli(*direct_args), repeat=3),
+        Benchmark("cli_direct_save_csv", _cli(*direct_args, "--save-csv", str(csv_path)), repeat=3),
+    ]
+
+    for size_name in sizes:
+        size = COHORT_SIZES[size_name]
+        repeat = 1 if size >= 1_000_000 else 3
+        cohort = generate_cohort(size)
+        cohort_csv = write_cohort_csv(workdir / f"cohort_{size_name}.csv", size)
+        benchmarks += [
+            Benchmark(f"get_corpus_info_batch[{size_name}]", lambda c=cohort: get_corpus_info_batch(c), repeat),
+            Benchmark(
+                f"cli_batch[{size_name}]",
+                _cli("batch", str(cohort_csv), "--output", str(workdir / "summary.csv")),
+                repeat,
+            ),
+        ]
+    return benchmarks
+
+
+# ------------------------------------------
+# Measurement & Comparison
+# ------------------------------------------
+def measure(benchmark: Benchmark) -> Dict[str, float]:
+    """Seconds per call, with the loop count picked by timeit's autorange."""
+    timer = timeit.Timer(benchmark.func)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(benchmark.repeat, number)]
+    return {
+        "best": min(times),
+        "median": statistics.median(times),
+        "number": number,
+        "repeat": benchmark.repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Names of benchmarks whose best time regressed beyond `threshold`."""
+    regressions = []
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = result["best"] / previous["best"]
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:<40} {previous['best']:>12.3e} {result['best']:>12.3e} {ratio:>7.2f}x {marker}")
+        if marker:
+            regressions.append(name)
+    return regressions
+
+
+def _sizes(spec: str) -> List[str]:
+    sizes = [size.strip().lower() for size in spec.split(",") if size.strip()]
+    unknown = set(sizes) - set(COHORT_SIZES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown cohort size(s): {', '.join(sorted(unknown))}")
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pension simulation hot paths")
+    parser.add_argument(
+        "--sizes",
+        type=_sizes,
+        default=list(DEFAULT_SIZES),
+        help=f"Cohort sizes among {', '.join(COHORT_SIZES)} (default: {','.join(DEFAULT_SIZES)})",
+    )
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed slowdown versus the baseline (default: {DEFAULT_THRESHOLD})",
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "engine_version": ENGINE_VERSION,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for benchmark in collect_benchmarks(args.sizes, Path(workdir)):
+            if args.filter not in benchmark.name:
+                continue
+            result = measure(benchmark)
+            results["results"][benchmark.name] = result
+            print(f"{benchmark.name:<40} {result['best']:>12.3e} s", file=sys.stderr)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
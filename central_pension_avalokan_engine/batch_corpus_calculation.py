@@ -0,0 +1,341 @@
+from dataclasses import MISSING, dataclass, fields, replace
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .corpus_info import (
+    CORPUS_FIELDS,
+    FULL_PENSION_SERVICE_MONTHS,
+    MINIMUM_UPS_PENSION,
+    UPS_LUMPSUM_DIVISOR,
+    YearlyCorpusInfo,
+)
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+
+
+PARAM_FIELDS = tuple(f.name for f in fields(PensionCompareParams))
+INT_PARAM_FIELDS = ("current_service", "years_to_retire")
+
+
+# ------------------------------------------
+# Columnar Parameters
+# ------------------------------------------
+@dataclass
+class PensionCompareParamsBatch:
+    """Columnar PensionCompareParams: one array entry per profile."""
+
+    current_service: np.ndarray
+    years_to_retire: np.ndarray
+    current_basic_pay: np.ndarray
+    current_da_rate: np.ndarray
+    current_total_nps_corpus: np.ndarray
+    withdrawal_percentage: np.ndarray
+    current_annual_expense: np.ndarray
+
+    expected_da_hike: np.ndarray
+    expected_basic_pay_hike: np.ndarray
+    expected_nps_return: np.ndarray
+    expected_benchmark_corpus_return: np.ndarray
+    expected_annuity_rate: np.ndarray
+    expected_ups_pension_growth: np.ndarray
+    expected_rate_of_return_nps_corpus_after_retirement: np.ndarray
+    expected_rate_of_inflation: np.ndarray
+
+    @classmethod
+    def from_columns(cls, **columns) -> "PensionCompareParamsBatch":
+        """
+        Build a batch from array-likes keyed by PensionCompareParams field
+        name. Missing optional fields and scalars are broadcast using the
+        PensionCompareParams defaults. current_service and years_to_retire
+        must be whole numbers.
+        """
+        unknown = set(columns) - set(PARAM_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown parameter column(s): {', '.join(sorted(unknown))}")
+
+        sizes = {np.size(v) for v in columns.values() if np.ndim(v) > 0}
+        if len(sizes) > 1:
+            raise ValueError("All parameter columns must have the same length.")
+        size = sizes.pop() if sizes else 1
+
+        arrays = {}
+        for f in fields(PensionCompareParams):
+            if f.name in columns:
+                value = columns[f.name]
+            elif f.default is not MISSING:
+                value = f.default
+            else:
+                raise ValueError(f"Missing required parameter column: {f.name}")
+            array = np.asarray(value, dtype=np.float64)
+            if f.name in INT_PARAM_FIELDS:
+                with np.errstate(invalid="ignore"):
+                    fractional = np.flatnonzero(np.mod(array, 1) != 0)
+                if len(fractional):
+                    raise ValueError(
+                        f"{f.name} must hold whole numbers; profile {int(fractional[0])} "
+                        f"has {array.flat[fractional[0]]!r}"
+                    )
+                array = array.astype(np.int64)
+            arrays[f.name] = np.broadcast_to(array, (size,)).copy()
+        return cls(**arrays)
+
+    @classmethod
+    def from_params(cls, params_list: Iterable[PensionCompareParams]) -> "PensionCompareParamsBatch":
+        """Build a batch from a sequence of PensionCompareParams."""
+        params_list = list(params_list)
+        return cls.from_columns(
+            **{
+                name: [getattr(p, name) for p in params_list]
+                for name in PARAM_FIELDS
+            }
+        )
+
+    @classmethod
+    def repeat(cls, params: PensionCompareParams, size: int) -> "PensionCompareParamsBatch":
+        """Build a batch of `size` copies of a single profile."""
+        return cls.from_columns(
+            **{name: np.full(size, getattr(params, name)) for name in PARAM_FIELDS}
+        )
+
+    def __len__(self) -> int:
+        return len(self.years_to_retire)
+
+    def __getitem__(self, index: int) -> PensionCompareParams:
+        values = {name: getattr(self, name)[index].item() for name in PARAM_FIELDS}
+        return PensionCompareParams(**values)
+
+    def take(self, indices) -> "PensionCompareParamsBatch":
+        """Return a new batch holding only the selected profiles."""
+        return replace(self, **{name: getattr(self, name)[indices] for name in PARAM_FIELDS})
+
+
+# ------------------------------------------
+# Columnar Yearly Corpus Info
+# ------------------------------------------
+@dataclass
+class BatchCorpusInfo:
+    """
+    Columnar YearlyCorpusInfo for a batch of profiles.
+
+    Profiles with no simulated year (years_to_retire == 0) have `year` 0 and
+    NaN in every other field.
+    """
+
+    year: np.ndarray
+    basic_pay: np.ndarray
+    da_rate: np.ndarray
+    salary: np.ndarray
+    next_year_basic_pay: np.ndarray
+    next_year_da_rate: np.ndarray
+    monthly_nps_contrib: np.ndarray
+    monthly_ups_contrib: np.ndarray
+    monthly_benchmark_contrib: np.ndarray
+    nps_corpus: np.ndarray
+    ups_corpus: np.ndarray
+    benchmark_corpus: np.ndarray
+    annual_expense: np.ndarray
+    ups_pension: np.ndarray
+    nps_annuity: np.ndarray
+
+    @classmethod
+    def empty(cls, size: int) -> "BatchCorpusInfo":
+        values = {name: np.full(size, np.nan) for name in CORPUS_FIELDS}
+        values["year"] = np.zeros(size, dtype=np.int64)
+        return cls(**values)
+
+    @classmethod
+    def from_yearly_corpus_info(cls, rows: Sequence[YearlyCorpusInfo]) -> "BatchCorpusInfo":
+        """Stack scalar YearlyCorpusInfo rows into a batch."""
+        values = {
+            name: np.array([getattr(row, name) for row in rows], dtype=np.float64)
+            for name in CORPUS_FIELDS
+        }
+        values["year"] = values["year"].astype(np.int64)
+        return cls(**values)
+
+    def __len__(self) -> int:
+        return len(self.year)
+
+    def has_history(self) -> np.ndarray:
+        """Boolean mask of profiles with at least one simulated year."""
+        return self.year > 0
+
+    def __getitem__(self, index: int) -> Optional[YearlyCorpusInfo]:
+        """Return profile `index` as a scalar YearlyCorpusInfo (None if empty)."""
+        if self.year[index] == 0:
+            return None
+        values = {name: getattr(self, name)[index].item() for name in CORPUS_FIELDS}
+        return YearlyCorpusInfo(**values)
+
+    def calculate_pension(self, params: PensionCompareParamsBatch) -> None:
+        """
+        Update every profile with calculated pension values, as
+        CorpusInfo.calculate_pension does for a single history.
+        """
+        ups_pension, nps_annuity, ups_corpus, nps_corpus = update_pension_info_batch(self, params)
+        self.ups_pension = ups_pension
+        self.nps_annuity = nps_annuity
+        self.ups_corpus = ups_corpus
+        self.nps_corpus = nps_corpus
+
+
+# ------------------------------------------
+# Vectorized Helpers
+# ------------------------------------------
+def get_compounding_factors_batch(return_rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized get_compounding_factors for monthly compounding."""
+    r = np.asarray(return_rate, dtype=np.float64) / 12
+    n = 12
+
+    zero_rate = r == 0
+    safe_r = np.where(zero_rate, 1.0, r)
+    corpus_growth = (1 + r)**n
+    annuity_factor = np.where(zero_rate, 12.0, (corpus_growth - 1) / safe_r)
+    return corpus_growth, annuity_factor
+
+
+def get_yearly_accumulated_corpus_batch(
+    initial_corpus: np.ndarray, return_rate: np.ndarray, monthly_contrib: np.ndarray
+) -> np.ndarray:
+    """Vectorized get_yearly_accumulated_corpus."""
+    corpus_growth, annuity_factor = get_compounding_factors_batch(return_rate)
+    return initial_corpus * corpus_growth + monthly_contrib * annuity_factor
+
+
+def calculate_accumulated_corpus_batch(
+    calculation_year: int,
+    params: PensionCompareParamsBatch,
+    last_year_corpus_info: Optional[BatchCorpusInfo] = None,
+) -> BatchCorpusInfo:
+    """
+    Vectorized calculate_accumulated_corpus.
+
+    Profiles whose horizon ends before `calculation_year` keep the values of
+    `last_year_corpus_info` unchanged, so ragged years_to_retire are handled
+    by masking.
+    """
+    if last_year_corpus_info is None:
+        annual_expense = params.current_annual_expense * (
+            1 + params.expected_rate_of_inflation
+        )
+        basic_pay = params.current_basic_pay
+        da_rate = params.current_da_rate
+        start_nps_corpus = start_ups_corpus = start_benchmark_corpus = params.current_total_nps_corpus
+        previous = BatchCorpusInfo.empty(len(params))
+    else:
+        annual_expense = last_year_corpus_info.annual_expense * (
+            1 + params.expected_rate_of_inflation
+        )
+        basic_pay = last_year_corpus_info.next_year_basic_pay
+        da_rate = last_year_corpus_info.next_year_da_rate
+        start_nps_corpus = last_year_corpus_info.nps_corpus
+        start_ups_corpus = last_year_corpus_info.ups_corpus
+        start_benchmark_corpus = last_year_corpus_info.benchmark_corpus
+        previous = last_year_corpus_info
+
+    salary = basic_pay * (1 + da_rate)
+
+    # Contributions
+    nps_contrib = salary * NPS_CONTRIB_RATE
+    ups_contrib = salary * UPS_CONTRIB_RATE
+    benchmark_contrib = ups_contrib  # same as UPS
+
+    computed = {
+        "year": np.full(len(params), calculation_year + 1, dtype=np.int64),
+        "basic_pay": basic_pay,
+        "da_rate": da_rate,
+        "salary": salary,
+        "next_year_basic_pay": basic_pay * (1 + params.expected_basic_pay_hike),
+        "next_year_da_rate": da_rate + params.expected_da_hike,
+        "annual_expense": annual_expense,
+        "monthly_nps_contrib": nps_contrib,
+        "monthly_ups_contrib": ups_contrib,
+        "monthly_benchmark_contrib": benchmark_contrib,
+        "nps_corpus": get_yearly_accumulated_corpus_batch(
+            start_nps_corpus, params.expected_nps_return, nps_contrib
+        ),
+        "ups_corpus": get_yearly_accumulated_corpus_batch(
+            start_ups_corpus, params.expected_nps_return, ups_contrib
+        ),
+        "benchmark_corpus": get_yearly_accumulated_corpus_batch(
+            start_benchmark_corpus, params.expected_benchmark_corpus_return, benchmark_contrib
+        ),
+        "ups_pension": np.zeros(len(params)),
+        "nps_annuity": np.zeros(len(params)),
+    }
+
+    active = params.years_to_retire > calculation_year
+    return BatchCorpusInfo(
+        **{
+            name: np.where(active, computed[name], getattr(previous, name))
+            for name in CORPUS_FIELDS
+        }
+    )
+
+
+def update_pension_info_batch(info: BatchCorpusInfo, params: PensionCompareParamsBatch):
+    """
+    Vectorized update_pension_info. Returns arrays of
+    (ups_pension, nps_annuity, ups_corpus, nps_corpus).
+    """
+    # NPS calculations
+    nps_corpus = info.nps_corpus * params.withdrawal_percentage
+    nps_annuity = (
+        info.nps_corpus
+        * (1 - params.withdrawal_percentage)
+        * params.expected_annuity_rate
+        / 12
+    )
+
+    # UPS calculations
+    total_service_years = params.years_to_retire + params.current_service
+    service_ratio = np.minimum(total_service_years * 12 / FULL_PENSION_SERVICE_MONTHS, 1)
+
+    avg_basic_pay = (info.basic_pay + info.next_year_basic_pay) / 2
+    max_ups_pension = avg_basic_pay * service_ratio
+
+    final_drawn_salary = info.next_year_basic_pay * (1 + info.next_year_da_rate)
+    ups_lumpsum = total_service_years * 2 * final_drawn_salary / UPS_LUMPSUM_DIVISOR
+
+    remaining_ups_corpus = info.ups_corpus * (1 - params.withdrawal_percentage)
+    ups_corpus = ups_lumpsum + (info.ups_corpus * params.withdrawal_percentage)
+
+    full_pension = remaining_ups_corpus >= info.benchmark_corpus
+    ups_corpus = np.where(
+        full_pension, ups_corpus + info.ups_corpus - info.benchmark_corpus, ups_corpus
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reduced_pension = max_ups_pension * (remaining_ups_corpus / info.benchmark_corpus)
+    ups_pension_basic_pay = np.where(full_pension, max_ups_pension, reduced_pension)
+    ups_pension_basic_pay = np.where(
+        ups_pension_basic_pay < MINIMUM_UPS_PENSION, MINIMUM_UPS_PENSION, ups_pension_basic_pay
+    )
+
+    ups_pension = ups_pension_basic_pay * (1 + info.next_year_da_rate)
+
+    # Profiles with no simulated year have nothing to calculate
+    empty = ~info.has_history()
+    return tuple(
+        np.where(empty, np.nan, values)
+        for values in (ups_pension, nps_annuity, ups_corpus, nps_corpus)
+    )
+
+
+# ------------------------------------------
+# Batch Corpus Growth Simulation
+# ------------------------------------------
+def get_corpus_info_batch(params: PensionCompareParamsBatch) -> BatchCorpusInfo:
+    """
+    Simulate every profile in `params` and return each profile's final
+    (retirement) year, matching core.get_corpus_info(...).last().
+    """
+    corpus_info = None
+    horizon = int(params.years_to_retire.max()) if len(params) else 0
+    for year in range(horizon):
+        corpus_info = calculate_accumulated_corpus_batch(year, params, corpus_info)
+
+    if corpus_info is None:
+        return BatchCorpusInfo.empty(len(params))
+    return corpus_info
+
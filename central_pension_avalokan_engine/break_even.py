@@ -0,0 +1,198 @@
+import sys
+from dataclasses import replace
+from typing import Callable
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .core import get_corpus_info
+from .batch_corpus_calculation import INT_PARAM_FIELDS, PARAM_FIELDS, PensionCompareParamsBatch
+from .salary_trajectory import (
+    TRAJECTORY_FIELDS,
+    build_salary_trajectory,
+    simulate_final_corpus_info,
+)
+
+
+# ------------------------------------------
+# Pension Gap
+# ------------------------------------------
+def pension_gap(params: PensionCompareParams) -> float:
+    """Monthly NPS annuity minus UPS pension at retirement."""
+    corpus_history = get_corpus_info(params, final_only=True)
+    if not corpus_history.last():
+        raise ValueError("Cannot compare pensions without any year until retirement.")
+    corpus_history.calculate_pension(params)
+    final_year = corpus_history.last()
+    return final_year.nps_annuity - final_year.ups_pension
+
+
+def _check_field(field: str) -> None:
+    if field not in PARAM_FIELDS:
+        raise ValueError(f"Unknown PensionCompareParams field: {field}")
+
+
+# ------------------------------------------
+# Scalar Root Finding
+# ------------------------------------------
+def _brent(f: Callable[[float], float], a: float, b: float, xtol: float, max_iter: int) -> float:
+    """Brent's method for a root of f bracketed by [a, b]."""
+    fa, fb = f(a), f(b)
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    if fa * fb > 0:
+        raise ValueError(f"Break-even is not bracketed by [{a}, {b}].")
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2 * sys.float_info.epsilon * abs(b) + 0.5 * xtol
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0:
+            return b
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Secant step, or inverse quadratic interpolation when possible
+            s = fb / fa
+            if a == c:
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = f(b)
+    return b
+
+
+def _integer_bisect(f: Callable[[int], float], low: int, high: int) -> int:
+    """Integer x in (low, high] with f(x - 1) and f(x) of opposite sign."""
+    f_low, f_high = f(low), f(high)
+    if f_low == 0:
+        return low
+    if f_low * f_high > 0:
+        raise ValueError(f"Break-even is not bracketed by [{low}, {high}].")
+    while high - low > 1:
+        mid = (low + high) // 2
+        if f(mid) * f_low > 0:
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+def find_break_even(
+    params: PensionCompareParams,
+    field: str,
+    low: float,
+    high: float,
+    xtol: float = 1e-10,
+    max_iter: int = 100,
+) -> float:
+    """
+    Value of `field` within [low, high] at which the NPS annuity equals the
+    UPS pension. Continuous fields are solved with Brent's method; for
+    integer fields (years_to_retire, current_service) the whole value at
+    which the gap changes sign is returned. Each evaluation uses the
+    closed-form retirement-year projection.
+
+    As in find_break_even_batch, the result is always a float, whole for
+    integer fields, and NaN when the gap is undefined at either end of the
+    bracket because the profile has no year until retirement.
+    """
+    _check_field(field)
+
+    def has_history(value) -> bool:
+        return (value if field == "years_to_retire" else params.years_to_retire) > 0
+
+    if not (has_history(low) and has_history(high)):
+        return float("nan")
+
+    def gap(value):
+        return pension_gap(replace(params, **{field: value}))
+
+    if field in INT_PARAM_FIELDS:
+        return float(_integer_bisect(gap, int(low), int(high)))
+    return _brent(gap, float(low), float(high), xtol, max_iter)
+
+
+# ------------------------------------------
+# Batch Root Finding
+# ------------------------------------------
+def find_break_even_batch(
+    params: PensionCompareParamsBatch,
+    field: str,
+    low,
+    high,
+    xtol: float = 1e-10,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Vectorized find_break_even for every profile of a batch, by bracketed
+    bisection. `low` and `high` may be scalars or per-profile arrays.
+    Profiles whose break-even is not bracketed, or with no year until
+    retirement at either end of the bracket, get NaN.
+
+    When `field` does not shape the salary trajectory, the trajectory is
+    built once and reused by every iteration.
+    """
+    _check_field(field)
+    size = len(params)
+    is_int = field in INT_PARAM_FIELDS
+    dtype = np.int64 if is_int else np.float64
+    low = np.broadcast_to(np.asarray(low, dtype=dtype), (size,)).copy()
+    high = np.broadcast_to(np.asarray(high, dtype=dtype), (size,)).copy()
+
+    trajectory = None if field in TRAJECTORY_FIELDS else build_salary_trajectory(params)
+
+    def gap(values: np.ndarray) -> np.ndarray:
+        params_at = replace(params, **{field: values})
+        corpus_info = simulate_final_corpus_info(params_at, trajectory)
+        corpus_info.calculate_pension(params_at)
+        return corpus_info.nps_annuity - corpus_info.ups_pension
+
+    gap_low = gap(low)
+    gap_high = gap(high)
+    bracketed = gap_low * gap_high <= 0
+    low_sign = np.sign(gap_low)
+
+    for _ in range(max_iter):
+        if is_int:
+            searching = bracketed & (high - low > 1) & (gap_low != 0)
+        else:
+            searching = bracketed & (high - low > xtol) & (gap_low != 0)
+        if not searching.any():
+            break
+        mid = np.where(searching, (low + high) // 2 if is_int else (low + high) / 2, low)
+        same_side = np.sign(gap(mid)) == low_sign
+        low = np.where(searching & same_side, mid, low)
+        high = np.where(searching & ~same_side, mid, high)
+
+    if is_int:
+        roots = np.where(gap_low == 0, low, high).astype(np.float64)
+    else:
+        roots = np.where(gap_low == 0, low, (low + high) / 2)
+    return np.where(bracketed, roots, np.nan)
@@ -1,10 +1,14 @@
 import argparse
-import configparser
-from typing import List
+import sys
+from typing import List, Optional
 from pathlib import Path
 
 from .core import get_corpus_info, PensionCompareParams
 
+# csv, configparser, the cohort runner (multiprocessing) and NumPy are
+# imported only by the subcommands that need them, so the direct path
+# starts as fast as possible.
+
 
 DIRECT_ARGS_ORDER = [
     "current_service",
@@ -15,7 +19,11 @@ DIRECT_ARGS_ORDER = [
     "withdrawal_percentage",
     "current_annual_expense",
 ]
+
+
 def parse_args_from_file(file_path: Path) -> List[str]:
+    import configparser
+
     config = configparser.ConfigParser()
     config.read(file_path)
 
@@ -44,35 +52,6 @@ def parse_args_from_file(file_path: Path) -> List[str]:
 
     return args_list
 
-def parse_args_from_file(file_path):
-    config = configparser.ConfigParser()
-
-    config.read(file_path)
-
-    if "personal_data" not in config:
-        raise ValueError(f"Missing [personal_data] section in {file_path}")
-
-    args_list = []
-    missing_required_args = []
-    for required_arg in DIRECT_ARGS_ORDER:
-        if not required_arg in config["personal_data"]:
-            missing_required_args.append(required_arg)
-            continue
-        args_list.append(config["personal_data"][required_arg])
-
-    if missing_required_args:
-        list_in_err_string = ", ".join(missing_required_args)
-        raise ValueError(
-            "Missing argument(s) in [personal_data] section: " f"{list_in_err_string}"
-        )
-
-    # Optionally include assumptions
-    if "assumptions" in config:
-        for key, value in config["assumptions"].items():
-            args_list.append(f"--{key}")
-            args_list.append(str(value))
-    return args_list
-
 
 def build_direct_parser(subparser):
     # Required positional arguments (no defaults)
@@ -147,34 +126,460 @@ def build_direct_parser(subparser):
     )
 
 
+def params_from_args(args) -> PensionCompareParams:
+    """Instantiate the dataclass using arguments parsed by build_direct_parser."""
+    return PensionCompareParams(
+        current_service=args.current_service,
+        years_to_retire=args.years_to_retire,
+        current_basic_pay=args.current_basic_pay,
+        current_da_rate=args.current_da_rate,
+        current_total_nps_corpus=args.current_total_nps_corpus,
+        withdrawal_percentage=args.withdrawal_percentage,
+        current_annual_expense=args.current_annual_expense,
+        expected_da_hike=args.expected_da_hike,
+        expected_basic_pay_hike=args.expected_basic_pay_hike,
+        expected_nps_return=args.expected_nps_return,
+        expected_benchmark_corpus_return=args.expected_benchmark_corpus_return,
+        expected_annuity_rate=args.expected_annuity_rate,
+        expected_ups_pension_growth=args.expected_ups_pension_growth,
+        expected_rate_of_return_nps_corpus_after_retirement=args.expected_rate_of_return_nps_corpus_after_retirement,
+        expected_rate_of_inflation=args.expected_rate_of_inflation,
+    )
+
+
+def load_params_from_file(file_path: Path) -> PensionCompareParams:
+    """Parse an .ini file through the direct parser into PensionCompareParams."""
+    direct_parser = argparse.ArgumentParser()
+    build_direct_parser(direct_parser)
+    return params_from_args(direct_parser.parse_args(parse_args_from_file(file_path)))
+
+
 def _existing_file(file_path_str):
     file_path = Path(file_path_str)
     if not file_path.is_file():
         raise argparse.ArgumentTypeError(f"Config file not found: {file_path}")
     return file_path
 
-def main():
+
+def _positive_int(value_str):
+    value = int(value_str)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"Expected a positive integer, got {value_str}")
+    return value
+
+
+def build_batch_parser(subparser):
+    subparser.add_argument(
+        "input",
+        type=_existing_file,
+        help="CSV or JSONL file of profiles (PensionCompareParams field names, optional employee_id)",
+    )
+    subparser.add_argument(
+        "--output", type=Path, help="Summary CSV to write (default: stdout)"
+    )
+    subparser.add_argument(
+        "--workers", type=_positive_int, default=1, help="Worker processes (default: 1)"
+    )
+    subparser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        default=10000,
+        help="Profiles simulated together per chunk (default: 10000)",
+    )
+    subparser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from the checkpoint next to --output",
+    )
+    subparser.add_argument(
+        "--report", type=Path, help="Also write a group-level report CSV to this file"
+    )
+    subparser.add_argument(
+        "--report-state",
+        type=Path,
+        help="Also save the mergeable report aggregates as JSON (see the report subcommand)",
+    )
+    subparser.add_argument(
+        "--pay-edges",
+        type=_edges,
+        help="Basic pay band edges of the report, e.g. 25000,50000,100000",
+    )
+    subparser.add_argument(
+        "--service-edges",
+        type=_edges,
+        help="Current service band edges (years) of the report, e.g. 10,20,30",
+    )
+
+
+def _edges(value_str):
+    try:
+        return [float(value) for value in value_str.split(",") if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated numbers, got {value_str}")
+
+
+def build_snapshot_parser(subparser):
+    subparser.add_argument(
+        "input",
+        type=_existing_file,
+        help="CSV or JSONL file of profiles (PensionCompareParams field names, optional employee_id)",
+    )
+    subparser.add_argument(
+        "--output", type=Path, required=True, help="Snapshot file to write"
+    )
+    subparser.add_argument(
+        "--years",
+        type=_positive_int,
+        default=45,
+        help="Years stored per employee; longer horizons are rejected (default: 45)",
+    )
+    subparser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        default=10000,
+        help="Profiles simulated together per chunk (default: 10000)",
+    )
+
+
+def build_snapshot_diff_parser(subparser):
+    subparser.add_argument("old", type=_existing_file, help="Earlier snapshot")
+    subparser.add_argument("new", type=_existing_file, help="Later snapshot")
+    subparser.add_argument(
+        "--rtol", type=float, default=0.0, help="Relative tolerance for equal values (default: 0)"
+    )
+    subparser.add_argument(
+        "--atol", type=float, default=0.0, help="Absolute tolerance for equal values (default: 0)"
+    )
+    subparser.add_argument(
+        "--limit", type=int, default=20, help="Changed employee ids to list (default: 20)"
+    )
+
+
+def build_rules_parser(subparser):
+    subparser.add_argument(
+        "input",
+        type=_existing_file,
+        help="CSV or JSONL file of profiles (PensionCompareParams field names, optional employee_id)",
+    )
+    subparser.add_argument(
+        "--rules",
+        type=_existing_file,
+        required=True,
+        help='JSON list of rule sets overriding the current rules, e.g. [{"name": "floor_12k", "minimum_ups_pension": 12000}]',
+    )
+    subparser.add_argument(
+        "--output", type=Path, help="Score CSV to write, one row per rule set (default: stdout)"
+    )
+    subparser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        default=10000,
+        help="Profiles evaluated together per chunk (default: 10000)",
+    )
+
+
+def build_report_parser(subparser):
+    subparser.add_argument(
+        "states", type=_existing_file, nargs="+", help="Report aggregates saved with batch --report-state"
+    )
+    subparser.add_argument(
+        "--output", type=Path, help="Report CSV to write (default: stdout)"
+    )
+
+
+def build_from_dir_parser(subparser):
+    subparser.add_argument(
+        "source", help="Directory of .ini files, or a glob pattern such as 'exports/*.ini'"
+    )
+    subparser.add_argument(
+        "--output", type=Path, help="Summary CSV to write (default: stdout)"
+    )
+    subparser.add_argument(
+        "--workers", type=_positive_int, default=1, help="Processes parsing files (default: 1)"
+    )
+    subparser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        default=10000,
+        help="Profiles simulated together per chunk (default: 10000)",
+    )
+    subparser.add_argument(
+        "--cache",
+        type=Path,
+        help="JSON file caching parsed configs; unchanged files are not reparsed on reruns",
+    )
+
+
+def _sweep_axis(axis_str):
+    # Sweeps need NumPy; keep it out of the direct/from-file paths
+    from .sweep import parse_axis, validate_axis
+
+    name, separator, spec = axis_str.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUES, got {axis_str}")
+    try:
+        name, values = name.strip(), parse_axis(spec)
+        validate_axis(name, values)
+        return name, values
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
+def build_sweep_parser(subparser):
+    subparser.add_argument(
+        "file", type=_existing_file, help="Path to .ini file with the base profile"
+    )
+    subparser.add_argument(
+        "--axis",
+        type=_sweep_axis,
+        action="append",
+        required=True,
+        metavar="NAME=VALUES",
+        help="Parameter to sweep, as a comma list (0,0.3,0.6) or range start:stop:step; repeatable",
+    )
+    subparser.add_argument(
+        "--output", type=Path, help="Tidy result CSV to write (default: stdout)"
+    )
+
+
+def _add_save_csv(subparser):
+    subparser.add_argument(
+        "--save-csv", type=Path, help="Optional: Save corpus history to this CSV file"
+    )
+
+
+def _main_direct(argv: List[str]):
+    """Fast path for `direct`: build only the direct subcommand's parser."""
+    direct_parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} direct", description="Provide all inputs directly"
+    )
+    build_direct_parser(direct_parser)
+    _add_save_csv(direct_parser)
+    args = direct_parser.parse_args(argv)
+    args.mode = "direct"
+    run(args)
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["direct"]:
+        return _main_direct(argv[1:])
 
     parser = argparse.ArgumentParser(description="Run pension simulation")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-stage timings and counters to stderr",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        metavar="TRACE_JSON",
+        help="Profile and also write a Chrome trace JSON to this file",
+    )
     subparsers = parser.add_subparsers(dest="mode", required=True)
 
     # Subparser for direct input
     direct_parser = subparsers.add_parser("direct", help="Provide all inputs directly")
     build_direct_parser(direct_parser)
-    direct_parser.add_argument(
-        "--save-csv", type=Path, help="Optional: Save corpus history to this CSV file"
-    )
-    
+    _add_save_csv(direct_parser)
+
     # Subparser for loading from file
     file_parser = subparsers.add_parser("from-file", help="Load inputs from .ini file")
     file_parser.add_argument(
         "file", type=_existing_file, help="Path to .ini file"
     )
-    file_parser.add_argument(
-        "--save-csv", type=Path, help="Optional: Save corpus history to this CSV file"
+    _add_save_csv(file_parser)
+
+    # Subparser for bulk cohort input
+    batch_parser = subparsers.add_parser(
+        "batch", help="Simulate a cohort of profiles from a CSV/JSONL file"
+    )
+    build_batch_parser(batch_parser)
+
+    # Subparsers for binary history snapshots
+    snapshot_parser = subparsers.add_parser(
+        "snapshot", help="Simulate full histories of a cohort into a binary snapshot"
     )
+    build_snapshot_parser(snapshot_parser)
+    snapshot_diff_parser = subparsers.add_parser(
+        "snapshot-diff",
+        help="Compare two snapshots; exits with status 1 when they differ, 2 when one cannot be read",
+    )
+    build_snapshot_diff_parser(snapshot_diff_parser)
+
+    # Subparser for scoring pension rule variants
+    rules_parser = subparsers.add_parser(
+        "rules", help="Score pension rule variants against a cohort of profiles"
+    )
+    build_rules_parser(rules_parser)
+
+    # Subparser for merging sharded batch reports
+    report_parser = subparsers.add_parser(
+        "report", help="Merge report aggregates of sharded batch runs into one report"
+    )
+    build_report_parser(report_parser)
+
+    # Subparser for directories of .ini files
+    from_dir_parser = subparsers.add_parser(
+        "from-dir", help="Simulate every .ini file of a directory or glob pattern"
+    )
+    build_from_dir_parser(from_dir_parser)
+
+    # Subparser for parameter sweeps
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Evaluate a profile over a grid of parameter values"
+    )
+    build_sweep_parser(sweep_parser)
+
+    args = parser.parse_args(argv)
+    if not (args.profile or args.profile_trace):
+        run(args)
+        return
+
+    from .instrumentation import profiling
+
+    with profiling(trace_events=args.profile_trace is not None) as recorder:
+        run(args)
+    print(recorder.summary_table(), file=sys.stderr)
+    if args.profile_trace:
+        recorder.write_chrome_trace(args.profile_trace)
+        print(f"Chrome trace written to {args.profile_trace}", file=sys.stderr)
+
+
+def run(args):
+    """Run the subcommand selected by parsed main() arguments."""
+    if args.mode == "sweep":
+        from .sweep import sweep
+
+        result = sweep(load_params_from_file(args.file), dict(args.axis))
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as output:
+                result.write_csv(output)
+        else:
+            result.write_csv(sys.stdout)
+        return
+
+    if args.mode == "from-dir":
+        from .config_loader import ConfigCache, find_config_files, load_config_files, run_params
+
+        paths = find_config_files(args.source)
+        if not paths:
+            raise SystemExit(f"No .ini files found for {args.source}")
+        cache = ConfigCache(args.cache)
+        loaded = load_config_files(paths, args.workers, cache)
+        cache.save()
+        for path, error in loaded.errors.items():
+            print(f"Skipped {path}: {error}", file=sys.stderr)
+        print(
+            f"Loaded {len(loaded.params):,} configs ({loaded.cached:,} cached, "
+            f"{loaded.parsed:,} parsed, {len(loaded.errors):,} skipped)",
+            file=sys.stderr,
+        )
+
+        ids = [Path(path).stem for path in loaded.paths]
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as output:
+                stats = run_params(ids, loaded.params, output, args.chunk_size)
+        else:
+            stats = run_params(ids, loaded.params, sys.stdout, args.chunk_size)
+        print(stats.report(), file=sys.stderr)
+        if loaded.errors:
+            raise SystemExit(1)
+        return
+
+    if args.mode == "snapshot":
+        from .snapshot import write_cohort_snapshot
+
+        try:
+            employees = write_cohort_snapshot(args.input, args.output, args.chunk_size, args.years)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        print(f"Snapshot of {employees:,} employees written to {args.output}", file=sys.stderr)
+        return
+
+    if args.mode == "snapshot-diff":
+        from .snapshot import Snapshot, diff_snapshots
+
+        try:
+            with Snapshot(args.old) as old, Snapshot(args.new) as new:
+                diff = diff_snapshots(old, new, rtol=args.rtol, atol=args.atol, limit=args.limit)
+        except (ValueError, OSError) as exc:
+            # Status 2, so scripts can tell unreadable snapshots from a diff
+            print(f"Cannot compare snapshots: {exc}", file=sys.stderr)
+            raise SystemExit(2)
+        print(diff.report())
+        if not diff.identical:
+            raise SystemExit(1)
+        return
 
-    args = parser.parse_args()
+    if args.mode == "rules":
+        from .pension_rules import load_rule_sets, score_rule_sets, write_scores
+
+        try:
+            rows = score_rule_sets(args.input, load_rule_sets(args.rules), args.chunk_size)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as output:
+                write_scores(rows, output)
+        else:
+            write_scores(rows, sys.stdout)
+        return
+
+    if args.mode == "report":
+        from .cohort_report import merge_report_states
+
+        try:
+            aggregator = merge_report_states(args.states)
+        except (ValueError, OSError) as exc:
+            raise SystemExit(str(exc))
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as output:
+                aggregator.write_report(output)
+        else:
+            aggregator.write_report(sys.stdout)
+        return
+
+    if args.mode == "batch":
+        from .cohort import CohortRunError, run_cohort_to_path
+
+        if args.resume and args.output is None:
+            raise SystemExit("--resume requires --output")
+        aggregator = None
+        if args.report or args.report_state:
+            if args.resume:
+                raise SystemExit("--report and --report-state cannot be combined with --resume")
+            from .cohort_report import CohortAggregator
+
+            bands = {}
+            if args.pay_edges is not None:
+                bands["pay_edges"] = args.pay_edges
+            if args.service_edges is not None:
+                bands["service_edges"] = args.service_edges
+            try:
+                aggregator = CohortAggregator(**bands)
+            except ValueError as exc:
+                raise SystemExit(str(exc))
+        try:
+            stats = run_cohort_to_path(
+                args.input,
+                args.output,
+                args.chunk_size,
+                args.workers,
+                resume=args.resume,
+                on_chunk_summary=aggregator.add_chunk if aggregator else None,
+            )
+        except CohortRunError as exc:
+            raise SystemExit(f"{exc}. Rerun with --resume to continue from the last written chunk.")
+        print(stats.report(), file=sys.stderr)
+        if args.report:
+            with open(args.report, "w", newline="", encoding="utf-8") as output:
+                aggregator.write_report(output)
+            print(f"Report written to {args.report}", file=sys.stderr)
+        if args.report_state:
+            aggregator.save(args.report_state)
+        return
 
     # Handle file input
     if args.mode == "from-file":
@@ -187,26 +592,10 @@ def main():
         args = direct_parser.parse_args(file_args_list)
         args.save_csv = sava_csv_arg  
 
-    # Instantiate the dataclass using parsed arguments
-    params = PensionCompareParams(
-        current_service=args.current_service,
-        years_to_retire=args.years_to_retire,
-        current_basic_pay=args.current_basic_pay,
-        current_da_rate=args.current_da_rate,
-        current_total_nps_corpus=args.current_total_nps_corpus,
-        withdrawal_percentage=args.withdrawal_percentage,
-        current_annual_expense=args.current_annual_expense,
-        expected_da_hike=args.expected_da_hike,
-        expected_basic_pay_hike=args.expected_basic_pay_hike,
-        expected_nps_return=args.expected_nps_return,
-        expected_benchmark_corpus_return=args.expected_benchmark_corpus_return,
-        expected_annuity_rate=args.expected_annuity_rate,
-        expected_ups_pension_growth=args.expected_ups_pension_growth,
-        expected_rate_of_return_nps_corpus_after_retirement=args.expected_rate_of_return_nps_corpus_after_retirement,
-        expected_rate_of_inflation=args.expected_rate_of_inflation,
-    )
+    params = params_from_args(args)
 
-    corpus_history = get_corpus_info(params)
+    # Only the retirement year is needed unless the full history is saved
+    corpus_history = get_corpus_info(params, final_only=not args.save_csv)
 
     # Print final year summary
     final_year = corpus_history.last()
@@ -217,10 +606,10 @@ def main():
         print(f"UPS: ₹{final_year.ups_corpus:,.2f}")
         print(f"NPS annuity (monthly): ₹{final_year.nps_annuity:,.2f}")
         print(f"UPS pension (including DA): ₹{final_year.ups_pension:,.2f}")
-        print(args.save_csv)
-        
+
         if args.save_csv:
             corpus_history.save_to_csv(args.save_csv)
+            print(f"Corpus history saved to {args.save_csv}")
     else:
         print("Nothing to show. Wrong arguments or unknown error calculating!")
     
@@ -0,0 +1,504 @@
+import csv
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import MISSING, dataclass, fields
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Set, TextIO, Tuple
+
+from .pension_compare_params import PensionCompareParams
+from .instrumentation import count, stage
+
+
+PARAM_DEFAULTS = {
+    f.name: (None if f.default is MISSING else f.default)
+    for f in fields(PensionCompareParams)
+}
+PARAM_FIELDS = tuple(PARAM_DEFAULTS)
+INT_PARAM_FIELDS = ("current_service", "years_to_retire")
+EMPLOYEE_ID_COLUMN = "employee_id"
+SUMMARY_FIELDS = ("year", "nps_corpus", "ups_corpus", "nps_annuity", "ups_pension")
+
+# Columns of one chunk of profiles, keyed by PensionCompareParams field name
+ProfileChunk = Tuple[List[str], Dict[str, List[float]]]
+
+
+# ------------------------------------------
+# Profile Input
+# ------------------------------------------
+def _iter_raw_chunks(file_path: Path, chunk_size: int) -> Iterator[Dict[str, tuple]]:
+    """Yield chunks of raw (unparsed) column values keyed by column name."""
+    with open(file_path, newline="", encoding="utf-8") as file:
+        if file_path.suffix.lower() in (".jsonl", ".ndjson"):
+            records = (json.loads(line) for line in file if line.strip())
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    return
+                names = set().union(*chunk)
+                yield {name: tuple(record.get(name) for record in chunk) for name in names}
+        else:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            while True:
+                chunk = list(islice(reader, chunk_size))
+                if not chunk:
+                    return
+                if any(len(row) != len(header) for row in chunk):
+                    raise ValueError(f"Rows of {file_path} do not match its header")
+                yield dict(zip(header, zip(*chunk)))
+
+
+def _parse_column(values: tuple, name: str, default: Optional[float]) -> List[float]:
+    if "" not in values and None not in values:
+        return list(map(float, values))
+    if default is None:
+        raise ValueError(f"Missing value(s) for required field {name}")
+    return [default if value is None or value == "" else float(value) for value in values]
+
+
+def _check_integral(values: List[float], name: str, file_path: Path, row_offset: int) -> None:
+    # x % 1 is non-zero for fractions and NaN for non-finite values
+    for row, value in enumerate(values, row_offset + 1):
+        if value % 1:
+            raise ValueError(f"Row {row} of {file_path}: {name} must be a whole number, got {value!r}")
+
+
+def iter_profile_chunks(
+    file_path: Path, chunk_size: int = 10000, start_chunk: int = 0
+) -> Iterator[ProfileChunk]:
+    """
+    Stream profiles from a CSV (header row of PensionCompareParams field
+    names) or JSONL file in columnar chunks of at most `chunk_size` rows.
+    An optional employee_id column is carried through; other unknown
+    columns are ignored. Empty optional values fall back to the defaults;
+    current_service and years_to_retire must be whole numbers.
+    The first `start_chunk` chunks are skipped without being parsed.
+    """
+    file_path = Path(file_path)
+    row_offset = 0
+    for index, raw in enumerate(_iter_raw_chunks(file_path, chunk_size)):
+        size = len(next(iter(raw.values())))
+        if index < start_chunk:
+            row_offset += size
+            continue
+        if EMPLOYEE_ID_COLUMN in raw:
+            ids = [str(value) for value in raw[EMPLOYEE_ID_COLUMN]]
+        else:
+            ids = [str(row_offset + i) for i in range(1, size + 1)]
+
+        columns = {}
+        for name, default in PARAM_DEFAULTS.items():
+            if name in raw:
+                columns[name] = _parse_column(raw[name], name, default)
+                if name in INT_PARAM_FIELDS:
+                    _check_integral(columns[name], name, file_path, row_offset)
+            elif default is None:
+                raise ValueError(f"Missing required field {name} in {file_path}")
+            else:
+                columns[name] = [default] * size
+
+        row_offset += size
+        yield ids, columns
+
+
+# ------------------------------------------
+# Simulation
+# ------------------------------------------
+def _simulate_columns(columns: Mapping[str, Sequence[float]]):
+    # Imported here so the worker pool only loads NumPy where it is used
+    from .batch_corpus_calculation import PensionCompareParamsBatch, get_corpus_info_batch
+
+    params = PensionCompareParamsBatch.from_columns(**columns)
+    corpus_info = get_corpus_info_batch(params)
+    corpus_info.calculate_pension(params)
+    return corpus_info
+
+
+def summarize_chunk(columns: Dict[str, List[float]]) -> Dict[str, list]:
+    """Simulate a chunk of profiles and return their retirement summaries."""
+    corpus_info = _simulate_columns(columns)
+    return {name: getattr(corpus_info, name).tolist() for name in SUMMARY_FIELDS}
+
+
+def pack_chunk(columns: Dict[str, List[float]]) -> bytes:
+    """Pack parsed profile columns as one contiguous float64 buffer, field-major."""
+    buffer = array("d")
+    for name in PARAM_FIELDS:
+        buffer.extend(columns[name])
+    return buffer.tobytes()
+
+
+def summarize_packed(buffer: bytes) -> bytes:
+    """
+    summarize_chunk over a pack_chunk buffer, returning the summaries as a
+    float64 buffer of SUMMARY_FIELDS rows. Used by worker processes so only
+    raw numeric bytes cross the process boundary.
+    """
+    import numpy as np
+
+    values = np.frombuffer(buffer, dtype=np.float64).reshape(len(PARAM_FIELDS), -1)
+    corpus_info = _simulate_columns(dict(zip(PARAM_FIELDS, values)))
+    return np.stack(
+        [getattr(corpus_info, name).astype(np.float64) for name in SUMMARY_FIELDS]
+    ).tobytes()
+
+
+def unpack_summary(buffer: bytes, size: int) -> Dict[str, Sequence]:
+    """Split a summarize_packed buffer back into summary columns."""
+    values = array("d")
+    values.frombytes(buffer)
+    summary = {
+        name: values[i * size:(i + 1) * size] for i, name in enumerate(SUMMARY_FIELDS)
+    }
+    summary["year"] = [int(year) for year in summary["year"]]
+    return summary
+
+
+class CohortRunError(RuntimeError):
+    """A cohort chunk failed; chunks before `chunk_index` were written."""
+
+    def __init__(self, message: str, chunk_index: int):
+        super().__init__(message)
+        self.chunk_index = chunk_index
+
+
+@dataclass
+class CohortRunStats:
+    profiles: int
+    seconds: float
+    chunks: int = 0
+    retries: int = 0
+
+    @property
+    def profiles_per_second(self) -> float:
+        return self.profiles / self.seconds if self.seconds else float("inf")
+
+    def report(self) -> str:
+        report = (
+            f"Simulated {self.profiles:,} profiles in {self.seconds:.2f}s "
+            f"({self.profiles_per_second:,.0f} profiles/sec)"
+        )
+        if self.retries:
+            report += f", {self.retries} chunk retries after worker crashes"
+        return report
+
+
+class _ShardPool:
+    """
+    Process pool running summarize_packed on numbered chunks. Results are
+    taken back strictly in submission order.
+
+    When a worker process dies the pool is replaced and the lost chunks are
+    run again. Only the chunk that crashed is charged a retry, at most
+    `max_retries` per chunk. If several chunks were lost together the
+    culprit is unknown, so they are rerun one at a time, free of charge,
+    until all of them have finished; chunks submitted meanwhile wait their
+    turn.
+    """
+
+    def __init__(self, workers: int, max_retries: int, summarize: Callable[[bytes], bytes]):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.summarize = summarize
+        self.retries = 0
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        # [index, ids, buffer, future or None while held back, attempts]
+        self._pending: deque = deque()
+        self._suspects: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _submit(self, buffer: bytes) -> Future:
+        try:
+            return self._executor.submit(self.summarize, buffer)
+        except BrokenProcessPool as exc:
+            # A worker died since the last restart; fail like a lost chunk
+            future = Future()
+            future.set_exception(exc)
+            return future
+
+    def submit(self, index: int, ids: List[str], buffer: bytes) -> None:
+        future = None if self._suspects else self._submit(buffer)
+        self._pending.append([index, ids, buffer, future, 0])
+
+    def _restart(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        lost = [
+            entry
+            for entry in self._pending
+            if entry[3] is not None and not (entry[3].done() and entry[3].exception() is None)
+        ]
+        self.retries += len(lost)
+        if len(lost) > 1:
+            # Unknown culprit: hold the lost chunks back, next_result runs them alone
+            for entry in lost:
+                entry[3] = None
+                self._suspects.add(entry[0])
+            return
+
+        for entry in lost:
+            index, _, buffer, _, attempts = entry
+            if attempts >= self.max_retries:
+                raise CohortRunError(
+                    f"Chunk {index} failed after {attempts + 1} attempts: a worker process died",
+                    index,
+                )
+            entry[3] = self._submit(buffer)
+            entry[4] = attempts + 1
+
+    def next_result(self) -> Tuple[int, List[str], bytes]:
+        """Wait for the oldest chunk and return (index, ids, summary buffer)."""
+        while True:
+            entry = self._pending[0]
+            index, ids, buffer, future, _ = entry
+            if future is None:
+                future = entry[3] = self._submit(buffer)
+            try:
+                with stage("cohort_wait_workers"):
+                    result = future.result()
+            except BrokenProcessPool:
+                self._restart()
+                continue
+            except Exception as exc:
+                raise CohortRunError(f"Chunk {index} failed: {exc}", index) from exc
+            self._pending.popleft()
+            if self._suspects:
+                self._suspects.discard(index)
+                if not self._suspects:
+                    self._release()
+            return index, ids, result
+
+    def _release(self) -> None:
+        """Submit the chunks held back while suspects ran alone."""
+        for entry in self._pending:
+            if entry[3] is None:
+                entry[3] = self._submit(entry[2])
+
+    def close(self) -> None:
+        for entry in self._pending:
+            if entry[3] is not None:
+                entry[3].cancel()
+        self._executor.shutdown(wait=True)
+
+
+def run_cohort(
+    input_path: Path,
+    output: TextIO,
+    chunk_size: int = 10000,
+    workers: int = 1,
+    start_chunk: int = 0,
+    write_header: bool = True,
+    on_chunk_written: Optional[Callable[[int, int], None]] = None,
+    max_retries: int = 2,
+    summarize: Callable[[bytes], bytes] = summarize_packed,
+    on_chunk_summary: Optional[Callable[[Dict[str, List[float]], Mapping[str, Sequence]], None]] = None,
+) -> CohortRunStats:
+    """
+    Simulate every profile in `input_path` and write one summary row per
+    profile to `output`, in input order.
+
+    With several `workers`, chunks are sharded across a process pool as
+    packed float64 buffers (see pack_chunk) and at most two chunks per
+    worker are in flight, so memory stays bounded regardless of the cohort
+    size. Chunks lost to a crashed worker are run again; a chunk that
+    crashes its worker more than `max_retries` times raises CohortRunError.
+
+    `start_chunk` skips chunks already written by an earlier run, and
+    `on_chunk_written(chunk_index, profiles)` is called after each chunk is
+    written, e.g. to checkpoint progress (see run_cohort_to_path).
+    `on_chunk_summary(columns, summary)` receives each chunk's parsed
+    profile columns with its summary columns, in input order, e.g. to
+    aggregate a report (see cohort_report).
+    """
+    start = time.perf_counter()
+    writer = csv.writer(output)
+    if write_header:
+        writer.writerow((EMPLOYEE_ID_COLUMN,) + SUMMARY_FIELDS)
+    profiles = 0
+    chunks = 0
+
+    def write(index: int, ids: List[str], summary: Mapping[str, Sequence], columns) -> None:
+        nonlocal profiles, chunks
+        if on_chunk_summary is not None:
+            with stage("cohort_aggregate"):
+                on_chunk_summary(columns, summary)
+        with stage("cohort_write"):
+            writer.writerows(zip(ids, *(summary[name] for name in SUMMARY_FIELDS)))
+        profiles += len(ids)
+        chunks += 1
+        if on_chunk_written is not None:
+            on_chunk_written(index, profiles)
+
+    def read_chunks() -> Iterator[Tuple[int, List[str], Dict[str, List[float]]]]:
+        numbered = enumerate(iter_profile_chunks(input_path, chunk_size, start_chunk), start_chunk)
+        while True:
+            with stage("cohort_read"):
+                chunk = next(numbered, None)
+            if chunk is None:
+                return
+            index, (ids, columns) = chunk
+            count("profiles", len(ids))
+            yield index, ids, columns
+
+    retries = 0
+    if workers > 1:
+        pool = _ShardPool(workers, max_retries, summarize)
+        # Columns of in-flight chunks, kept only for on_chunk_summary
+        pending_columns: Dict[int, Dict[str, List[float]]] = {}
+
+        def write_next() -> None:
+            done_index, done_ids, result = pool.next_result()
+            columns = pending_columns.pop(done_index, None)
+            write(done_index, done_ids, unpack_summary(result, len(done_ids)), columns)
+
+        try:
+            for index, ids, columns in read_chunks():
+                pool.submit(index, ids, pack_chunk(columns))
+                if on_chunk_summary is not None:
+                    pending_columns[index] = columns
+                if len(pool) >= 2 * workers:
+                    write_next()
+            while len(pool):
+                write_next()
+        finally:
+            pool.close()
+            retries = pool.retries
+    else:
+        for index, ids, columns in read_chunks():
+            try:
+                with stage("cohort_simulate"):
+                    summary = summarize_chunk(columns)
+            except Exception as exc:
+                raise CohortRunError(f"Chunk {index} failed: {exc}", index) from exc
+            write(index, ids, summary, columns)
+
+    return CohortRunStats(
+        profiles=profiles, seconds=time.perf_counter() - start, chunks=chunks, retries=retries
+    )
+
+
+# ------------------------------------------
+# Checkpointed Runs
+# ------------------------------------------
+def checkpoint_path_for(output_path: Path) -> Path:
+    return Path(f"{output_path}.checkpoint")
+
+
+def _input_signature(input_path: Path, chunk_size: int) -> dict:
+    stat = Path(input_path).stat()
+    return {
+        "input": str(Path(input_path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "chunk_size": chunk_size,
+    }
+
+
+def _load_checkpoint(checkpoint_path: Path, signature: dict) -> Optional[dict]:
+    if not checkpoint_path.exists():
+        return None
+    with open(checkpoint_path, encoding="utf-8") as file:
+        checkpoint = json.load(file)
+    if checkpoint.get("signature") != signature:
+        raise ValueError(
+            f"Checkpoint {checkpoint_path} was written for a different input or chunk size"
+        )
+    return checkpoint
+
+
+def _write_checkpoint(checkpoint_path: Path, checkpoint: dict) -> None:
+    temporary = Path(f"{checkpoint_path}.tmp")
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+    os.replace(temporary, checkpoint_path)
+
+
+def run_cohort_to_path(
+    input_path: Path,
+    output_path: Optional[Path],
+    chunk_size: int = 10000,
+    workers: int = 1,
+    resume: bool = False,
+    max_retries: int = 2,
+    on_chunk_summary: Optional[Callable[[Dict[str, List[float]], Mapping[str, Sequence]], None]] = None,
+) -> CohortRunStats:
+    """
+    run_cohort writing to `output_path`, or to stdout when it is None.
+
+    When writing to a file, progress is checkpointed after every chunk to
+    `<output_path>.checkpoint`, which is removed once the run completes.
+    With `resume`, a run interrupted by a crash or a CohortRunError
+    continues after the last chunk recorded there; output written after
+    that chunk is discarded first. `on_chunk_summary` is passed to
+    run_cohort; it only sees the chunks simulated by this call, so it
+    cannot be combined with `resume`.
+    """
+    if resume and on_chunk_summary is not None:
+        raise ValueError("Chunk summaries of a resumed run would miss the chunks already written")
+    if output_path is None:
+        if resume:
+            raise ValueError("Resuming requires an output file")
+        return run_cohort(
+            input_path,
+            sys.stdout,
+            chunk_size,
+            workers,
+            max_retries=max_retries,
+            on_chunk_summary=on_chunk_summary,
+        )
+
+    output_path = Path(output_path)
+    checkpoint_path = checkpoint_path_for(output_path)
+    signature = _input_signature(input_path, chunk_size)
+    checkpoint = _load_checkpoint(checkpoint_path, signature) if resume else None
+    if checkpoint is not None and not output_path.exists():
+        raise ValueError(f"Cannot resume: {output_path} no longer exists")
+
+    if checkpoint is None:
+        output = open(output_path, "w", newline="", encoding="utf-8")
+        start_chunk, done_profiles = 0, 0
+    else:
+        output = open(output_path, "r+", newline="", encoding="utf-8")
+        output.seek(checkpoint["output_bytes"])
+        output.truncate()
+        start_chunk, done_profiles = checkpoint["chunks"], checkpoint["profiles"]
+
+    def on_chunk_written(index: int, profiles: int) -> None:
+        output.flush()
+        _write_checkpoint(
+            checkpoint_path,
+            {
+                "signature": signature,
+                "chunks": index + 1,
+                "profiles": done_profiles + profiles,
+                "output_bytes": output.tell(),
+            },
+        )
+
+    with output:
+        if checkpoint is None:
+            # Header-only checkpoint, so a run failing on its first chunk can resume
+            csv.writer(output).writerow((EMPLOYEE_ID_COLUMN,) + SUMMARY_FIELDS)
+            on_chunk_written(-1, 0)
+        stats = run_cohort(
+            input_path,
+            output,
+            chunk_size,
+            workers,
+            start_chunk=start_chunk,
+            write_header=False,
+            on_chunk_written=on_chunk_written,
+            max_retries=max_retries,
+            on_chunk_summary=on_chunk_summary,
+        )
+    checkpoint_path.unlink()
+    return stats
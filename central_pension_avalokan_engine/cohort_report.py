@@ -0,0 +1,250 @@
+import csv
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+from .quantile_sketch import QuantileSketch
+
+
+DEFAULT_PAY_EDGES = (25_000.0, 50_000.0, 75_000.0, 100_000.0, 150_000.0)
+DEFAULT_SERVICE_EDGES = (10.0, 20.0, 30.0)
+REPORT_PERCENTILES = (10, 50, 90)
+TOTAL_FIELDS = ("ups_pension", "nps_annuity", "ups_corpus", "nps_corpus")
+ALL_GROUPS = "all"
+
+# Bump when the saved aggregate layout changes
+REPORT_STATE_VERSION = 1
+
+
+def band_labels(edges: Sequence[float]) -> List[str]:
+    """Labels of the bands split by `edges`: <e0, e0-e1, ..., >=en."""
+    edges = [f"{edge:g}" for edge in edges]
+    if not edges:
+        return [ALL_GROUPS]
+    return [f"<{edges[0]}"] + [f"{low}-{high}" for low, high in zip(edges, edges[1:])] + [f">={edges[-1]}"]
+
+
+def _band_edges(edges: Sequence[float]) -> Tuple[float, ...]:
+    edges = tuple(float(edge) for edge in edges)
+    if any(low >= high for low, high in zip(edges, edges[1:])):
+        raise ValueError("Band edges must be strictly increasing.")
+    return edges
+
+
+# ------------------------------------------
+# Group Accumulator
+# ------------------------------------------
+@dataclass
+class GroupStats:
+    """
+    Running statistics of one group: employee count, how many get a larger
+    UPS pension than NPS annuity, totals, and a sketch of the monthly UPS
+    pension minus NPS annuity.
+    """
+
+    relative_accuracy: float = 0.005
+    employees: int = 0
+    ups_wins: int = 0
+    totals: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(TOTAL_FIELDS, 0.0))
+    ups_minus_nps: Optional[QuantileSketch] = None
+
+    def __post_init__(self):
+        if self.ups_minus_nps is None:
+            self.ups_minus_nps = QuantileSketch(self.relative_accuracy)
+
+    def add(self, summary: Mapping[str, np.ndarray]) -> None:
+        difference = summary["ups_pension"] - summary["nps_annuity"]
+        self.employees += len(difference)
+        self.ups_wins += int(np.count_nonzero(difference > 0))
+        for name in TOTAL_FIELDS:
+            self.totals[name] += float(summary[name].sum())
+        self.ups_minus_nps.add(difference)
+
+    def merge(self, other: "GroupStats") -> None:
+        self.employees += other.employees
+        self.ups_wins += other.ups_wins
+        for name in TOTAL_FIELDS:
+            self.totals[name] += other.totals[name]
+        self.ups_minus_nps.merge(other.ups_minus_nps)
+
+    def to_dict(self) -> dict:
+        return {
+            "employees": self.employees,
+            "ups_wins": self.ups_wins,
+            "totals": self.totals,
+            "ups_minus_nps": self.ups_minus_nps.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "GroupStats":
+        sketch = QuantileSketch.from_dict(state["ups_minus_nps"])
+        return cls(
+            relative_accuracy=sketch.relative_accuracy,
+            employees=state["employees"],
+            ups_wins=state["ups_wins"],
+            totals=dict(state["totals"]),
+            ups_minus_nps=sketch,
+        )
+
+    def report_row(self) -> dict:
+        percentiles = self.ups_minus_nps.quantiles(p / 100 for p in REPORT_PERCENTILES)
+        row = {
+            "employees": self.employees,
+            "ups_wins_share": self.ups_wins / self.employees if self.employees else math.nan,
+            "mean_ups_minus_nps_pension": self.ups_minus_nps.mean,
+        }
+        row.update(
+            (f"p{percentile}_ups_minus_nps_pension", value)
+            for percentile, value in zip(REPORT_PERCENTILES, percentiles)
+        )
+        row.update((f"total_{name}", self.totals[name]) for name in TOTAL_FIELDS)
+        return row
+
+
+# ------------------------------------------
+# Cohort Aggregator
+# ------------------------------------------
+class CohortAggregator:
+    """
+    Streaming group-by of cohort results by pay level (current basic pay
+    band) and service band (current service years). Memory depends on the
+    number of groups and the sketch accuracy, not on the cohort size.
+
+    Feed it chunk by chunk with add_chunk, e.g. as the on_chunk_summary
+    callback of cohort.run_cohort. Aggregators of shards of a cohort can be
+    saved, loaded and merged, giving the same report as one run over the
+    whole cohort. Profiles with no simulated year are left out.
+    """
+
+    def __init__(
+        self,
+        pay_edges: Sequence[float] = DEFAULT_PAY_EDGES,
+        service_edges: Sequence[float] = DEFAULT_SERVICE_EDGES,
+        relative_accuracy: float = 0.005,
+    ):
+        self.pay_edges = _band_edges(pay_edges)
+        self.service_edges = _band_edges(service_edges)
+        self.relative_accuracy = relative_accuracy
+        self.pay_labels = band_labels(self.pay_edges)
+        self.service_labels = band_labels(self.service_edges)
+        self.groups: Dict[Tuple[int, int], GroupStats] = {}
+
+    def _group(self, key: Tuple[int, int]) -> GroupStats:
+        stats = self.groups.get(key)
+        if stats is None:
+            stats = self.groups[key] = GroupStats(self.relative_accuracy)
+        return stats
+
+    def add_chunk(self, columns: Mapping[str, Sequence[float]], summary: Mapping[str, Sequence[float]]) -> None:
+        """Add a chunk of profile columns and their retirement summary columns."""
+        simulated = np.asarray(summary["year"], dtype=np.int64) > 0
+        values = {name: np.asarray(summary[name], dtype=np.float64)[simulated] for name in TOTAL_FIELDS}
+        pay_band = np.searchsorted(
+            self.pay_edges, np.asarray(columns["current_basic_pay"], dtype=np.float64)[simulated], side="right"
+        )
+        service_band = np.searchsorted(
+            self.service_edges, np.asarray(columns["current_service"], dtype=np.float64)[simulated], side="right"
+        )
+
+        # Sort by group once, then hand each group a contiguous slice
+        codes = pay_band * len(self.service_labels) + service_band
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        values = {name: column[order] for name, column in values.items()}
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else []
+        ends = list(starts[1:]) + [len(codes)]
+        for start, end in zip(starts, ends):
+            key = divmod(int(codes[start]), len(self.service_labels))
+            self._group(key).add({name: column[start:end] for name, column in values.items()})
+
+    def merge(self, other: "CohortAggregator") -> None:
+        """Merge the aggregates of another shard with the same bands and accuracy."""
+        if (other.pay_edges, other.service_edges, other.relative_accuracy) != (
+            self.pay_edges,
+            self.service_edges,
+            self.relative_accuracy,
+        ):
+            raise ValueError("Cannot merge aggregates with different bands or accuracy.")
+        for key, stats in other.groups.items():
+            self._group(key).merge(stats)
+
+    def total(self) -> GroupStats:
+        total = GroupStats(self.relative_accuracy)
+        for stats in self.groups.values():
+            total.merge(stats)
+        return total
+
+    def report(self) -> List[dict]:
+        """One row per non-empty group, by pay then service band, then an all-groups row."""
+        rows = []
+        for (pay_band, service_band), stats in sorted(self.groups.items()):
+            row = {"pay_level": self.pay_labels[pay_band], "service_band": self.service_labels[service_band]}
+            row.update(stats.report_row())
+            rows.append(row)
+        row = {"pay_level": ALL_GROUPS, "service_band": ALL_GROUPS}
+        row.update(self.total().report_row())
+        rows.append(row)
+        return rows
+
+    def write_report(self, output: TextIO) -> None:
+        rows = self.report()
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    # Persistence, for combining sharded runs
+    def to_dict(self) -> dict:
+        return {
+            "version": REPORT_STATE_VERSION,
+            "pay_edges": self.pay_edges,
+            "service_edges": self.service_edges,
+            "relative_accuracy": self.relative_accuracy,
+            "groups": [
+                [pay_band, service_band, stats.to_dict()]
+                for (pay_band, service_band), stats in sorted(self.groups.items())
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "CohortAggregator":
+        if not isinstance(state, dict):
+            raise ValueError("Malformed report state: expected a JSON object")
+        if state.get("version") != REPORT_STATE_VERSION:
+            raise ValueError(f"Unsupported report state version: {state.get('version')}")
+        try:
+            aggregator = cls(state["pay_edges"], state["service_edges"], state["relative_accuracy"])
+            for pay_band, service_band, stats in state["groups"]:
+                aggregator.groups[(pay_band, service_band)] = GroupStats.from_dict(stats)
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"Malformed report state: {exc!r}")
+        return aggregator
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CohortAggregator":
+        with open(path, encoding="utf-8") as file:
+            try:
+                return cls.from_dict(json.load(file))
+            except ValueError as exc:
+                raise ValueError(f"{path}: {exc}")
+
+
+def merge_report_states(paths: Iterable[Union[str, Path]]) -> CohortAggregator:
+    """Load and merge aggregates saved by shards of one cohort."""
+    merged: Optional[CohortAggregator] = None
+    for path in paths:
+        aggregator = CohortAggregator.load(path)
+        if merged is None:
+            merged = aggregator
+        else:
+            merged.merge(aggregator)
+    if merged is None:
+        raise ValueError("At least one report state is required.")
+    return merged
@@ -0,0 +1,209 @@
+import configparser
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import MISSING, asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+
+from .pension_compare_params import PensionCompareParams
+from .cohort import EMPLOYEE_ID_COLUMN, SUMMARY_FIELDS, CohortRunStats, summarize_chunk
+
+
+PERSONAL_SECTION = "personal_data"
+ASSUMPTIONS_SECTION = "assumptions"
+INT_FIELDS = ("current_service", "years_to_retire")
+REQUIRED_FIELDS = tuple(f.name for f in fields(PensionCompareParams) if f.default is MISSING)
+ASSUMPTION_FIELDS = tuple(f.name for f in fields(PensionCompareParams) if f.default is not MISSING)
+
+# Bump when read_params_file changes, so cached entries are reparsed
+CONFIG_CACHE_VERSION = 1
+
+
+# ------------------------------------------
+# Parsing
+# ------------------------------------------
+def _convert(name: str, value: str, file_path: Union[str, Path]):
+    try:
+        return int(value) if name in INT_FIELDS else float(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for {name} in {file_path}: {value!r}")
+
+
+def read_params_file(file_path: Union[str, Path]) -> PensionCompareParams:
+    """
+    Parse an .ini file (same layout as `from-file`) straight into
+    PensionCompareParams, without the argparse round-trip.
+    """
+    config = configparser.ConfigParser()
+    if not config.read(file_path):
+        raise ValueError(f"Cannot read {file_path}")
+
+    if not config.has_section(PERSONAL_SECTION):
+        raise ValueError(f"Missing [{PERSONAL_SECTION}] section in {file_path}")
+    missing = [name for name in REQUIRED_FIELDS if not config.has_option(PERSONAL_SECTION, name)]
+    if missing:
+        raise ValueError(
+            f"Missing argument(s) in [{PERSONAL_SECTION}] section: {', '.join(missing)}"
+        )
+
+    values = {
+        name: _convert(name, config.get(PERSONAL_SECTION, name), file_path)
+        for name in REQUIRED_FIELDS
+    }
+    if config.has_section(ASSUMPTIONS_SECTION):
+        for name, value in config.items(ASSUMPTIONS_SECTION):
+            if name not in ASSUMPTION_FIELDS:
+                raise ValueError(f"Unknown assumption {name} in {file_path}")
+            values[name] = _convert(name, value, file_path)
+    return PensionCompareParams(**values)
+
+
+def _parse_entry(path: str) -> Tuple[str, int, int, Optional[dict], Optional[str]]:
+    """(path, mtime_ns, size, params fields or None, error or None) of one file."""
+    try:
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size, asdict(read_params_file(path)), None
+    except (ValueError, configparser.Error, OSError) as exc:
+        # configparser.Error: no section header, duplicate options, bad lines
+        return path, 0, 0, None, str(exc)
+
+
+def find_config_files(source: Union[str, Path]) -> List[str]:
+    """Every .ini file of a directory, or the files matching a glob, sorted."""
+    if os.path.isdir(source):
+        pattern = os.path.join(os.fspath(source), "*.ini")
+    else:
+        pattern = os.fspath(source)
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+# ------------------------------------------
+# Parsed-config Cache
+# ------------------------------------------
+class ConfigCache:
+    """
+    Parsed params of .ini files keyed by absolute path, reused while the
+    file's mtime and size are unchanged. Persisted as JSON at `path`.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else None
+        self.entries: Dict[str, list] = {}
+        self.dirty = False
+        if self.path is not None and self.path.exists():
+            with open(self.path, encoding="utf-8") as file:
+                document = json.load(file)
+            if document.get("version") == CONFIG_CACHE_VERSION:
+                self.entries = document["entries"]
+
+    def get(self, path: str) -> Optional[dict]:
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None:
+            return None
+        mtime_ns, size, values = entry
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Gone or unreadable: reparsing reports it
+            return None
+        if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+            return None
+        return values
+
+    def put(self, path: str, mtime_ns: int, size: int, values: dict) -> None:
+        self.entries[os.path.abspath(path)] = [mtime_ns, size, values]
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        temporary = Path(f"{self.path}.tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"version": CONFIG_CACHE_VERSION, "entries": self.entries}, file)
+        os.replace(temporary, self.path)
+        self.dirty = False
+
+
+@dataclass
+class LoadedConfigs:
+    paths: List[str]
+    params: List[PensionCompareParams]
+    errors: Dict[str, str] = field(default_factory=dict)
+    parsed: int = 0
+    cached: int = 0
+
+
+def load_config_files(
+    paths: List[str],
+    workers: int = 1,
+    cache: Optional[ConfigCache] = None,
+    chunksize: int = 256,
+) -> LoadedConfigs:
+    """
+    Parse .ini files into PensionCompareParams, in input order. Files
+    unchanged since they were cached are not reparsed; the rest are parsed
+    across `workers` processes. Files that fail to parse are reported in
+    `errors` and left out.
+    """
+    cache = cache if cache is not None else ConfigCache()
+    values: Dict[str, dict] = {}
+    to_parse = []
+    for path in paths:
+        cached = cache.get(path)
+        if cached is None:
+            to_parse.append(path)
+        else:
+            values[path] = cached
+
+    if workers > 1 and len(to_parse) > chunksize:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = list(executor.map(_parse_entry, to_parse, chunksize=chunksize))
+    else:
+        entries = [_parse_entry(path) for path in to_parse]
+
+    errors = {}
+    for path, mtime_ns, size, parsed, error in entries:
+        if error is not None:
+            errors[path] = error
+            continue
+        cache.put(path, mtime_ns, size, parsed)
+        values[path] = parsed
+
+    loaded_paths = [path for path in paths if path in values]
+    return LoadedConfigs(
+        paths=loaded_paths,
+        params=[PensionCompareParams(**values[path]) for path in loaded_paths],
+        errors=errors,
+        parsed=len(to_parse),
+        cached=len(paths) - len(to_parse),
+    )
+
+
+# ------------------------------------------
+# Batch Simulation
+# ------------------------------------------
+def run_params(
+    ids: List[str],
+    params: List[PensionCompareParams],
+    output: TextIO,
+    chunk_size: int = 10000,
+) -> CohortRunStats:
+    """
+    Simulate already parsed profiles with the batch engine and write the
+    same summary CSV as the batch subcommand.
+    """
+    start = time.perf_counter()
+    writer = csv.writer(output)
+    writer.writerow((EMPLOYEE_ID_COLUMN,) + SUMMARY_FIELDS)
+    names = [f.name for f in fields(PensionCompareParams)]
+    for offset in range(0, len(params), chunk_size):
+        chunk = params[offset:offset + chunk_size]
+        summary = summarize_chunk({name: [getattr(p, name) for p in chunk] for name in names})
+        writer.writerows(
+            zip(ids[offset:offset + chunk_size], *(summary[name] for name in SUMMARY_FIELDS))
+        )
+    return CohortRunStats(profiles=len(params), seconds=time.perf_counter() - start)
@@ -1,23 +1,123 @@
-from dataclasses import dataclass
-from .corpus_info import CorpusInfo
-from .corpus_growth_calculation import calculate_accumulated_corpus
-from .pension_compare_params import PensionCompareParams
+from operator import attrgetter
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from .corpus_info import CorpusInfo, ColumnarCorpusInfo, YearlyCorpusInfo
+from .instrumentation import active_recorder, stage
+from .corpus_growth_calculation import (
+    calculate_scheduled_corpus,
+    calculate_final_corpus_info,
+)
+from .pension_compare_params import AssumptionSchedule, PensionCompareParams
 
 
 # ------------------------------------------
 # Corpus Growth Simulation
 # ------------------------------------------
-def get_corpus_info(params: PensionCompareParams) -> CorpusInfo:
-    corpus_history = CorpusInfo()
+def get_corpus_info(
+    params: PensionCompareParams,
+    final_only: bool = False,
+    columnar: bool = False,
+    schedule: Optional[AssumptionSchedule] = None,
+) -> CorpusInfo:
+    """
+    Simulate the corpus year by year until retirement.
 
-    for year in range(params.years_to_retire):
-        prev_info = corpus_history.last()
-        corpus_info = calculate_accumulated_corpus(year, params, prev_info)
-        corpus_history.add(corpus_info)
+    With `final_only`, the returned history holds just the retirement year,
+    computed in closed form without building the intermediate years. With
+    `columnar`, the history is stored in a compact ColumnarCorpusInfo.
+    `schedule` applies per-year assumption overrides (see
+    AssumptionSchedule).
+    """
+    corpus_history = ColumnarCorpusInfo() if columnar else CorpusInfo()
+
+    recorder = active_recorder()
+    if final_only and not schedule:
+        with stage("final_corpus_closed_form"):
+            final_info = calculate_final_corpus_info(params)
+            if final_info is not None:
+                corpus_history.add(final_info)
+                if recorder is not None:
+                    recorder.count("rows_built")
+        return corpus_history
+
+    if recorder is not None:
+        recorder.count("years_simulated", max(params.years_to_retire, 0))
+        recorder.count("rows_built", max(params.years_to_retire, 0))
+
+    if final_only:
+        # A schedule breaks the closed form; simulate without keeping rows
+        with stage("simulate_years"):
+            corpus_info = final_year(iter_corpus_info(params, schedule))
+            if corpus_info is not None:
+                corpus_history.add(corpus_info)
+        return corpus_history
+
+    with stage("simulate_years"):
+        for corpus_info in iter_corpus_info(params, schedule):
+            corpus_history.add(corpus_info)
 
     return corpus_history
 
 
+# ------------------------------------------
+# Streaming Simulation
+# ------------------------------------------
+def iter_corpus_info(
+    params: PensionCompareParams,
+    schedule: Optional[AssumptionSchedule] = None,
+) -> Iterator[YearlyCorpusInfo]:
+    """
+    Yield the YearlyCorpusInfo of each year until retirement, computing
+    each year only when it is requested. Only the previous year is kept,
+    so callers can stream rows into an exporter or stop early.
+    """
+    corpus_info = None
+    for year in range(params.years_to_retire):
+        corpus_info = calculate_scheduled_corpus(year, params, corpus_info, schedule)
+        yield corpus_info
+
+
+def final_year(rows: Iterable[YearlyCorpusInfo]) -> Optional[YearlyCorpusInfo]:
+    """Consume `rows` and return the last one, or None if there are none."""
+    last = None
+    for last in rows:
+        pass
+    return last
+
+
+def max_year(
+    rows: Iterable[YearlyCorpusInfo],
+    key: Union[str, Callable[[YearlyCorpusInfo], float]],
+) -> Optional[YearlyCorpusInfo]:
+    """
+    Return the row with the largest `key`, a YearlyCorpusInfo field name or
+    a function of the row; the earliest such row on ties, None if empty.
+    """
+    key_func = attrgetter(key) if isinstance(key, str) else key
+    best, best_value = None, None
+    for row in rows:
+        value = key_func(row)
+        if best is None or value > best_value:
+            best, best_value = row, value
+    return best
+
+
+def first_year_where(
+    rows: Iterable[YearlyCorpusInfo],
+    predicate: Callable[[YearlyCorpusInfo], bool],
+) -> Optional[YearlyCorpusInfo]:
+    """
+    Return the first row satisfying `predicate`, or None. Stops consuming
+    `rows` there, so later years of iter_corpus_info are never computed:
+
+        first_year_where(iter_corpus_info(params), lambda row: row.nps_corpus > 1e7)
+    """
+    for row in rows:
+        if predicate(row):
+            return row
+    return None
+
+
 # ------------------------------------------
 # Main Entry Point (Demo)
 # ------------------------------------------
@@ -0,0 +1,207 @@
+import csv
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Union
+
+from .corpus_info import CORPUS_FIELDS, CorpusInfo, YearlyCorpusInfo
+from .instrumentation import count, stage
+
+
+EMPLOYEE_ID_COLUMN = "employee_id"
+
+
+def _fieldnames(employee_id_column: bool) -> List[str]:
+    return ([EMPLOYEE_ID_COLUMN] if employee_id_column else []) + list(CORPUS_FIELDS)
+
+
+# ------------------------------
+# CSV Export
+# ------------------------------
+class CorpusCsvWriter:
+    """
+    Stream corpus history rows to a CSV file without building intermediate
+    dicts. Histories of many employees can be written (or appended) to one
+    file by enabling the employee id column.
+
+    Usage:
+        with CorpusCsvWriter("cohort.csv", employee_id_column=True) as writer:
+            for employee_id, history in histories:
+                writer.write_history(history, employee_id)
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        employee_id_column: bool = False,
+        append: bool = False,
+    ):
+        self.file_path = Path(file_path)
+        self.employee_id_column = employee_id_column
+        self.rows_written = 0
+
+        write_header = not (append and self.file_path.exists() and self.file_path.stat().st_size)
+        if not write_header:
+            self._check_header()
+        self._file = open(self.file_path, mode="a" if append else "w", newline="", encoding="utf-8")
+        self._start_offset = self._file.tell()
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(_fieldnames(employee_id_column))
+
+    def _check_header(self) -> None:
+        """Refuse to append rows whose columns differ from the existing file's."""
+        with open(self.file_path, newline="", encoding="utf-8") as file:
+            header = next(csv.reader(file), [])
+        expected = _fieldnames(self.employee_id_column)
+        if header != expected:
+            raise ValueError(
+                f"Cannot append to {self.file_path}: its header {header} differs from {expected}"
+            )
+
+    def _prefix(self, employee_id: Any) -> list:
+        if self.employee_id_column:
+            if employee_id is None:
+                raise ValueError("employee_id is required when the employee id column is enabled.")
+            return [employee_id]
+        return []
+
+    def write_rows(self, rows: Iterable[YearlyCorpusInfo], employee_id: Any = None) -> int:
+        """Write YearlyCorpusInfo-like rows (or row views) and return the count."""
+        prefix = self._prefix(employee_id)
+        written = 0
+        with stage("export_csv"):
+            for row in rows:
+                self._writer.writerow(prefix + [getattr(row, name) for name in CORPUS_FIELDS])
+                written += 1
+        self.rows_written += written
+        return written
+
+    def write_history(self, history: CorpusInfo, employee_id: Any = None) -> int:
+        """Write every entry of a corpus history."""
+        return self.write_rows((history[i] for i in range(len(history))), employee_id)
+
+    def write_columns(self, columns: Mapping[str, Sequence], employee_id: Any = None) -> int:
+        """
+        Write a columnar batch, e.g. ColumnarCorpusInfo.column() views or
+        BatchCorpusInfo arrays, keyed by YearlyCorpusInfo field name.
+        """
+        prefix = self._prefix(employee_id)
+        written = 0
+        with stage("export_csv"):
+            for values in zip(*(columns[name] for name in CORPUS_FIELDS)):
+                self._writer.writerow(prefix + list(values))
+                written += 1
+        self.rows_written += written
+        return written
+
+    def close(self) -> None:
+        if not self._file.closed:
+            count("bytes_written", self._file.tell() - self._start_offset)
+            count("rows_written", self.rows_written)
+        self._file.close()
+
+    def __enter__(self) -> "CorpusCsvWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ------------------------------
+# Parquet Export
+# ------------------------------
+class CorpusParquetWriter:
+    """
+    Stream corpus history rows to a Parquet file in row groups of
+    `batch_size` rows. Requires the optional `pyarrow` dependency.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        employee_id_column: bool = False,
+        batch_size: int = 65536,
+    ):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as exc:
+            raise ImportError(
+                "Parquet export requires pyarrow: pip install central_pension_avalokan_engine[parquet]"
+            ) from exc
+
+        self._pa = pyarrow
+        self.file_path = Path(file_path)
+        self.employee_id_column = employee_id_column
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._fieldnames = _fieldnames(employee_id_column)
+        self._buffer: Dict[str, list] = {name: [] for name in self._fieldnames}
+        self._writer = None
+
+    def _append(self, employee_id: Any, values: Sequence) -> None:
+        if self.employee_id_column:
+            if employee_id is None:
+                raise ValueError("employee_id is required when the employee id column is enabled.")
+            self._buffer[EMPLOYEE_ID_COLUMN].append(str(employee_id))
+        for name, value in zip(CORPUS_FIELDS, values):
+            self._buffer[name].append(value)
+        self.rows_written += 1
+        if len(self._buffer["year"]) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[YearlyCorpusInfo], employee_id: Any = None) -> int:
+        """Write YearlyCorpusInfo-like rows (or row views) and return the count."""
+        written = 0
+        for row in rows:
+            self._append(employee_id, [getattr(row, name) for name in CORPUS_FIELDS])
+            written += 1
+        return written
+
+    def write_history(self, history: CorpusInfo, employee_id: Any = None) -> int:
+        """Write every entry of a corpus history."""
+        return self.write_rows((history[i] for i in range(len(history))), employee_id)
+
+    def write_columns(self, columns: Mapping[str, Sequence], employee_id: Any = None) -> int:
+        """Write a columnar batch keyed by YearlyCorpusInfo field name."""
+        written = 0
+        for values in zip(*(columns[name] for name in CORPUS_FIELDS)):
+            self._append(employee_id, values)
+            written += 1
+        return written
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group."""
+        if not self._buffer["year"]:
+            return
+        with stage("export_parquet"):
+            table = self._pa.table({name: values for name, values in self._buffer.items()})
+            if self._writer is None:
+                self._writer = self._pa.parquet.ParquetWriter(str(self.file_path), table.schema)
+            self._writer.write_table(table)
+        self._buffer = {name: [] for name in self._fieldnames}
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            count("bytes_written", self.file_path.stat().st_size)
+            count("rows_written", self.rows_written)
+
+    def __enter__(self) -> "CorpusParquetWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_corpus_writer(
+    file_path: Union[str, Path], employee_id_column: bool = False, append: bool = False
+):
+    """Return a CSV or Parquet writer depending on the file extension."""
+    if os.fspath(file_path).endswith(".parquet"):
+        if append:
+            raise ValueError("Appending to an existing Parquet file is not supported.")
+        return CorpusParquetWriter(file_path, employee_id_column=employee_id_column)
+    return CorpusCsvWriter(file_path, employee_id_column=employee_id_column, append=append)
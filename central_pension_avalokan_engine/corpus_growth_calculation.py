@@ -1,6 +1,13 @@
-from typing import Optional
+from dataclasses import replace
+from functools import lru_cache
+from typing import Optional, Tuple
 
-from .pension_compare_params import PensionCompareParams
+from .pension_compare_params import (
+    AssumptionSchedule,
+    SCHEDULE_FIELDS,
+    SCHEDULE_STATE_FIELDS,
+    PensionCompareParams,
+)
 from .corpus_info import YearlyCorpusInfo, CorpusInfo
 # ---------------------------
 # Constants
@@ -8,6 +15,13 @@ from .corpus_info import YearlyCorpusInfo, CorpusInfo
 NPS_CONTRIB_RATE = 0.24
 UPS_CONTRIB_RATE = 0.20
 
+# Bump whenever a change to the projection or pension formulas alters
+# results, so persisted results (see result_cache) are invalidated
+ENGINE_VERSION = "1"
+
+# Distinct (return_rate, periods_per_year) pairs kept in the factor cache
+COMPOUNDING_FACTOR_CACHE_SIZE = 256
+
 
 # ------------------------------------------
 # Helper Functions
@@ -17,18 +31,94 @@ def calculate_salary(basic_pay: float, da_rate: float) -> float:
     return basic_pay * (1 + da_rate)
 
 
+@lru_cache(maxsize=COMPOUNDING_FACTOR_CACHE_SIZE)
+def get_compounding_factors(return_rate: float, periods_per_year: int = 12) -> Tuple[float, float]:
+    """
+    Return (corpus_growth, annuity_factor) for one year at `return_rate`
+    compounded `periods_per_year` times, so that the corpus after a year is
+    initial_corpus * corpus_growth + monthly_contrib * annuity_factor.
+
+    Monthly contributions are pooled into equal deposits at the end of each
+    compounding period. Results are memoized in a bounded LRU cache; see
+    compounding_factor_cache_info().
+    """
+    r = return_rate / periods_per_year
+    n = periods_per_year
+
+    if r == 0:
+        return 1.0, 12.0
+
+    corpus_growth = (1 + r)**n
+    annuity_factor = ((1 + r)**n - 1) / r
+    if periods_per_year != 12:
+        annuity_factor *= 12 / periods_per_year
+    return corpus_growth, annuity_factor
+
+
+def compounding_factor_cache_info():
+    """Return hits, misses, maxsize and currsize of the compounding factor cache."""
+    return get_compounding_factors.cache_info()
+
+
 def get_yearly_accumulated_corpus(
-    initial_corpus: float, return_rate: float, monthly_contrib: float
+    initial_corpus: float,
+    return_rate: float,
+    monthly_contrib: float,
+    periods_per_year: int = 12,
 ) -> float:
-    r = return_rate / 12
-    n = 12
+    corpus_growth, annuity_factor = get_compounding_factors(return_rate, periods_per_year)
+    return initial_corpus * corpus_growth + monthly_contrib * annuity_factor
 
-    if r == 0:
-        return initial_corpus + monthly_contrib * n
 
-    fv_corpus = initial_corpus * (1 + r)**n
-    fv_contrib = monthly_contrib * (((1 + r)**n - 1) / r)
-    return fv_corpus + fv_contrib
+def _compose_growth(first: tuple, second: tuple, da_hike: float) -> tuple:
+    """
+    Compose two multi-year corpus growth maps, `first` applied before
+    `second`. A map over n years is (n, A**n, g**n, alpha, beta) such that
+
+        corpus_n = A**n * corpus_0 + rate * (alpha * B_0 + beta * B_0 * d_0)
+
+    for a constant yearly growth A, basic pay B growing by g and DA rate d
+    growing by `da_hike`.
+    """
+    m, growth_m, pay_growth_m, alpha_m, beta_m = first
+    n, growth_n, pay_growth_n, alpha_n, beta_n = second
+    return (
+        m + n,
+        growth_n * growth_m,
+        pay_growth_n * pay_growth_m,
+        growth_n * alpha_m + pay_growth_m * (alpha_n + beta_n * m * da_hike),
+        growth_n * beta_m + beta_n * pay_growth_m,
+    )
+
+
+def get_accumulated_corpus_after(
+    years: int,
+    initial_corpus: float,
+    return_rate: float,
+    contrib_rate: float,
+    basic_pay: float,
+    da_rate: float,
+    basic_pay_hike: float,
+    da_hike: float,
+) -> float:
+    """
+    Corpus after `years` yearly get_yearly_accumulated_corpus steps with a
+    monthly contribution of contrib_rate * basic_pay * (1 + da_rate), where
+    basic pay grows geometrically and DA linearly. Runs in O(log years).
+    """
+    yearly_growth, annuity_factor = get_compounding_factors(return_rate)
+    pay_growth = 1 + basic_pay_hike
+
+    result = (0, 1.0, 1.0, 0.0, 0.0)
+    step = (1, yearly_growth, pay_growth, annuity_factor, annuity_factor)
+    while years:
+        if years & 1:
+            result = _compose_growth(result, step, da_hike)
+        step = _compose_growth(step, step, da_hike)
+        years >>= 1
+
+    _, growth, _, alpha, beta = result
+    return growth * initial_corpus + contrib_rate * (alpha + beta * da_rate) * basic_pay
 
 # ------------------------------------------
 # Annual Calculation
@@ -36,8 +126,15 @@ def get_yearly_accumulated_corpus(
 def calculate_accumulated_corpus(
     calculation_year: int,
     params: PensionCompareParams,
-    last_year_corpus_info: Optional[YearlyCorpusInfo] = None
+    last_year_corpus_info: Optional[YearlyCorpusInfo] = None,
+    basic_pay: Optional[float] = None,
+    da_rate: Optional[float] = None,
 ) -> YearlyCorpusInfo:
+    """
+    Simulate one year. `basic_pay` and `da_rate`, when given, replace the
+    values carried over from the previous year (e.g. after a pay revision).
+    """
+    start_basic_pay, start_da_rate = basic_pay, da_rate
     if last_year_corpus_info is None:
         annual_expense = params.current_annual_expense * (
             1 + params.expected_rate_of_inflation
@@ -55,6 +152,11 @@ def calculate_accumulated_corpus(
         start_ups_corpus = last_year_corpus_info.ups_corpus
         start_benchmark_corpus = last_year_corpus_info.benchmark_corpus
 
+    if start_basic_pay is not None:
+        basic_pay = start_basic_pay
+    if start_da_rate is not None:
+        da_rate = start_da_rate
+
     salary = calculate_salary(basic_pay, da_rate)
 
     # Contributions
@@ -82,3 +184,80 @@ def calculate_accumulated_corpus(
         benchmark_corpus=get_yearly_accumulated_corpus(start_benchmark_corpus, params.expected_benchmark_corpus_return, benchmark_contrib),
     )
 
+
+def calculate_scheduled_corpus(
+    calculation_year: int,
+    params: PensionCompareParams,
+    last_year_corpus_info: Optional[YearlyCorpusInfo] = None,
+    schedule: Optional[AssumptionSchedule] = None,
+) -> YearlyCorpusInfo:
+    """
+    calculate_accumulated_corpus applying the schedule entry for this year,
+    if any. See AssumptionSchedule.
+    """
+    overrides = schedule.get(calculation_year + 1) if schedule else None
+    if not overrides:
+        return calculate_accumulated_corpus(calculation_year, params, last_year_corpus_info)
+
+    unknown = set(overrides) - set(SCHEDULE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown schedule field(s): {', '.join(sorted(unknown))}")
+    assumptions = {k: v for k, v in overrides.items() if k not in SCHEDULE_STATE_FIELDS}
+    return calculate_accumulated_corpus(
+        calculation_year,
+        replace(params, **assumptions) if assumptions else params,
+        last_year_corpus_info,
+        basic_pay=overrides.get("basic_pay"),
+        da_rate=overrides.get("da_rate"),
+    )
+
+
+# ------------------------------------------
+# Retirement-only Calculation
+# ------------------------------------------
+def calculate_final_corpus_info(params: PensionCompareParams) -> Optional[YearlyCorpusInfo]:
+    """
+    Return the retirement-year YearlyCorpusInfo without simulating the
+    intermediate years. Matches the last entry of the year-by-year
+    simulation in core.get_corpus_info, which remains the reference.
+    """
+    years = params.years_to_retire
+    if years <= 0:
+        return None
+
+    basic_pay = params.current_basic_pay * (1 + params.expected_basic_pay_hike) ** (years - 1)
+    da_rate = params.current_da_rate + params.expected_da_hike * (years - 1)
+    salary = calculate_salary(basic_pay, da_rate)
+    annual_expense = params.current_annual_expense * (1 + params.expected_rate_of_inflation) ** years
+
+    nps_contrib = salary * NPS_CONTRIB_RATE
+    ups_contrib = salary * UPS_CONTRIB_RATE
+    benchmark_contrib = ups_contrib  # same as UPS
+
+    def accumulated(return_rate: float, contrib_rate: float) -> float:
+        return get_accumulated_corpus_after(
+            years,
+            params.current_total_nps_corpus,
+            return_rate,
+            contrib_rate,
+            params.current_basic_pay,
+            params.current_da_rate,
+            params.expected_basic_pay_hike,
+            params.expected_da_hike,
+        )
+
+    return YearlyCorpusInfo(
+        year=years,
+        basic_pay=basic_pay,
+        da_rate=da_rate,
+        salary=salary,
+        next_year_basic_pay=basic_pay * (1 + params.expected_basic_pay_hike),
+        next_year_da_rate=da_rate + params.expected_da_hike,
+        annual_expense=annual_expense,
+        monthly_nps_contrib=nps_contrib,
+        monthly_ups_contrib=ups_contrib,
+        monthly_benchmark_contrib=benchmark_contrib,
+        nps_corpus=accumulated(params.expected_nps_return, NPS_CONTRIB_RATE),
+        ups_corpus=accumulated(params.expected_nps_return, UPS_CONTRIB_RATE),
+        benchmark_corpus=accumulated(params.expected_benchmark_corpus_return, UPS_CONTRIB_RATE),
+    )
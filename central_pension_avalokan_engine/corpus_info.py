@@ -1,8 +1,9 @@
-from dataclasses import dataclass, asdict
-from typing import List, Optional
-import csv
+from array import array
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, Iterator, List, Optional
 
-from .pension_compare_params import PensionCompareParams
+from .pension_compare_params import AssumptionSchedule, PensionCompareParams
+from .instrumentation import stage
 
 
 # ------------------------------
@@ -30,9 +31,18 @@ class YearlyCorpusInfo:
         return asdict(self)
 
 
+CORPUS_FIELDS = tuple(f.name for f in fields(YearlyCorpusInfo))
+
+
 # ------------------------------
 # Pension Calculator
 # ------------------------------
+# UPS rules; see pension_rules for evaluating variants of them
+FULL_PENSION_SERVICE_MONTHS = 300
+MINIMUM_UPS_PENSION = 10000
+UPS_LUMPSUM_DIVISOR = 10  # a tenth of monthly emoluments per completed half-year of service
+
+
 def update_pension_info(info: YearlyCorpusInfo, params: PensionCompareParams):
     """
     Calculate updated pension and corpus values for the given YearlyCorpusInfo.
@@ -48,13 +58,13 @@ def update_pension_info(info: YearlyCorpusInfo, params: PensionCompareParams):
 
     # UPS calculations
     total_service_months = (params.years_to_retire + params.current_service) * 12
-    service_ratio = min(total_service_months / 300, 1)
+    service_ratio = min(total_service_months / FULL_PENSION_SERVICE_MONTHS, 1)
 
     avg_basic_pay = (info.basic_pay + info.next_year_basic_pay) / 2
     max_ups_pension = avg_basic_pay * service_ratio
 
     final_drawn_salary = info.next_year_basic_pay * (1 + info.next_year_da_rate)
-    ups_lumpsum = (params.years_to_retire + params.current_service) * 2 * final_drawn_salary / 10
+    ups_lumpsum = (params.years_to_retire + params.current_service) * 2 * final_drawn_salary / UPS_LUMPSUM_DIVISOR
 
     remaining_ups_corpus = info.ups_corpus * (1 - params.withdrawal_percentage)
     ups_corpus = ups_lumpsum + (info.ups_corpus * params.withdrawal_percentage)
@@ -65,8 +75,8 @@ def update_pension_info(info: YearlyCorpusInfo, params: PensionCompareParams):
     else:
         ups_pension_basic_pay = max_ups_pension * (remaining_ups_corpus / info.benchmark_corpus)
 
-    if ups_pension_basic_pay < 10000:
-        ups_pension_basic_pay = 10000
+    if ups_pension_basic_pay < MINIMUM_UPS_PENSION:
+        ups_pension_basic_pay = MINIMUM_UPS_PENSION
 
     ups_pension = ups_pension_basic_pay * (1 + info.next_year_da_rate)
 
@@ -98,9 +108,18 @@ class CorpusInfo:
         """Return a shallow copy of all history entries."""
         return self._history.copy()
 
+    def __iter__(self) -> Iterator[YearlyCorpusInfo]:
+        """Iterate over the entries without copying the history."""
+        return iter(self._history)
+
+    def truncate(self, length: int) -> None:
+        """Drop every entry after the first `length` ones."""
+        del self._history[length:]
+
     def as_list_of_dict(self) -> List[dict]:
         """Return a list of dictionaries for each YearlyCorpusInfo entry."""
-        return [entry.as_dict() for entry in self._history]
+        with stage("as_list_of_dict"):
+            return [entry.as_dict() for entry in self._history]
 
     def calculate_pension(self, params: PensionCompareParams) -> None:
         """
@@ -110,33 +129,160 @@ class CorpusInfo:
         if not retirement_year_info:
             raise IndexError("Cannot update last item because history is empty.")
 
-        ups_pension, nps_annuity, ups_corpus, nps_corpus = update_pension_info(
-            retirement_year_info, params
-        )
+        with stage("calculate_pension"):
+            ups_pension, nps_annuity, ups_corpus, nps_corpus = update_pension_info(
+                retirement_year_info, params
+            )
 
         retirement_year_info.ups_pension = ups_pension
         retirement_year_info.nps_annuity = nps_annuity
         retirement_year_info.ups_corpus = ups_corpus
         retirement_year_info.nps_corpus = nps_corpus
     
+    def resimulate_from(
+        self,
+        year: int,
+        params: PensionCompareParams,
+        schedule: Optional[AssumptionSchedule] = None,
+        overrides: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Recompute the history from simulated `year` (YearlyCorpusInfo.year,
+        1 for the first year) until retirement, keeping the earlier entries.
+        `overrides` is applied to `year` like an AssumptionSchedule entry,
+        e.g. {"basic_pay": 78800} after a pay revision. Pension values must
+        be recalculated afterwards.
+        """
+        # Imported here: corpus_growth_calculation depends on this module
+        from .corpus_growth_calculation import calculate_scheduled_corpus
+
+        if not 1 <= year <= len(self) + 1:
+            raise IndexError(f"Cannot resimulate from year {year} of a {len(self)} year history.")
+        if overrides:
+            schedule = dict(schedule or {})
+            schedule[year] = {**schedule.get(year, {}), **overrides}
+
+        self.truncate(year - 1)
+        for calculation_year in range(year - 1, params.years_to_retire):
+            prev_info = self.last()
+            self.add(calculate_scheduled_corpus(calculation_year, params, prev_info, schedule))
+
     def save_to_csv(self, file_path: str) -> None:
         """
-        Save all YearlyCorpusInfo entries to a CSV file.
+        Save all YearlyCorpusInfo entries to a CSV file, streaming rows
+        without building intermediate dicts.
         """
         if not self.last():
             raise ValueError("No corpus history to save.")
 
-        # Get list of dictionaries
-        data_dicts = self.as_list_of_dict()
+        # Imported here: corpus_export depends on this module
+        from .corpus_export import CorpusCsvWriter
+
+        with CorpusCsvWriter(file_path) as writer:
+            writer.write_history(self)
+
+
+# ------------------------------
+# Columnar Corpus History
+# ------------------------------
+class YearlyCorpusRow:
+    """
+    Lightweight view of one year stored in a ColumnarCorpusInfo. Exposes the
+    same attributes as YearlyCorpusInfo; assignments write through.
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: Dict[str, array], index: int):
+        self._columns = columns
+        self._index = index
+
+    def as_dict(self) -> dict:
+        return {name: self._columns[name][self._index] for name in CORPUS_FIELDS}
+
+    def to_yearly_corpus_info(self) -> YearlyCorpusInfo:
+        return YearlyCorpusInfo(**self.as_dict())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (YearlyCorpusRow, YearlyCorpusInfo)):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
 
-        # Use keys from the first dict as CSV headers
-        fieldnames = data_dicts[0].keys()
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"{type(self).__name__}({values})"
 
-        with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_dicts)
 
-        print(f"Corpus history saved to {file_path}")
+def _column_property(name: str) -> property:
+    def getter(row: YearlyCorpusRow):
+        return row._columns[name][row._index]
 
+    def setter(row: YearlyCorpusRow, value) -> None:
+        row._columns[name][row._index] = value
 
+    return property(getter, setter)
+
+
+for _name in CORPUS_FIELDS:
+    setattr(YearlyCorpusRow, _name, _column_property(_name))
+
+
+class ColumnarCorpusInfo(CorpusInfo):
+    """
+    CorpusInfo storing each YearlyCorpusInfo field in a contiguous array
+    instead of keeping one dataclass per year. Rows are handed out as
+    YearlyCorpusRow views.
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, array] = {
+            name: array("q" if name == "year" else "d") for name in CORPUS_FIELDS
+        }
+
+    def add(self, info: YearlyCorpusInfo) -> None:
+        """Add a new YearlyCorpusInfo entry."""
+        for name, column in self._columns.items():
+            column.append(getattr(info, name))
+
+    def last(self) -> Optional[YearlyCorpusRow]:
+        """Return a view of the last entry, or None if empty."""
+        return self[-1] if len(self) else None
+
+    def __getitem__(self, index: int) -> YearlyCorpusRow:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("corpus history index out of range")
+        return YearlyCorpusRow(self._columns, index)
+
+    def __len__(self) -> int:
+        return len(self._columns["year"])
+
+    def all(self) -> List[YearlyCorpusRow]:
+        """Return views of all history entries."""
+        return [YearlyCorpusRow(self._columns, index) for index in range(len(self))]
+
+    def __iter__(self) -> Iterator[YearlyCorpusRow]:
+        return (YearlyCorpusRow(self._columns, index) for index in range(len(self)))
+
+    def column(self, name: str) -> memoryview:
+        """
+        Return a read-only, zero-copy view of one field across all years,
+        usable directly with numpy.asarray. The history cannot grow while
+        a view is alive.
+        """
+        if name not in self._columns:
+            raise KeyError(f"Unknown corpus field: {name}")
+        return memoryview(self._columns[name]).toreadonly()
+
+    def truncate(self, length: int) -> None:
+        """Drop every entry after the first `length` ones."""
+        for column in self._columns.values():
+            del column[length:]
+
+    def as_list_of_dict(self) -> List[dict]:
+        """Return a list of dictionaries for each entry."""
+        columns = [self._columns[name] for name in CORPUS_FIELDS]
+        with stage("as_list_of_dict"):
+            return [dict(zip(CORPUS_FIELDS, values)) for values in zip(*columns)]
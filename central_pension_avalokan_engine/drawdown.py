@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .corpus_info import CorpusInfo
+from .batch_corpus_calculation import BatchCorpusInfo, PensionCompareParamsBatch
+
+
+# ------------------------------------------
+# Configuration & Results
+# ------------------------------------------
+@dataclass
+class DrawdownConfig:
+    retirement_age: int = 60
+    end_age: int = 85
+
+    @property
+    def years(self) -> int:
+        return max(self.end_age - self.retirement_age, 0)
+
+
+@dataclass
+class DrawdownResult:
+    """
+    Post-retirement projection as (profiles, years) arrays, where column y
+    is the year ending at age[y]. Corpora are end-of-year balances and go
+    negative once expenses can no longer be met; the depletion ages are
+    NaN for corpora that last until the end age.
+    """
+
+    age: np.ndarray
+    annual_expense: np.ndarray
+    nps_income: np.ndarray
+    ups_income: np.ndarray
+    nps_corpus: np.ndarray
+    ups_corpus: np.ndarray
+    nps_depletion_age: np.ndarray
+    ups_depletion_age: np.ndarray
+
+
+# ------------------------------------------
+# Drawdown Simulation
+# ------------------------------------------
+def _grow_with_cashflows(initial_corpus: np.ndarray, return_rate: np.ndarray, cashflows: np.ndarray) -> np.ndarray:
+    """
+    End-of-year balances of corpus[y] = corpus[y-1] * (1 + r) + cashflows[y]
+    for every year at once, via discounted cumulative sums.
+    """
+    years = np.arange(1, cashflows.shape[1] + 1)
+    growth = (1 + return_rate[:, None]) ** years
+    return growth * (initial_corpus[:, None] + np.cumsum(cashflows / growth, axis=1))
+
+
+def _depletion_age(corpus: np.ndarray, age: np.ndarray) -> np.ndarray:
+    depleted = corpus < 0
+    first = np.argmax(depleted, axis=1)
+    return np.where(depleted.any(axis=1), age[first], np.nan)
+
+
+def simulate_drawdown(
+    corpus_info: BatchCorpusInfo,
+    params: PensionCompareParamsBatch,
+    config: Optional[DrawdownConfig] = None,
+) -> DrawdownResult:
+    """
+    Project life after retirement for every profile, from retirement-year
+    values on which calculate_pension has already been applied.
+
+    Each year the NPS lump sum and the UPS lump sum grow at
+    expected_rate_of_return_nps_corpus_after_retirement, receive the yearly
+    NPS annuity or UPS pension (the latter indexed by
+    expected_ups_pension_growth) and pay the annual expense, which keeps
+    growing with inflation. The whole horizon is evaluated with array
+    operations, with no per-year loop.
+    """
+    if config is None:
+        config = DrawdownConfig()
+    years = np.arange(1, config.years + 1)
+    age = config.retirement_age + years
+
+    annual_expense = corpus_info.annual_expense[:, None] * (
+        1 + params.expected_rate_of_inflation[:, None]
+    ) ** years
+    nps_income = np.broadcast_to(12 * corpus_info.nps_annuity[:, None], annual_expense.shape)
+    ups_income = 12 * corpus_info.ups_pension[:, None] * (
+        1 + params.expected_ups_pension_growth[:, None]
+    ) ** (years - 1)
+
+    return_rate = params.expected_rate_of_return_nps_corpus_after_retirement
+    nps_corpus = _grow_with_cashflows(corpus_info.nps_corpus, return_rate, nps_income - annual_expense)
+    ups_corpus = _grow_with_cashflows(corpus_info.ups_corpus, return_rate, ups_income - annual_expense)
+
+    return DrawdownResult(
+        age=age,
+        annual_expense=annual_expense,
+        nps_income=nps_income,
+        ups_income=ups_income,
+        nps_corpus=nps_corpus,
+        ups_corpus=ups_corpus,
+        nps_depletion_age=_depletion_age(nps_corpus, age),
+        ups_depletion_age=_depletion_age(ups_corpus, age),
+    )
+
+
+def simulate_drawdown_for(
+    corpus_history: CorpusInfo,
+    params: PensionCompareParams,
+    config: Optional[DrawdownConfig] = None,
+) -> DrawdownResult:
+    """simulate_drawdown for a single history after calculate_pension."""
+    retirement_year_info = corpus_history.last()
+    if not retirement_year_info:
+        raise IndexError("Cannot simulate drawdown because history is empty.")
+    return simulate_drawdown(
+        BatchCorpusInfo.from_yearly_corpus_info([retirement_year_info]),
+        PensionCompareParamsBatch.from_params([params]),
+        config,
+    )
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+# Stages and counters are only recorded while a Recorder is active; the
+# disabled path is a single global lookup per hook.
+_recorder: Optional["Recorder"] = None
+_NULL_STAGE = nullcontext()
+
+# Trace events kept per recorder; stage totals are kept regardless
+MAX_TRACE_EVENTS = 1_000_000
+
+
+# ------------------------------------------
+# Recorder
+# ------------------------------------------
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class _Stage:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder: "Recorder", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.record(self.name, self.start, time.perf_counter())
+
+
+class Recorder:
+    """
+    Per-stage wall-clock timers, counters and (optionally) trace events of
+    one profiling session. Only the current process is recorded: work done
+    in worker processes shows up as the time the parent spent waiting.
+    """
+
+    def __init__(self, trace_events: bool = True):
+        self.trace_events = trace_events
+        self.stages: Dict[str, StageStats] = defaultdict(StageStats)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.events: List[Tuple[str, float, float, int]] = []
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self._factor_cache_start = _factor_cache_counts()
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def record(self, name: str, start: float, end: float) -> None:
+        with self._lock:
+            stats = self.stages[name]
+            stats.calls += 1
+            stats.seconds += end - start
+            if self.trace_events and len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append((name, start, end - start, threading.get_ident()))
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def finish(self) -> None:
+        """Stop the wall clock and fold in the compounding factor cache delta."""
+        self.seconds = time.perf_counter() - self.started
+        hits, misses = _factor_cache_counts()
+        self.counters["compounding_factor_cache_hits"] += hits - self._factor_cache_start[0]
+        self.counters["compounding_factor_cache_misses"] += misses - self._factor_cache_start[1]
+
+    def summary_table(self) -> str:
+        """Stages by total time, then counters, as a plain-text table."""
+        lines = [f"{'stage':<32} {'calls':>10} {'total s':>10} {'mean us':>10} {'share':>7}"]
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            mean_us = 1e6 * stats.seconds / stats.calls if stats.calls else 0.0
+            share = stats.seconds / self.seconds if self.seconds else 0.0
+            lines.append(f"{name:<32} {stats.calls:>10,} {stats.seconds:>10.4f} {mean_us:>10.2f} {share:>7.1%}")
+        lines.append(f"{'wall clock':<32} {'':>10} {self.seconds:>10.4f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<32} {'value':>10}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<32} {value:>10,}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Trace in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": 1e6 * (start - self.started),
+                "dur": 1e6 * duration,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in self.events
+        ]
+        events.append(
+            {
+                "name": "counters",
+                "ph": "C",
+                "ts": 1e6 * self.seconds,
+                "pid": pid,
+                "args": dict(self.counters),
+            }
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Union[str, "os.PathLike"]) -> None:
+        import json
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+
+def _factor_cache_counts() -> Tuple[int, int]:
+    # Imported here to avoid a cycle: corpus_info imports the hooks below
+    from .corpus_growth_calculation import compounding_factor_cache_info
+
+    info = compounding_factor_cache_info()
+    return info.hits, info.misses
+
+
+# ------------------------------------------
+# Hooks
+# ------------------------------------------
+def stage(name: str):
+    """Context manager timing one stage; a shared no-op when disabled."""
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_STAGE
+    return recorder.stage(name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add `amount` to a counter when profiling is enabled."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, amount)
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+def active_recorder() -> Optional[Recorder]:
+    """The recording Recorder, or None; lets hot paths test once and skip hooks."""
+    return _recorder
+
+
+# ------------------------------------------
+# Programmatic API
+# ------------------------------------------
+@contextmanager
+def profiling(trace_events: bool = True) -> Iterator[Recorder]:
+    """
+    Record stages and counters for the duration of the block:
+
+        with profiling() as recorder:
+            run_cohort_to_path(...)
+        print(recorder.summary_table())
+    """
+    global _recorder
+    previous = _recorder
+    recorder = Recorder(trace_events=trace_events)
+    _recorder = recorder
+    try:
+        yield recorder
+    finally:
+        recorder.finish()
+        _recorder = previous
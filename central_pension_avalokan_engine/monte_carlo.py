@@ -0,0 +1,188 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .quantile_sketch import QuantileSketch
+from .batch_corpus_calculation import (
+    PensionCompareParamsBatch,
+    calculate_accumulated_corpus_batch,
+)
+
+
+# Assumptions that are applied once per simulated year and can be drawn
+# independently for every year of every path.
+STOCHASTIC_FIELDS = (
+    "expected_nps_return",
+    "expected_benchmark_corpus_return",
+    "expected_rate_of_inflation",
+    "expected_da_hike",
+    "expected_basic_pay_hike",
+)
+
+# Retirement-year values tracked for every path (after calculate_pension).
+METRICS = (
+    "nps_corpus",
+    "ups_corpus",
+    "benchmark_corpus",
+    "nps_annuity",
+    "ups_pension",
+    "nps_minus_ups_pension",
+)
+
+
+# ------------------------------------------
+# Distributions
+# ------------------------------------------
+@dataclass
+class NormalDistribution:
+    mean: float
+    std: float
+
+    def sample(self, rng: np.random.Generator, size: Tuple[int, ...]) -> np.ndarray:
+        return rng.normal(self.mean, self.std, size)
+
+
+@dataclass
+class LogNormalDistribution:
+    """Distribution of (1 + rate) is log-normal with the given mean and std of the rate."""
+
+    mean: float
+    std: float
+
+    def sample(self, rng: np.random.Generator, size: Tuple[int, ...]) -> np.ndarray:
+        growth_mean = 1 + self.mean
+        sigma2 = np.log1p((self.std / growth_mean) ** 2)
+        mu = np.log(growth_mean) - sigma2 / 2
+        return rng.lognormal(mu, np.sqrt(sigma2), size) - 1
+
+
+@dataclass
+class UniformDistribution:
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: Tuple[int, ...]) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+Distribution = Union[NormalDistribution, LogNormalDistribution, UniformDistribution]
+
+
+# ------------------------------------------
+# Configuration & Results
+# ------------------------------------------
+@dataclass
+class MonteCarloConfig:
+    """
+    Fields of STOCHASTIC_FIELDS missing from `distributions` keep the
+    deterministic value from PensionCompareParams.
+    """
+
+    n_paths: int = 100_000
+    distributions: Dict[str, Distribution] = field(default_factory=dict)
+    seed: Optional[int] = None
+    chunk_size: int = 10_000
+    workers: int = 1
+    relative_accuracy: float = 0.005
+
+
+@dataclass
+class MonteCarloResult:
+    n_paths: int
+    sketches: Dict[str, QuantileSketch]
+
+    def percentiles(self, metric: str, percentiles: Iterable[float] = (5, 50, 95)) -> Dict[float, float]:
+        """Return {percentile: value} for one metric, percentiles in 0..100."""
+        percentiles = list(percentiles)
+        values = self.sketches[metric].quantiles(p / 100 for p in percentiles)
+        return dict(zip(percentiles, values))
+
+    def summary(self, percentiles: Iterable[float] = (5, 50, 95)) -> Dict[str, Dict[float, float]]:
+        """Return percentiles for every tracked metric."""
+        percentiles = list(percentiles)
+        return {metric: self.percentiles(metric, percentiles) for metric in self.sketches}
+
+
+# ------------------------------------------
+# Simulation
+# ------------------------------------------
+def _simulate_shard(
+    params: PensionCompareParams,
+    distributions: Dict[str, Distribution],
+    size: int,
+    seed_sequence: np.random.SeedSequence,
+    relative_accuracy: float,
+) -> Dict[str, QuantileSketch]:
+    """Simulate `size` paths and return sketches of their retirement values."""
+    rng = np.random.default_rng(seed_sequence)
+    years = params.years_to_retire
+    base = PensionCompareParamsBatch.repeat(params, size)
+
+    # Year-major draws so that every simulated year reads a contiguous row
+    draws = {name: dist.sample(rng, (years, size)) for name, dist in distributions.items()}
+
+    corpus_info = None
+    for year in range(years):
+        year_params = replace(base, **{name: values[year] for name, values in draws.items()})
+        corpus_info = calculate_accumulated_corpus_batch(year, year_params, corpus_info)
+
+    sketches = {metric: QuantileSketch(relative_accuracy) for metric in METRICS}
+    if corpus_info is None:
+        return sketches
+
+    # calculate_pension leaves the benchmark corpus untouched but replaces
+    # the NPS/UPS corpora with the amounts available at retirement.
+    sketches["benchmark_corpus"].add(corpus_info.benchmark_corpus)
+    corpus_info.calculate_pension(base)
+    for metric in ("nps_corpus", "ups_corpus", "nps_annuity", "ups_pension"):
+        sketches[metric].add(getattr(corpus_info, metric))
+    sketches["nps_minus_ups_pension"].add(corpus_info.nps_annuity - corpus_info.ups_pension)
+    return sketches
+
+
+def _shards(config: MonteCarloConfig) -> List[Tuple[int, np.random.SeedSequence]]:
+    """
+    Split the paths into chunks, each with its own independent RNG stream.
+    The streams depend only on the seed and chunk size, so results are the
+    same whatever the number of workers.
+    """
+    if config.n_paths <= 0 or config.chunk_size <= 0:
+        raise ValueError("n_paths and chunk_size must be positive.")
+    n_chunks = -(-config.n_paths // config.chunk_size)
+    seed_sequences = np.random.SeedSequence(config.seed).spawn(n_chunks)
+    sizes = [config.chunk_size] * (n_chunks - 1)
+    sizes.append(config.n_paths - config.chunk_size * (n_chunks - 1))
+    return list(zip(sizes, seed_sequences))
+
+
+def run_monte_carlo(params: PensionCompareParams, config: MonteCarloConfig) -> MonteCarloResult:
+    """
+    Run a Monte Carlo projection for one profile. Paths are simulated in
+    vectorized chunks (optionally across a process pool) and only merged
+    percentile sketches are kept.
+    """
+    unknown = set(config.distributions) - set(STOCHASTIC_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported stochastic field(s): {', '.join(sorted(unknown))}")
+
+    sketches = {metric: QuantileSketch(config.relative_accuracy) for metric in METRICS}
+    shard_args = [
+        (params, config.distributions, size, seed_sequence, config.relative_accuracy)
+        for size, seed_sequence in _shards(config)
+    ]
+
+    if config.workers > 1:
+        with ProcessPoolExecutor(max_workers=config.workers) as executor:
+            results = executor.map(_simulate_shard, *zip(*shard_args))
+            for shard_sketches in results:
+                for metric, sketch in shard_sketches.items():
+                    sketches[metric].merge(sketch)
+    else:
+        for args in shard_args:
+            for metric, sketch in _simulate_shard(*args).items():
+                sketches[metric].merge(sketch)
+
+    return MonteCarloResult(n_paths=config.n_paths, sketches=sketches)
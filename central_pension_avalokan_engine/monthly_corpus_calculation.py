@@ -0,0 +1,221 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .corpus_info import CORPUS_FIELDS, CorpusInfo, YearlyCorpusInfo
+from .batch_corpus_calculation import BatchCorpusInfo, PensionCompareParamsBatch
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+
+
+# ------------------------------------------
+# Calendar Configuration
+# ------------------------------------------
+@dataclass(frozen=True)
+class MonthlyConfig:
+    """
+    Pay calendar of the monthly engine, with months numbered 1-12.
+
+    The simulation starts in `start_month` at the current basic pay and DA
+    rate. DA is revised at the start of every month in `da_revision_months`,
+    each revision adding expected_da_hike / len(da_revision_months). The
+    yearly increment (expected_basic_pay_hike) is applied at the start of
+    `increment_month`. Revisions and increments take effect only after the
+    start month.
+
+    MonthlyConfig(start_month=m, da_revision_months=(m,), increment_month=m)
+    reproduces the annual model.
+    """
+
+    start_month: int = 1
+    da_revision_months: Tuple[int, ...] = (1, 7)
+    increment_month: int = 7
+
+    def __post_init__(self):
+        months = (self.start_month, self.increment_month) + tuple(self.da_revision_months)
+        if not self.da_revision_months or any(not 1 <= month <= 12 for month in months):
+            raise ValueError("Months must be between 1 and 12, with at least one DA revision month.")
+
+
+ANNUAL_EQUIVALENT_CONFIG = MonthlyConfig(start_month=1, da_revision_months=(1,), increment_month=1)
+
+
+# ------------------------------------------
+# Monthly Result
+# ------------------------------------------
+@dataclass
+class MonthlyCorpusResult:
+    """
+    Month-by-month simulation of a batch of profiles. Monthly arrays are
+    (profiles, months) with column t the t-th month since the start;
+    corpora are end-of-month balances. `yearly` holds the roll-up into
+    YearlyCorpusInfo fields as (profiles, years) arrays. Months and years
+    beyond a profile's horizon hold NaN.
+    """
+
+    years_to_retire: np.ndarray
+    basic_pay: np.ndarray
+    da_rate: np.ndarray
+    salary: np.ndarray
+    nps_corpus: np.ndarray
+    ups_corpus: np.ndarray
+    benchmark_corpus: np.ndarray
+    yearly: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.years_to_retire)
+
+    def corpus_info(self, index: int) -> CorpusInfo:
+        """Yearly roll-up of profile `index` as a CorpusInfo history."""
+        history = CorpusInfo()
+        for year in range(int(self.years_to_retire[index])):
+            values = {name: self.yearly[name][index, year].item() for name in CORPUS_FIELDS}
+            values["year"] = int(values["year"])
+            history.add(YearlyCorpusInfo(**values))
+        return history
+
+    def final_corpus_info(self) -> BatchCorpusInfo:
+        """Retirement-year roll-up of every profile."""
+        final = BatchCorpusInfo.empty(len(self))
+        has_history = self.years_to_retire > 0
+        rows = np.flatnonzero(has_history)
+        last_year = self.years_to_retire[has_history] - 1
+        for name in CORPUS_FIELDS:
+            getattr(final, name)[rows] = self.yearly[name][rows, last_year]
+        return final
+
+
+# ------------------------------------------
+# Monthly Engine
+# ------------------------------------------
+def _monthly_growth(return_rate: np.ndarray, months: int) -> np.ndarray:
+    """(profiles, months) compounding factors (1 + r/12)^t for t = 1 .. months."""
+    factors = np.empty((len(return_rate), months))
+    factors[:] = (1 + return_rate / 12)[:, None]
+    return np.cumprod(factors, axis=1)
+
+
+def _grow_monthly(
+    initial_corpus: np.ndarray, growth: np.ndarray, discounted_salary: np.ndarray, contrib_rate: float
+) -> np.ndarray:
+    """
+    End-of-month balances of corpus[t] = corpus[t-1] * (1 + i) + c[t] for
+    all months at once: with G[t] = (1 + i)^t, corpus[t] = G[t] * (C0 +
+    sum of c[k] / G[k] for k <= t), where c = contrib_rate * salary and
+    discounted_salary is the running sum of salary / G.
+    """
+    return growth * (initial_corpus[:, None] + contrib_rate * discounted_salary)
+
+
+def simulate_monthly(
+    params: PensionCompareParamsBatch, config: MonthlyConfig = MonthlyConfig()
+) -> MonthlyCorpusResult:
+    """
+    Simulate every profile month by month with half-yearly DA revisions and
+    a mid-year increment (see MonthlyConfig), using (profiles, months)
+    arrays rather than a per-period loop.
+
+    Contributions are deposited at the end of each month and corpora
+    compound monthly at expected_*_return / 12, as in the annual model;
+    compounding factors are cumulative products over the months.
+    The yearly roll-up reports, for each simulated year, the mean basic
+    pay, DA rate, salary and monthly contributions over its 12 months, the
+    basic pay and DA rate of the month after it as next_year_*, and the
+    year-end corpora.
+    """
+    years_to_retire = params.years_to_retire
+    horizon_years = int(years_to_retire.max()) if len(params) else 0
+    horizon = 12 * horizon_years
+
+    # Month t = 0 .. horizon; the last month only feeds next_year_* values
+    months = np.arange(horizon + 1)
+    calendar_month = (config.start_month - 1 + months) % 12 + 1
+    after_start = months > 0
+    revisions = np.cumsum(np.isin(calendar_month, config.da_revision_months) & after_start)
+    increments = np.cumsum((calendar_month == config.increment_month) & after_start)
+
+    da_step = params.expected_da_hike / len(config.da_revision_months)
+    # At most horizon_years + 1 distinct increment counts: raise those, then gather
+    increment_factors = (1 + params.expected_basic_pay_hike[:, None]) ** np.arange(increments[-1] + 1)
+    basic_pay = params.current_basic_pay[:, None] * increment_factors[:, increments]
+    da_rate = params.current_da_rate[:, None] + da_step[:, None] * revisions
+    salary = basic_pay * (1 + da_rate)
+
+    active = months[None, :horizon] < 12 * years_to_retire[:, None]
+    active_salary = np.where(active, salary[:, :horizon], 0.0)
+    initial_corpus = params.current_total_nps_corpus
+
+    nps_growth = _monthly_growth(params.expected_nps_return, horizon)
+    benchmark_growth = _monthly_growth(params.expected_benchmark_corpus_return, horizon)
+    # NPS and UPS share a return rate, so they share the discounted salary sums
+    nps_discounted = np.cumsum(active_salary / nps_growth, axis=1)
+    benchmark_discounted = np.cumsum(active_salary / benchmark_growth, axis=1)
+
+    def grow(growth: np.ndarray, discounted_salary: np.ndarray, contrib_rate: float) -> np.ndarray:
+        corpus = _grow_monthly(initial_corpus, growth, discounted_salary, contrib_rate)
+        return np.where(active, corpus, np.nan)
+
+    nps_corpus = grow(nps_growth, nps_discounted, NPS_CONTRIB_RATE)
+    ups_corpus = grow(nps_growth, nps_discounted, UPS_CONTRIB_RATE)
+    benchmark_corpus = grow(benchmark_growth, benchmark_discounted, UPS_CONTRIB_RATE)
+
+    # Yearly roll-up: (profiles, years, 12) views of the active months
+    year_active = np.arange(horizon_years)[None, :] < years_to_retire[:, None]
+
+    def by_year(values: np.ndarray) -> np.ndarray:
+        return values[:, :horizon].reshape(len(params), horizon_years, 12)
+
+    def yearly_mean(values: np.ndarray) -> np.ndarray:
+        return np.where(year_active, by_year(values).mean(axis=2), np.nan)
+
+    def year_end(values: np.ndarray) -> np.ndarray:
+        return np.where(year_active, by_year(values)[:, :, -1], np.nan)
+
+    def next_year(values: np.ndarray) -> np.ndarray:
+        return np.where(year_active, values[:, 12::12], np.nan)
+
+    years = np.arange(1, horizon_years + 1)
+    mean_salary = yearly_mean(salary)
+    yearly = {
+        "year": np.where(year_active, years, 0),
+        "basic_pay": yearly_mean(basic_pay),
+        "da_rate": yearly_mean(da_rate),
+        "salary": mean_salary,
+        "next_year_basic_pay": next_year(basic_pay),
+        "next_year_da_rate": next_year(da_rate),
+        "monthly_nps_contrib": mean_salary * NPS_CONTRIB_RATE,
+        "monthly_ups_contrib": mean_salary * UPS_CONTRIB_RATE,
+        "monthly_benchmark_contrib": mean_salary * UPS_CONTRIB_RATE,
+        "nps_corpus": year_end(nps_corpus),
+        "ups_corpus": year_end(ups_corpus),
+        "benchmark_corpus": year_end(benchmark_corpus),
+        "annual_expense": np.where(
+            year_active,
+            params.current_annual_expense[:, None] * (1 + params.expected_rate_of_inflation[:, None]) ** years,
+            np.nan,
+        ),
+        "ups_pension": np.zeros((len(params), horizon_years)),
+        "nps_annuity": np.zeros((len(params), horizon_years)),
+    }
+
+    def masked(values: np.ndarray) -> np.ndarray:
+        return np.where(active, values[:, :horizon], np.nan)
+
+    return MonthlyCorpusResult(
+        years_to_retire=years_to_retire,
+        basic_pay=masked(basic_pay),
+        da_rate=masked(da_rate),
+        salary=masked(salary),
+        nps_corpus=nps_corpus,
+        ups_corpus=ups_corpus,
+        benchmark_corpus=benchmark_corpus,
+        yearly=yearly,
+    )
+
+
+def get_monthly_corpus_info(
+    params: PensionCompareParams, config: MonthlyConfig = MonthlyConfig()
+) -> CorpusInfo:
+    """Monthly-resolution counterpart of core.get_corpus_info for one profile."""
+    return simulate_monthly(PensionCompareParamsBatch.from_params([params]), config).corpus_info(0)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Dict
 
 @dataclass
 class PensionCompareParams:
@@ -19,3 +20,19 @@ class PensionCompareParams:
     expected_rate_of_return_nps_corpus_after_retirement: float = 0.07
     expected_rate_of_inflation: float = 0.05
 
+
+# Per-year overrides keyed by simulated year (YearlyCorpusInfo.year, 1 for
+# the first year). Each entry may replace the yearly assumptions for that
+# year's calculation (e.g. {"expected_basic_pay_hike": 0.25} for a pay
+# commission revision) and may set the year's starting "basic_pay" or
+# "da_rate" directly.
+AssumptionSchedule = Dict[int, Dict[str, float]]
+
+SCHEDULE_STATE_FIELDS = ("basic_pay", "da_rate")
+SCHEDULE_FIELDS = (
+    "expected_da_hike",
+    "expected_basic_pay_hike",
+    "expected_nps_return",
+    "expected_benchmark_corpus_return",
+    "expected_rate_of_inflation",
+) + SCHEDULE_STATE_FIELDS
@@ -0,0 +1,228 @@
+import csv
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+from .corpus_info import FULL_PENSION_SERVICE_MONTHS, MINIMUM_UPS_PENSION, UPS_LUMPSUM_DIVISOR
+from .batch_corpus_calculation import PensionCompareParamsBatch
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+from .salary_trajectory import SalaryTrajectory, accumulate_corpus, build_salary_trajectory
+
+
+# ------------------------------------------
+# Rule Sets
+# ------------------------------------------
+@dataclass(frozen=True)
+class PensionRuleSet:
+    """
+    One variant of the contribution and UPS pension rules, as data. The
+    defaults are the rules of update_pension_info and the engine's
+    contribution rates.
+
+    - *_contrib_rate: share of monthly salary contributed to each corpus
+    - full_pension_service_months: service earning the full pension
+    - minimum_ups_pension: floor of the monthly pension (before DA)
+    - ups_lumpsum_divisor: the lumpsum is monthly emoluments per half-year
+      of service divided by this
+    - benchmark_reduction: scale the pension down when the remaining UPS
+      corpus falls short of the benchmark corpus
+    """
+
+    name: str = "current"
+    nps_contrib_rate: float = NPS_CONTRIB_RATE
+    ups_contrib_rate: float = UPS_CONTRIB_RATE
+    benchmark_contrib_rate: float = UPS_CONTRIB_RATE
+    full_pension_service_months: float = FULL_PENSION_SERVICE_MONTHS
+    minimum_ups_pension: float = MINIMUM_UPS_PENSION
+    ups_lumpsum_divisor: float = UPS_LUMPSUM_DIVISOR
+    benchmark_reduction: bool = True
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, object]) -> "PensionRuleSet":
+        """Build a rule set from overrides of the defaults, rejecting unknown keys."""
+        unknown = set(values) - set(RULE_FIELDS) - {"name"}
+        if unknown:
+            raise ValueError(f"Unknown rule field(s): {', '.join(sorted(unknown))}")
+        return cls(**values)
+
+
+RULE_FIELDS = tuple(f.name for f in fields(PensionRuleSet) if f.name != "name")
+DEFAULT_RULES = PensionRuleSet()
+SCORE_FIELDS = ("ups_pension", "nps_annuity", "ups_corpus", "nps_corpus")
+
+
+def load_rule_sets(file_path: Union[str, Path]) -> List[PensionRuleSet]:
+    """
+    Read rule sets from a JSON list of objects, each overriding the
+    defaults, e.g. [{"name": "floor_12k", "minimum_ups_pension": 12000}].
+    """
+    with open(file_path, encoding="utf-8") as file:
+        entries = json.load(file)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{file_path} must hold a non-empty JSON list of rule sets")
+    rule_sets = [PensionRuleSet.from_dict(entry) for entry in entries]
+    names = [rule_set.name for rule_set in rule_sets]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Rule set names in {file_path} must be unique")
+    return rule_sets
+
+
+# ------------------------------------------
+# Compiled Evaluator
+# ------------------------------------------
+@dataclass
+class RuleEvaluation:
+    """
+    Retirement values of every employee under every rule set, as (rules,
+    employees) arrays. As after calculate_pension, ups_corpus and
+    nps_corpus are the amounts paid out at retirement. Employees with no
+    simulated year hold NaN.
+    """
+
+    rule_sets: Tuple[PensionRuleSet, ...]
+    ups_pension: np.ndarray
+    nps_annuity: np.ndarray
+    ups_corpus: np.ndarray
+    nps_corpus: np.ndarray
+
+    @property
+    def nps_minus_ups_pension(self) -> np.ndarray:
+        return self.nps_annuity - self.ups_pension
+
+
+class CompiledRules:
+    """
+    Rule sets compiled into (rules, 1) parameter columns, so that
+    evaluate() scores every rule set against every employee with array
+    operations and no per-rule Python work.
+
+    The salary trajectory is built once. Corpora are linear in the
+    contribution rate (corpus = growth * initial + rate * accumulated
+    salary), so each return rate needs a single pass over the years,
+    whatever the number of rule sets.
+    """
+
+    def __init__(self, rule_sets: Sequence[PensionRuleSet]):
+        self.rule_sets = tuple(rule_sets)
+        if not self.rule_sets:
+            raise ValueError("At least one rule set is required.")
+        for name in RULE_FIELDS:
+            values = [getattr(rule_set, name) for rule_set in self.rule_sets]
+            dtype = bool if name == "benchmark_reduction" else np.float64
+            setattr(self, name, np.array(values, dtype=dtype)[:, None])
+
+    def __len__(self) -> int:
+        return len(self.rule_sets)
+
+    def evaluate(
+        self, params: PensionCompareParamsBatch, trajectory: Optional[SalaryTrajectory] = None
+    ) -> RuleEvaluation:
+        """Score every compiled rule set against every profile of `params`."""
+        if trajectory is None:
+            trajectory = build_salary_trajectory(params)
+        initial_corpus = params.current_total_nps_corpus
+
+        def corpus_parts(return_rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            # Column 0 grows the initial corpus alone, column 1 a unit contribution rate
+            parts = accumulate_corpus(
+                trajectory,
+                np.stack([initial_corpus, np.zeros(len(params))], axis=1),
+                return_rate[:, None],
+                np.array([0.0, 1.0]),
+            )
+            return parts[:, 0], parts[:, 1]
+
+        nps_initial, nps_per_rate = corpus_parts(params.expected_nps_return)
+        benchmark_initial, benchmark_per_rate = corpus_parts(params.expected_benchmark_corpus_return)
+        nps_corpus = nps_initial + self.nps_contrib_rate * nps_per_rate
+        ups_corpus = nps_initial + self.ups_contrib_rate * nps_per_rate
+        benchmark_corpus = benchmark_initial + self.benchmark_contrib_rate * benchmark_per_rate
+
+        basic_pay = trajectory.final("basic_pay")
+        next_year_basic_pay = trajectory.final("next_year_basic_pay")
+        next_year_da_rate = trajectory.final("next_year_da_rate")
+        withdrawal = params.withdrawal_percentage
+
+        # NPS calculations
+        nps_payout = nps_corpus * withdrawal
+        nps_annuity = nps_corpus * (1 - withdrawal) * params.expected_annuity_rate / 12
+
+        # UPS calculations
+        total_service_years = params.years_to_retire + params.current_service
+        service_ratio = np.minimum(total_service_years * 12 / self.full_pension_service_months, 1)
+        max_ups_pension = (basic_pay + next_year_basic_pay) / 2 * service_ratio
+
+        final_drawn_salary = next_year_basic_pay * (1 + next_year_da_rate)
+        ups_lumpsum = total_service_years * 2 * final_drawn_salary / self.ups_lumpsum_divisor
+
+        remaining_ups_corpus = ups_corpus * (1 - withdrawal)
+        ups_payout = ups_lumpsum + ups_corpus * withdrawal
+        full_corpus = remaining_ups_corpus >= benchmark_corpus
+        ups_payout = np.where(full_corpus, ups_payout + ups_corpus - benchmark_corpus, ups_payout)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reduced_pension = max_ups_pension * (remaining_ups_corpus / benchmark_corpus)
+        ups_pension_basic_pay = np.where(
+            full_corpus | ~self.benchmark_reduction, max_ups_pension, reduced_pension
+        )
+        ups_pension_basic_pay = np.maximum(ups_pension_basic_pay, self.minimum_ups_pension)
+        ups_pension = ups_pension_basic_pay * (1 + next_year_da_rate)
+
+        empty = params.years_to_retire <= 0
+        return RuleEvaluation(
+            self.rule_sets,
+            *(
+                np.where(empty, np.nan, values)
+                for values in (ups_pension, nps_annuity, ups_payout, nps_payout)
+            ),
+        )
+
+
+def compile_rules(rule_sets: Sequence[PensionRuleSet]) -> CompiledRules:
+    return CompiledRules(rule_sets)
+
+
+# ------------------------------------------
+# Workforce Scoring
+# ------------------------------------------
+def score_rule_sets(
+    input_path: Union[str, Path], rule_sets: Sequence[PensionRuleSet], chunk_size: int = 10000
+) -> List[Dict[str, object]]:
+    """
+    Evaluate every rule set against every profile of a cohort CSV/JSONL
+    file (see cohort.iter_profile_chunks), chunk by chunk, and return one
+    summary row per rule set.
+    """
+    # Imported here: cohort keeps NumPy out of its module scope
+    from .cohort import iter_profile_chunks
+
+    compiled = compile_rules(rule_sets)
+    employees = 0
+    ups_wins = np.zeros(len(compiled))
+    totals = {name: np.zeros(len(compiled)) for name in SCORE_FIELDS}
+    for _, columns in iter_profile_chunks(input_path, chunk_size):
+        params = PensionCompareParamsBatch.from_columns(**columns)
+        simulated = params.years_to_retire > 0
+        evaluation = compiled.evaluate(params)
+        employees += int(np.count_nonzero(simulated))
+        ups_wins += (evaluation.ups_pension[:, simulated] > evaluation.nps_annuity[:, simulated]).sum(axis=1)
+        for name, total in totals.items():
+            total += getattr(evaluation, name)[:, simulated].sum(axis=1)
+
+    rows = []
+    for index, rule_set in enumerate(compiled.rule_sets):
+        row = {"rule_set": rule_set.name, "employees": employees}
+        row["ups_wins_share"] = ups_wins[index] / employees if employees else float("nan")
+        for name, total in totals.items():
+            row[f"mean_{name}"] = total[index] / employees if employees else float("nan")
+        row.update((f"total_{name}", total[index]) for name, total in totals.items())
+        rows.append(row)
+    return rows
+
+
+def write_scores(rows: List[Dict[str, object]], output: TextIO) -> None:
+    writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
@@ -0,0 +1,128 @@
+import math
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+# ------------------------------------------
+# Mergeable Quantile Sketch
+# ------------------------------------------
+class QuantileSketch:
+    """
+    Streaming quantile estimator with bounded relative error.
+
+    Values are counted in logarithmic buckets, so memory depends on the value
+    range rather than the number of values, and two sketches built with the
+    same accuracy can be merged by adding bucket counts. NaN values are
+    ignored.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _add_to_store(self, store: Dict[int, int], magnitudes: np.ndarray) -> None:
+        if not len(magnitudes):
+            return
+        indices = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        for index, bucket_count in zip(*np.unique(indices, return_counts=True)):
+            store[int(index)] = store.get(int(index), 0) + int(bucket_count)
+
+    def add(self, values) -> None:
+        """Add a scalar or an array of values."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        self._add_to_store(self._positive, values[values > 0])
+        self._add_to_store(self._negative, -values[values < 0])
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Merge another sketch with the same relative accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for store, other_store in ((self._positive, other._positive), (self._negative, other._negative)):
+            for index, bucket_count in other_store.items():
+                store[index] = store.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state; see from_dict."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": sorted(self._positive.items()),
+            "negative": sorted(self._negative.items()),
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"])
+        sketch._positive = {int(index): int(bucket_count) for index, bucket_count in state["positive"]}
+        sketch._negative = {int(index): int(bucket_count) for index, bucket_count in state["negative"]}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        sketch.total = state["total"]
+        if sketch.count:
+            sketch.min, sketch.max = state["min"], state["max"]
+        return sketch
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def _bucket_value(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated value at quantile q (0 <= q <= 1)."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Return estimated values for several quantiles in one pass."""
+        qs = list(qs)
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Quantiles must be between 0 and 1.")
+        if not self.count:
+            return [math.nan] * len(qs)
+
+        # Buckets in ascending value order: negatives by decreasing magnitude,
+        # then zero, then positives by increasing magnitude.
+        buckets = [(-self._bucket_value(i), self._negative[i]) for i in sorted(self._negative, reverse=True)]
+        buckets.append((0.0, self.zero_count))
+        buckets.extend((self._bucket_value(i), self._positive[i]) for i in sorted(self._positive))
+
+        results = []
+        for q in qs:
+            rank = q * (self.count - 1)
+            seen = 0
+            for value, bucket_count in buckets:
+                seen += bucket_count
+                if seen > rank:
+                    break
+            results.append(min(max(value, self.min), self.max))
+        return results
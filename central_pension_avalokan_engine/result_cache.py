@@ -0,0 +1,178 @@
+import hashlib
+import json
+import numbers
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from typing import Any, Iterable, Optional, Tuple
+
+from .pension_compare_params import PensionCompareParams
+from .core import get_corpus_info
+from .corpus_growth_calculation import ENGINE_VERSION
+from .instrumentation import count
+
+
+SUMMARY_FIELDS = ("year", "nps_corpus", "ups_corpus", "nps_annuity", "ups_pension")
+
+
+# ------------------------------------------
+# Projection & Cache Keys
+# ------------------------------------------
+def project(params: PensionCompareParams, history: bool = False) -> dict:
+    """
+    Retirement summary of `params` after calculate_pension, plus the yearly
+    history when `history` is set, as a JSON-serializable dict.
+    """
+    corpus_history = get_corpus_info(params, final_only=not history)
+    final_year = corpus_history.last()
+    if not final_year:
+        raise ValueError("years_to_retire must be at least 1.")
+    corpus_history.calculate_pension(params)
+    result = {"summary": {name: getattr(final_year, name) for name in SUMMARY_FIELDS}}
+    if history:
+        result["history"] = corpus_history.as_list_of_dict()
+    return result
+
+
+def params_key(params: PensionCompareParams, history: bool = False, engine_version: str = ENGINE_VERSION) -> str:
+    """
+    Canonical sha256 of `params`: fields are normalized to float so that
+    e.g. 5 and 5.0 hash alike while 10 and 10.5 years of service do not,
+    and the engine version is included so keys change whenever the
+    formulas do. Fields must be real numbers: a string "5" is rejected
+    rather than sharing the key of 5, as the engine treats them apart.
+    """
+    canonical = {}
+    for f in fields(params):
+        value = getattr(params, f.name)
+        if isinstance(value, bool) or not isinstance(value, numbers.Real):
+            raise TypeError(f"{f.name} must be a number, got {value!r}")
+        canonical[f.name] = float(value)
+    document = json.dumps(
+        {"engine": engine_version, "history": bool(history), "params": canonical},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+# ------------------------------------------
+# Result Cache
+# ------------------------------------------
+class ResultCache:
+    """
+    Two-tier cache of projection results keyed by params_key: an in-memory
+    LRU in front of an optional sqlite database at `path`, which survives
+    restarts. Rows written by another engine version are deleted on open.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        path: Optional[str] = None,
+        engine_version: str = ENGINE_VERSION,
+    ):
+        self.max_entries = max_entries
+        self.engine_version = engine_version
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, engine_version TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("DELETE FROM results WHERE engine_version != ?", (engine_version,))
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                count("result_cache_hits")
+                return value
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM results WHERE key = ? AND engine_version = ?",
+                    (key, self.engine_version),
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    count("result_cache_hits")
+                    count("result_cache_disk_hits")
+                    return value
+            self.misses += 1
+            count("result_cache_misses")
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Store many (key, value) pairs with a single database commit."""
+        items = list(items)
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (key, engine_version, value) VALUES (?, ?, ?)",
+                    ((key, self.engine_version, json.dumps(value)) for key, value in items),
+                )
+                self._db.commit()
+
+    def project(self, params: PensionCompareParams, history: bool = False) -> dict:
+        """Cached project(params, history)."""
+        key = params_key(params, history, self.engine_version)
+        result = self.get(key)
+        if result is None:
+            result = project(params, history)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
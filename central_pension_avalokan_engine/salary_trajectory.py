@@ -0,0 +1,227 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from .batch_corpus_calculation import (
+    BatchCorpusInfo,
+    PensionCompareParamsBatch,
+    get_compounding_factors_batch,
+)
+from .corpus_info import CORPUS_FIELDS
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+
+
+# PensionCompareParams fields that shape the salary/DA/expense trajectory.
+# The remaining fields only affect corpus growth or the pension rules, so
+# varying them can reuse an already built trajectory.
+TRAJECTORY_FIELDS = (
+    "years_to_retire",
+    "current_basic_pay",
+    "current_da_rate",
+    "current_annual_expense",
+    "expected_da_hike",
+    "expected_basic_pay_hike",
+    "expected_rate_of_inflation",
+)
+
+
+# ------------------------------------------
+# Salary Trajectory
+# ------------------------------------------
+@dataclass
+class SalaryTrajectory:
+    """
+    Year-by-year salary path of a batch of profiles as (profiles, years)
+    arrays. Years beyond a profile's horizon are marked inactive and hold
+    NaN.
+    """
+
+    years_to_retire: np.ndarray
+    active: np.ndarray
+    basic_pay: np.ndarray
+    da_rate: np.ndarray
+    salary: np.ndarray
+    next_year_basic_pay: np.ndarray
+    next_year_da_rate: np.ndarray
+    annual_expense: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.years_to_retire)
+
+    @property
+    def horizon(self) -> int:
+        return self.active.shape[1]
+
+    def final(self, name: str) -> np.ndarray:
+        """Value of a trajectory field in each profile's retirement year."""
+        values = getattr(self, name)
+        last_year = np.maximum(self.years_to_retire - 1, 0)
+        final = values[np.arange(len(self)), last_year] if self.horizon else np.full(len(self), np.nan)
+        return np.where(self.years_to_retire > 0, final, np.nan)
+
+    def final_corpus_info(
+        self, nps_corpus: np.ndarray, ups_corpus: np.ndarray, benchmark_corpus: np.ndarray
+    ) -> BatchCorpusInfo:
+        """
+        Combine the retirement year of the trajectory with (profiles,
+        scenarios) corpus arrays into a flat BatchCorpusInfo of
+        profiles * scenarios rows, profile-major. The corpus arrays are
+        broadcast against each other first.
+        """
+        nps_corpus, ups_corpus, benchmark_corpus = np.broadcast_arrays(
+            nps_corpus, ups_corpus, benchmark_corpus
+        )
+        scenarios = np.shape(nps_corpus)[1]
+
+        def expand(values: np.ndarray) -> np.ndarray:
+            return np.repeat(values, scenarios)
+
+        salary = self.final("salary")
+        return BatchCorpusInfo(
+            year=expand(self.years_to_retire),
+            basic_pay=expand(self.final("basic_pay")),
+            da_rate=expand(self.final("da_rate")),
+            salary=expand(salary),
+            next_year_basic_pay=expand(self.final("next_year_basic_pay")),
+            next_year_da_rate=expand(self.final("next_year_da_rate")),
+            monthly_nps_contrib=expand(salary * NPS_CONTRIB_RATE),
+            monthly_ups_contrib=expand(salary * UPS_CONTRIB_RATE),
+            monthly_benchmark_contrib=expand(salary * UPS_CONTRIB_RATE),
+            nps_corpus=np.ravel(nps_corpus),
+            ups_corpus=np.ravel(ups_corpus),
+            benchmark_corpus=np.ravel(benchmark_corpus),
+            annual_expense=expand(self.final("annual_expense")),
+            ups_pension=np.zeros(np.size(nps_corpus)),
+            nps_annuity=np.zeros(np.size(nps_corpus)),
+        )
+
+
+def build_salary_trajectory(params: PensionCompareParamsBatch) -> SalaryTrajectory:
+    """Compute the salary trajectory of every profile in one vectorized pass."""
+    years_to_retire = params.years_to_retire
+    horizon = int(years_to_retire.max()) if len(params) else 0
+    years = np.arange(horizon)
+    active = years < years_to_retire[:, None]
+
+    def masked(values: np.ndarray) -> np.ndarray:
+        return np.where(active, values, np.nan)
+
+    basic_pay = params.current_basic_pay[:, None] * (1 + params.expected_basic_pay_hike[:, None]) ** years
+    da_rate = params.current_da_rate[:, None] + params.expected_da_hike[:, None] * years
+    annual_expense = params.current_annual_expense[:, None] * (
+        1 + params.expected_rate_of_inflation[:, None]
+    ) ** (years + 1)
+
+    return SalaryTrajectory(
+        years_to_retire=years_to_retire,
+        active=active,
+        basic_pay=masked(basic_pay),
+        da_rate=masked(da_rate),
+        salary=masked(basic_pay * (1 + da_rate)),
+        next_year_basic_pay=masked(basic_pay * (1 + params.expected_basic_pay_hike[:, None])),
+        next_year_da_rate=masked(da_rate + params.expected_da_hike[:, None]),
+        annual_expense=masked(annual_expense),
+    )
+
+
+def accumulate_corpus(
+    trajectory: SalaryTrajectory,
+    initial_corpus,
+    return_rate,
+    contrib_rate: float,
+    keep_history: bool = False,
+) -> np.ndarray:
+    """
+    Grow a corpus along a salary trajectory.
+
+    `initial_corpus`, `return_rate` and `contrib_rate` broadcast against
+    (profiles, scenarios), so many return scenarios share one trajectory;
+    pass per-profile values as `values[:, None]`. Returns each profile's
+    retirement corpus as (profiles, scenarios), or with `keep_history` the
+    corpus after every year as (profiles, scenarios, years).
+    """
+    corpus_growth, annuity_factor = get_compounding_factors_batch(return_rate)
+    contrib_factor = np.asarray(contrib_rate, dtype=np.float64) * annuity_factor
+    corpus = np.broadcast_to(
+        np.asarray(initial_corpus, dtype=np.float64),
+        np.broadcast_shapes(np.shape(initial_corpus), np.shape(contrib_factor), (len(trajectory), 1)),
+    ).copy()
+
+    history = np.full(corpus.shape + (trajectory.horizon,), np.nan) if keep_history else None
+    for year in range(trajectory.horizon):
+        active = trajectory.active[:, year, None]
+        grown = corpus * corpus_growth + trajectory.salary[:, year, None] * contrib_factor
+        corpus = np.where(active, grown, corpus)
+        if keep_history:
+            history[..., year] = np.where(active, corpus, np.nan)
+
+    return history if keep_history else corpus
+
+
+def simulate_final_corpus_info(
+    params: PensionCompareParamsBatch, trajectory: Optional[SalaryTrajectory] = None
+) -> BatchCorpusInfo:
+    """
+    Retirement-year corpus info of every profile, equivalent to
+    get_corpus_info_batch. Pass the `trajectory` of an earlier call when
+    only non-trajectory fields of `params` changed, to skip rebuilding it.
+    """
+    if trajectory is None:
+        trajectory = build_salary_trajectory(params)
+    initial_corpus = params.current_total_nps_corpus[:, None]
+    nps_return = params.expected_nps_return[:, None]
+    return trajectory.final_corpus_info(
+        accumulate_corpus(trajectory, initial_corpus, nps_return, NPS_CONTRIB_RATE),
+        accumulate_corpus(trajectory, initial_corpus, nps_return, UPS_CONTRIB_RATE),
+        accumulate_corpus(
+            trajectory,
+            initial_corpus,
+            params.expected_benchmark_corpus_return[:, None],
+            UPS_CONTRIB_RATE,
+        ),
+    )
+
+
+def simulate_history_columns(params: PensionCompareParamsBatch) -> Dict[str, np.ndarray]:
+    """
+    Year-by-year history of every profile as (profiles, years) arrays keyed
+    by YearlyCorpusInfo field name, NaN beyond each profile's horizon. As
+    with CorpusInfo.calculate_pension, the retirement year holds the
+    pension values and the corpora available at retirement.
+    """
+    trajectory = build_salary_trajectory(params)
+    initial_corpus = params.current_total_nps_corpus[:, None]
+    nps_return = params.expected_nps_return[:, None]
+    corpora = {
+        name: accumulate_corpus(trajectory, initial_corpus, return_rate, contrib_rate, keep_history=True)[:, 0]
+        for name, return_rate, contrib_rate in (
+            ("nps_corpus", nps_return, NPS_CONTRIB_RATE),
+            ("ups_corpus", nps_return, UPS_CONTRIB_RATE),
+            ("benchmark_corpus", params.expected_benchmark_corpus_return[:, None], UPS_CONTRIB_RATE),
+        )
+    }
+    salary = trajectory.salary
+    columns = {
+        "year": np.where(trajectory.active, np.arange(1, trajectory.horizon + 1), np.nan),
+        "basic_pay": trajectory.basic_pay,
+        "da_rate": trajectory.da_rate,
+        "salary": salary,
+        "next_year_basic_pay": trajectory.next_year_basic_pay,
+        "next_year_da_rate": trajectory.next_year_da_rate,
+        "monthly_nps_contrib": salary * NPS_CONTRIB_RATE,
+        "monthly_ups_contrib": salary * UPS_CONTRIB_RATE,
+        "monthly_benchmark_contrib": salary * UPS_CONTRIB_RATE,
+        "annual_expense": trajectory.annual_expense,
+        "ups_pension": np.where(trajectory.active, 0.0, np.nan),
+        "nps_annuity": np.where(trajectory.active, 0.0, np.nan),
+        **corpora,
+    }
+
+    final = simulate_final_corpus_info(params, trajectory)
+    final.calculate_pension(params)
+    rows = np.flatnonzero(params.years_to_retire > 0)
+    last_year = params.years_to_retire[rows] - 1
+    for name in ("ups_pension", "nps_annuity", "ups_corpus", "nps_corpus"):
+        columns[name][rows, last_year] = getattr(final, name)[rows]
+    return {name: columns[name] for name in CORPUS_FIELDS}
@@ -0,0 +1,113 @@
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .batch_corpus_calculation import PARAM_FIELDS, BatchCorpusInfo, PensionCompareParamsBatch
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+from .salary_trajectory import (
+    TRAJECTORY_FIELDS,
+    SalaryTrajectory,
+    accumulate_corpus,
+    build_salary_trajectory,
+)
+
+
+# ------------------------------------------
+# Scenario Comparison Result
+# ------------------------------------------
+@dataclass
+class ScenarioComparison:
+    """
+    Corpus paths of one profile under several scenarios. The corpus
+    matrices are (scenarios, years), where column y is the end of year
+    years[y]; `retirement` holds one row per scenario after
+    calculate_pension.
+    """
+
+    scenarios: List[Dict[str, float]]
+    trajectory: SalaryTrajectory
+    years: np.ndarray
+    nps_corpus: np.ndarray
+    ups_corpus: np.ndarray
+    benchmark_corpus: np.ndarray
+    retirement: BatchCorpusInfo
+
+    def __len__(self) -> int:
+        return len(self.scenarios)
+
+    @property
+    def nps_minus_ups_pension(self) -> np.ndarray:
+        return self.retirement.nps_annuity - self.retirement.ups_pension
+
+
+# ------------------------------------------
+# Scenario Engine
+# ------------------------------------------
+def compare_scenarios(
+    params: PensionCompareParams, scenarios: Sequence[Mapping[str, float]]
+) -> ScenarioComparison:
+    """
+    Run `params` under each scenario, a mapping of PensionCompareParams
+    field overrides (returns, annuity rate, withdrawal percentage, ...).
+
+    The salary/DA/contribution trajectory is computed once and shared by
+    every scenario, and all scenarios then grow together as arrays, so N
+    return scenarios cost about as much as one run. Overrides of fields
+    in TRAJECTORY_FIELDS would change that trajectory and are rejected;
+    use sweep for those.
+    """
+    scenarios = [dict(scenario) for scenario in scenarios]
+    if not scenarios:
+        raise ValueError("At least one scenario is required.")
+    names = set().union(*scenarios)
+    unknown = names - set(PARAM_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown scenario field(s): {', '.join(sorted(unknown))}")
+    shaping = names & set(TRAJECTORY_FIELDS)
+    if shaping:
+        raise ValueError(
+            f"Scenario field(s) {', '.join(sorted(shaping))} change the salary trajectory; use sweep instead."
+        )
+
+    base = asdict(params)
+    columns = {
+        name: np.array([scenario.get(name, base[name]) for scenario in scenarios], dtype=np.float64)
+        for name in PARAM_FIELDS
+    }
+    trajectory = build_salary_trajectory(PensionCompareParamsBatch.from_params([params]))
+
+    def scenario_values(name: str) -> np.ndarray:
+        # Shaped (1, scenarios): one profile, broadcast across scenarios
+        return columns[name].reshape(1, -1)
+
+    initial_corpus = scenario_values("current_total_nps_corpus")
+    nps_return = scenario_values("expected_nps_return")
+    benchmark_return = scenario_values("expected_benchmark_corpus_return")
+    nps_corpus, ups_corpus, benchmark_corpus = (
+        accumulate_corpus(trajectory, initial_corpus, return_rate, contrib_rate, keep_history=True)[0]
+        for return_rate, contrib_rate in (
+            (nps_return, NPS_CONTRIB_RATE),
+            (nps_return, UPS_CONTRIB_RATE),
+            (benchmark_return, UPS_CONTRIB_RATE),
+        )
+    )
+
+    def final(history: np.ndarray) -> np.ndarray:
+        if not trajectory.horizon:
+            return np.full((1, len(scenarios)), np.nan)
+        return history[None, :, -1]
+
+    retirement = trajectory.final_corpus_info(final(nps_corpus), final(ups_corpus), final(benchmark_corpus))
+    retirement.calculate_pension(PensionCompareParamsBatch.from_columns(**columns))
+
+    return ScenarioComparison(
+        scenarios=scenarios,
+        trajectory=trajectory,
+        years=np.arange(1, trajectory.horizon + 1),
+        nps_corpus=nps_corpus,
+        ups_corpus=ups_corpus,
+        benchmark_corpus=benchmark_corpus,
+        retirement=retirement,
+    )
@@ -0,0 +1,283 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .corpus_info import (
+    CORPUS_FIELDS,
+    FULL_PENSION_SERVICE_MONTHS,
+    MINIMUM_UPS_PENSION,
+    UPS_LUMPSUM_DIVISOR,
+)
+from .batch_corpus_calculation import PARAM_FIELDS, BatchCorpusInfo, PensionCompareParamsBatch
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+
+
+# years_to_retire sets the number of simulated years, so it has no
+# derivative; every other PensionCompareParams field is differentiated.
+SENSITIVITY_FIELDS = tuple(name for name in PARAM_FIELDS if name != "years_to_retire")
+
+# YearlyCorpusInfo fields with a gradient (all but the year counter)
+SENSITIVITY_OUTPUTS = tuple(name for name in CORPUS_FIELDS if name != "year")
+
+
+# ------------------------------------------
+# Forward-mode Dual Arrays
+# ------------------------------------------
+class Dual:
+    """
+    Array of values carrying their gradient: `value` is (profiles,) and
+    `grad` is (fields, profiles), the derivative of each value with respect
+    to each seeded input. Arithmetic with plain numbers and arrays treats
+    them as constants.
+    """
+
+    __slots__ = ("value", "grad")
+
+    # Make numpy arrays defer to the reflected Dual operators
+    __array_ufunc__ = None
+
+    def __init__(self, value: np.ndarray, grad: np.ndarray):
+        self.value = value
+        self.grad = grad
+
+    def __add__(self, other) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.grad + other.grad)
+        return Dual(self.value + other, self.grad)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "Dual":
+        return Dual(-self.value, -self.grad)
+
+    def __sub__(self, other) -> "Dual":
+        return self + (-other)
+
+    def __rsub__(self, other) -> "Dual":
+        return (-self) + other
+
+    def __mul__(self, other) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value, self.grad * other.value + other.grad * self.value)
+        return Dual(self.value * other, self.grad * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other) -> "Dual":
+        if isinstance(other, Dual):
+            value = self.value / other.value
+            return Dual(value, (self.grad - other.grad * value) / other.value)
+        return Dual(self.value / other, self.grad / other)
+
+    def __pow__(self, exponent: int) -> "Dual":
+        """Integer power by repeated multiplication (exponent >= 1)."""
+        result = self
+        for _ in range(exponent - 1):
+            result = result * self
+        return result
+
+
+def where(condition: np.ndarray, first: Dual, second: Dual) -> Dual:
+    """np.where for Duals; the gradient follows the chosen branch."""
+    return Dual(
+        np.where(condition, first.value, second.value),
+        np.where(condition, first.grad, second.grad),
+    )
+
+
+def _constant(value, size: int) -> Dual:
+    return Dual(np.broadcast_to(np.asarray(value, dtype=np.float64), (size,)), np.zeros((1, size)))
+
+
+def seed(params: PensionCompareParamsBatch) -> Dict[str, Dual]:
+    """
+    Dual view of every parameter column: fields in SENSITIVITY_FIELDS get
+    a unit gradient in their own row, years_to_retire none.
+    """
+    size = len(params)
+    duals = {}
+    for index, name in enumerate(SENSITIVITY_FIELDS):
+        grad = np.zeros((len(SENSITIVITY_FIELDS), size))
+        grad[index] = 1.0
+        duals[name] = Dual(getattr(params, name).astype(np.float64), grad)
+    return duals
+
+
+# ------------------------------------------
+# Differentiated Engine
+# ------------------------------------------
+def get_compounding_factors_dual(return_rate: Dual) -> Tuple[Dual, Dual]:
+    """
+    (corpus_growth, annuity_factor) of get_compounding_factors_batch with
+    gradients. The annuity factor ((1 + r)**12 - 1) / r is evaluated as
+    1 + (1 + r) * (1 + (1 + r) * ...) in Horner form, which is exact and
+    smooth through r = 0 where the quotient form is singular.
+    """
+    monthly_growth = 1 + return_rate / 12
+    annuity_factor = _constant(1.0, len(return_rate.value))
+    for _ in range(11):
+        annuity_factor = annuity_factor * monthly_growth + 1
+    return monthly_growth ** 12, annuity_factor
+
+
+def _simulate_dual(params: PensionCompareParamsBatch, duals: Dict[str, Dual]) -> Dict[str, Dual]:
+    """
+    Retirement year of every profile as in get_corpus_info_batch, following
+    calculate_accumulated_corpus year by year on Duals.
+    """
+    size = len(params)
+    nps_growth, nps_annuity_factor = get_compounding_factors_dual(duals["expected_nps_return"])
+    benchmark_growth, benchmark_annuity_factor = get_compounding_factors_dual(
+        duals["expected_benchmark_corpus_return"]
+    )
+    inflation = 1 + duals["expected_rate_of_inflation"]
+
+    basic_pay = duals["current_basic_pay"]
+    da_rate = duals["current_da_rate"]
+    annual_expense = duals["current_annual_expense"] * inflation
+    nps_corpus = ups_corpus = benchmark_corpus = duals["current_total_nps_corpus"]
+    state = None
+
+    horizon = int(params.years_to_retire.max()) if size else 0
+    for year in range(horizon):
+        if state is not None:
+            basic_pay = state["next_year_basic_pay"]
+            da_rate = state["next_year_da_rate"]
+            annual_expense = state["annual_expense"] * inflation
+            nps_corpus, ups_corpus, benchmark_corpus = (
+                state["nps_corpus"], state["ups_corpus"], state["benchmark_corpus"]
+            )
+
+        salary = basic_pay * (1 + da_rate)
+        nps_contrib = salary * NPS_CONTRIB_RATE
+        ups_contrib = salary * UPS_CONTRIB_RATE
+        computed = {
+            "basic_pay": basic_pay,
+            "da_rate": da_rate,
+            "salary": salary,
+            "next_year_basic_pay": basic_pay * (1 + duals["expected_basic_pay_hike"]),
+            "next_year_da_rate": da_rate + duals["expected_da_hike"],
+            "annual_expense": annual_expense,
+            "monthly_nps_contrib": nps_contrib,
+            "monthly_ups_contrib": ups_contrib,
+            "monthly_benchmark_contrib": ups_contrib,
+            "nps_corpus": nps_corpus * nps_growth + nps_contrib * nps_annuity_factor,
+            "ups_corpus": ups_corpus * nps_growth + ups_contrib * nps_annuity_factor,
+            "benchmark_corpus": benchmark_corpus * benchmark_growth + ups_contrib * benchmark_annuity_factor,
+        }
+        if state is None:
+            state = computed
+        else:
+            active = params.years_to_retire > year
+            state = {name: where(active, computed[name], state[name]) for name in computed}
+
+    return state or {}
+
+
+def _pension_dual(info: Dict[str, Dual], duals: Dict[str, Dual], params: PensionCompareParamsBatch):
+    """update_pension_info_batch on Duals; returns the same four values."""
+    withdrawal = duals["withdrawal_percentage"]
+
+    # NPS calculations
+    nps_corpus = info["nps_corpus"] * withdrawal
+    nps_annuity = info["nps_corpus"] * (1 - withdrawal) * duals["expected_annuity_rate"] / 12
+
+    # UPS calculations
+    total_service_years = duals["current_service"] + params.years_to_retire
+    uncapped_ratio = total_service_years * (12 / FULL_PENSION_SERVICE_MONTHS)
+    service_ratio = where(uncapped_ratio.value < 1, uncapped_ratio, _constant(1.0, len(params)))
+
+    avg_basic_pay = (info["basic_pay"] + info["next_year_basic_pay"]) / 2
+    max_ups_pension = avg_basic_pay * service_ratio
+
+    final_drawn_salary = info["next_year_basic_pay"] * (1 + info["next_year_da_rate"])
+    ups_lumpsum = total_service_years * 2 * final_drawn_salary / UPS_LUMPSUM_DIVISOR
+
+    remaining_ups_corpus = info["ups_corpus"] * (1 - withdrawal)
+    ups_corpus = ups_lumpsum + info["ups_corpus"] * withdrawal
+
+    full_pension = remaining_ups_corpus.value >= info["benchmark_corpus"].value
+    ups_corpus = where(full_pension, ups_corpus + info["ups_corpus"] - info["benchmark_corpus"], ups_corpus)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reduced_pension = max_ups_pension * (remaining_ups_corpus / info["benchmark_corpus"])
+    ups_pension_basic_pay = where(full_pension, max_ups_pension, reduced_pension)
+    ups_pension_basic_pay = where(
+        ups_pension_basic_pay.value < MINIMUM_UPS_PENSION,
+        _constant(MINIMUM_UPS_PENSION, len(params)),
+        ups_pension_basic_pay,
+    )
+
+    ups_pension = ups_pension_basic_pay * (1 + info["next_year_da_rate"])
+    return ups_pension, nps_annuity, ups_corpus, nps_corpus
+
+
+# ------------------------------------------
+# Sensitivity Result
+# ------------------------------------------
+@dataclass
+class CorpusSensitivity:
+    """
+    Retirement-year values of every profile, after calculate_pension, with
+    their gradients. gradients[output] is (profiles, fields), with fields
+    in the order of `fields` (SENSITIVITY_FIELDS).
+    """
+
+    info: BatchCorpusInfo
+    gradients: Dict[str, np.ndarray]
+    fields: Tuple[str, ...] = SENSITIVITY_FIELDS
+
+    def __len__(self) -> int:
+        return len(self.info)
+
+    def derivative(self, output: str, wrt: str) -> np.ndarray:
+        """d output / d wrt for every profile."""
+        return self.gradients[output][:, self.fields.index(wrt)]
+
+    def per_percent(self, output: str, wrt: str) -> np.ndarray:
+        """First-order change of `output` per +1 percentage point of `wrt`."""
+        return 0.01 * self.derivative(output, wrt)
+
+    def as_dict(self, index: int = 0) -> Dict[str, Dict[str, float]]:
+        """Gradients of profile `index` as {output: {field: derivative}}."""
+        return {
+            output: dict(zip(self.fields, gradient[index].tolist()))
+            for output, gradient in self.gradients.items()
+        }
+
+
+def get_corpus_sensitivity_batch(params: PensionCompareParamsBatch) -> CorpusSensitivity:
+    """
+    Simulate every profile once, returning the values of
+    get_corpus_info_batch followed by calculate_pension together with their
+    gradient against every field in SENSITIVITY_FIELDS.
+
+    Derivatives are one-sided at the kinks of the pension rules (service
+    ratio cap, full-pension test, minimum pension). Profiles with no
+    simulated year have NaN values and gradients.
+    """
+    size = len(params)
+    duals = seed(params)
+    final = _simulate_dual(params, duals)
+    info = BatchCorpusInfo.empty(size)
+    gradients = {name: np.full((size, len(SENSITIVITY_FIELDS)), np.nan) for name in SENSITIVITY_OUTPUTS}
+    if not final:
+        return CorpusSensitivity(info=info, gradients=gradients)
+
+    has_history = params.years_to_retire > 0
+    info.year = np.where(has_history, params.years_to_retire, 0)
+    final["ups_pension"], final["nps_annuity"], final["ups_corpus"], final["nps_corpus"] = _pension_dual(
+        final, duals, params
+    )
+    for name in SENSITIVITY_OUTPUTS:
+        dual = final[name]
+        setattr(info, name, np.where(has_history, dual.value, np.nan))
+        grad = np.broadcast_to(dual.grad, (len(SENSITIVITY_FIELDS), size))
+        gradients[name] = np.where(has_history[:, None], grad.T, np.nan)
+    return CorpusSensitivity(info=info, gradients=gradients)
+
+
+def get_corpus_sensitivity(params: PensionCompareParams) -> CorpusSensitivity:
+    """get_corpus_sensitivity_batch for a single profile."""
+    return get_corpus_sensitivity_batch(PensionCompareParamsBatch.from_params([params]))
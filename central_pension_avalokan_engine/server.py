@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+import traceback
+from collections import deque
+from dataclasses import fields
+from http import HTTPStatus
+from typing import Any, Deque, List, Optional, Tuple
+
+from .pension_compare_params import PensionCompareParams
+from .corpus_growth_calculation import compounding_factor_cache_info
+from .result_cache import SUMMARY_FIELDS, ResultCache, params_key
+
+
+PARAM_NAMES = tuple(f.name for f in fields(PensionCompareParams))
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_YEARS_TO_RETIRE = 100
+
+
+class RequestError(ValueError):
+    """Invalid request; reported to the client as 400 Bad Request."""
+
+
+def params_from_json(payload: Any) -> PensionCompareParams:
+    """Build PensionCompareParams from a JSON object of field values."""
+    if not isinstance(payload, dict):
+        raise RequestError("Expected a JSON object of PensionCompareParams fields.")
+    unknown = set(payload) - set(PARAM_NAMES)
+    if unknown:
+        raise RequestError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    for name, value in payload.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RequestError(f"{name} must be a number.")
+        if not math.isfinite(value):
+            raise RequestError(f"{name} must be finite.")
+    years = payload.get("years_to_retire")
+    if years is not None and (years % 1 or not 1 <= years <= MAX_YEARS_TO_RETIRE):
+        raise RequestError(f"years_to_retire must be a whole number from 1 to {MAX_YEARS_TO_RETIRE}.")
+    try:
+        return PensionCompareParams(**payload)
+    except TypeError as exc:
+        raise RequestError(str(exc))
+
+
+def _check_finite(result: dict, label: str) -> None:
+    """Reject projections that overflowed, which JSON cannot encode."""
+    values = list(result["summary"].values())
+    for row in result.get("history", ()):
+        values.extend(row.values())
+    if not all(math.isfinite(value) for value in values):
+        raise RequestError(f"{label} overflows; check the rates and years.")
+
+
+# ------------------------------------------
+# Simulation Service
+# ------------------------------------------
+class SimulationService:
+    """
+    Request handling independent of the transport: results are memoized in
+    a ResultCache and request latencies are tracked for p50/p99 reporting.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 4096,
+        latency_window: int = 10000,
+        cache_path: Optional[str] = None,
+    ):
+        self.cache = ResultCache(max_entries=cache_size, path=cache_path)
+        self.requests = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+    def simulate(self, params: PensionCompareParams, history: bool = False) -> dict:
+        """Retirement summary (and optionally the yearly history) of one profile."""
+        try:
+            result = self.cache.project(params, history)
+        except ValueError as exc:
+            raise RequestError(str(exc))
+        _check_finite(result, "The projection")
+        return result
+
+    def simulate_batch(self, params_list: List[PensionCompareParams]) -> List[dict]:
+        """Retirement summaries of many profiles; cache misses run vectorized."""
+        # Imported here so single-profile serving does not need NumPy
+        from .batch_corpus_calculation import PensionCompareParamsBatch, get_corpus_info_batch
+
+        keys = [params_key(params) for params in params_list]
+        results: List[Optional[dict]] = [self.cache.get(key) for key in keys]
+        for index, result in enumerate(results):
+            if result is not None:
+                _check_finite(result, f"Profile {index}")
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            params = PensionCompareParamsBatch.from_params(params_list[i] for i in missing)
+            corpus_info = get_corpus_info_batch(params)
+            corpus_info.calculate_pension(params)
+            columns = {name: getattr(corpus_info, name).tolist() for name in SUMMARY_FIELDS}
+            computed = []
+            for position, index in enumerate(missing):
+                if columns["year"][position] == 0:
+                    raise RequestError(f"Profile {index}: years_to_retire must be at least 1.")
+                result = {"summary": {name: columns[name][position] for name in SUMMARY_FIELDS}}
+                _check_finite(result, f"Profile {index}")
+                computed.append((keys[index], result))
+                results[index] = result
+            # One database commit for the whole batch
+            self.cache.put_many(computed)
+        return results
+
+    def record_latency(self, seconds: float) -> None:
+        self.requests += 1
+        self._latencies.append(seconds)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return 1000 * latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+        factor_cache = compounding_factor_cache_info()
+        return {
+            "requests": self.requests,
+            "latency_ms": {"p50": percentile(0.50), "p99": percentile(0.99)},
+            "result_cache": self.cache.stats(),
+            "compounding_factor_cache": {
+                "hits": factor_cache.hits,
+                "misses": factor_cache.misses,
+                "size": factor_cache.currsize,
+            },
+        }
+
+    def handle(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Any]:
+        """Route one request and return (status, JSON-serializable payload)."""
+        if method == "GET" and path == "/stats":
+            return HTTPStatus.OK, self.stats()
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if method != "POST" or path not in ("/simulate", "/simulate/batch"):
+            return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise RequestError("Request body is not valid JSON.")
+
+        if path == "/simulate":
+            if not isinstance(payload, dict):
+                raise RequestError("Expected a JSON object.")
+            include_history = payload.pop("history", False)
+            if not isinstance(include_history, bool):
+                raise RequestError('"history" must be true or false.')
+            return HTTPStatus.OK, self.simulate(params_from_json(payload), include_history)
+
+        profiles = payload.get("profiles") if isinstance(payload, dict) else None
+        if not isinstance(profiles, list):
+            raise RequestError('Expected {"profiles": [...]}.')
+        return HTTPStatus.OK, {"results": self.simulate_batch([params_from_json(p) for p in profiles])}
+
+
+# ------------------------------------------
+# HTTP Transport
+# ------------------------------------------
+def _encode_response(status: HTTPStatus, payload: Any, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, allow_nan=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _handle_connection(
+    service: SimulationService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            start = time.perf_counter()
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_encode_response(HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False))
+                break
+            path = target.split("?")[0]
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                # The body cannot be framed, so the connection cannot be reused
+                writer.write(_encode_response(HTTPStatus.BAD_REQUEST, {"error": "Malformed Content-Length"}, False))
+                break
+            if length > MAX_BODY_BYTES:
+                writer.write(_encode_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            try:
+                if path == "/simulate/batch":
+                    # Large batches run off the event loop
+                    loop = asyncio.get_running_loop()
+                    status, payload = await loop.run_in_executor(None, service.handle, method, path, body)
+                else:
+                    status, payload = service.handle(method, path, body)
+            except (TypeError, ValueError) as exc:
+                # RequestError, or field values of the wrong type
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+            except ArithmeticError as exc:
+                # e.g. OverflowError of the scalar engine on extreme inputs
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": f"Projection failed: {exc}"}
+            except Exception:
+                traceback.print_exc()
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+            try:
+                response = _encode_response(status, payload, keep_alive)
+            except ValueError:
+                # Non-finite values are not JSON
+                traceback.print_exc()
+                response = _encode_response(
+                    HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Result is not finite"}, keep_alive
+                )
+            writer.write(response)
+            await writer.drain()
+            service.record_latency(time.perf_counter() - start)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service: SimulationService, host: str, port: int) -> asyncio.AbstractServer:
+    """Start serving `service` over HTTP and return the asyncio server."""
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port
+    )
+
+
+async def _run(host: str, port: int, cache_size: int, cache_path: Optional[str]) -> None:
+    server = await serve(SimulationService(cache_size=cache_size, cache_path=cache_path), host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving pension simulations on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve pension simulations over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument(
+        "--cache-size", type=int, default=4096, help="Cached results kept in memory (default: 4096)"
+    )
+    parser.add_argument(
+        "--cache-db", default=None, help="SQLite file persisting cached results across restarts"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(_run(args.host, args.port, args.cache_size, args.cache_db))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
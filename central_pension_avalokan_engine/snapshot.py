@@ -0,0 +1,434 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .corpus_info import CORPUS_FIELDS, CorpusInfo, YearlyCorpusInfo
+from .batch_corpus_calculation import PARAM_FIELDS, PensionCompareParamsBatch
+from .corpus_growth_calculation import ENGINE_VERSION
+from .instrumentation import count, stage
+
+
+# File layout, all little-endian:
+#   preamble   PREAMBLE.size bytes: magic, format version, employees (E),
+#              fields (F), years (T), params (P), metadata offset and length
+#   histories  E x F x T float64, one contiguous F x T block per employee,
+#              years beyond an employee's horizon NaN
+#   params     E x P float64, PensionCompareParams fields per employee
+#   metadata   UTF-8 JSON: employee ids, field names, engine version, ...
+SNAPSHOT_MAGIC = b"PCSNAP\r\n"
+SNAPSHOT_FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sII6Q")
+DTYPE = np.dtype("<f8")
+
+# Default years per employee; covers a full 42-year career
+SNAPSHOT_YEARS = 45
+
+
+# ------------------------------------------
+# Writer
+# ------------------------------------------
+class SnapshotWriter:
+    """
+    Stream simulated histories of many employees into a snapshot file.
+    Every employee gets `years` slots per field; longer histories are
+    rejected. The file is written under a temporary name and moved into
+    place by close(), so an interrupted run never leaves a partial snapshot.
+
+    Usage:
+        with SnapshotWriter("nightly.snap") as writer:
+            writer.write_columns(ids, params, simulate_history_columns(params))
+    """
+
+    def __init__(
+        self, file_path: Union[str, Path], years: int = SNAPSHOT_YEARS, metadata: Optional[dict] = None
+    ):
+        self.file_path = Path(file_path)
+        self.years = years
+        self.metadata = dict(metadata or {})
+        self.employee_ids: List[str] = []
+        self._seen = set()
+        self._temporary = Path(f"{self.file_path}.tmp")
+        self._file = open(self._temporary, "w+b")
+        self._file.write(bytes(PREAMBLE.size))
+        # Params go after every history; spool them until close()
+        self._params = tempfile.TemporaryFile()
+
+    def write_columns(
+        self,
+        employee_ids: Sequence,
+        params: PensionCompareParamsBatch,
+        columns: Mapping[str, np.ndarray],
+    ) -> int:
+        """
+        Write a batch of employees from (employees, years) arrays keyed by
+        YearlyCorpusInfo field name, e.g. simulate_history_columns output.
+        """
+        employee_ids = [str(employee_id) for employee_id in employee_ids]
+        if len(employee_ids) != len(params):
+            raise ValueError("employee_ids and params must have the same length.")
+        unique_ids = set(employee_ids)
+        if len(unique_ids) != len(employee_ids) or not self._seen.isdisjoint(unique_ids):
+            raise ValueError("Employee ids must be unique within a snapshot.")
+
+        with stage("export_snapshot"):
+            block = np.full((len(employee_ids), len(CORPUS_FIELDS), self.years), np.nan, dtype=DTYPE)
+            for index, name in enumerate(CORPUS_FIELDS):
+                values = np.asarray(columns[name], dtype=np.float64).reshape(len(employee_ids), -1)
+                if values.shape[1] > self.years:
+                    raise ValueError(
+                        f"History of {values.shape[1]} years exceeds the snapshot's {self.years} years."
+                    )
+                block[:, index, :values.shape[1]] = values
+            self._file.write(block.data)
+            self._params.write(
+                np.stack([getattr(params, name) for name in PARAM_FIELDS], axis=1).astype(DTYPE).data
+            )
+        self.employee_ids.extend(employee_ids)
+        self._seen.update(unique_ids)
+        return len(employee_ids)
+
+    def write_history(self, employee_id, params: PensionCompareParams, history: CorpusInfo) -> int:
+        """Write one employee's CorpusInfo (or ColumnarCorpusInfo) history."""
+        columns = {name: [[getattr(row, name) for row in history]] for name in CORPUS_FIELDS}
+        return self.write_columns([employee_id], PensionCompareParamsBatch.from_params([params]), columns)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        with self._file, self._params:
+            self._params.seek(0)
+            shutil.copyfileobj(self._params, self._file)
+            metadata = dict(
+                self.metadata,
+                engine_version=ENGINE_VERSION,
+                fields=list(CORPUS_FIELDS),
+                param_fields=list(PARAM_FIELDS),
+                employee_ids=self.employee_ids,
+                created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            )
+            encoded = json.dumps(metadata).encode("utf-8")
+            metadata_offset = self._file.tell()
+            self._file.write(encoded)
+            self._file.seek(0)
+            self._file.write(
+                PREAMBLE.pack(
+                    SNAPSHOT_MAGIC,
+                    SNAPSHOT_FORMAT_VERSION,
+                    0,
+                    len(self.employee_ids),
+                    len(CORPUS_FIELDS),
+                    self.years,
+                    len(PARAM_FIELDS),
+                    metadata_offset,
+                    len(encoded),
+                )
+            )
+        os.replace(self._temporary, self.file_path)
+        count("bytes_written", self.file_path.stat().st_size)
+        count("rows_written", len(self.employee_ids) * self.years)
+
+    def abort(self) -> None:
+        """Discard everything written so far."""
+        self._file.close()
+        self._params.close()
+        self._temporary.unlink()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        elif not self._file.closed:
+            self.abort()
+
+
+# ------------------------------------------
+# Memory-mapped Reader
+# ------------------------------------------
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file. `histories` is an
+    (employees, fields, years) array and `params` an (employees, params)
+    array, both backed directly by the mapping, so history() and column()
+    are zero-copy views and only the pages touched are read from disk.
+    Views stay valid after close(), which leaves the mapping to be released
+    with the last of them.
+    """
+
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        with open(self.file_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._mmap) < PREAMBLE.size:
+            raise ValueError(f"{self.file_path} is not a snapshot file")
+        magic, version, _, employees, fields, years, params, metadata_offset, metadata_length = (
+            PREAMBLE.unpack_from(self._mmap)
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{self.file_path} is not a snapshot file")
+        if version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {version} in {self.file_path}")
+        params_offset = PREAMBLE.size + employees * fields * years * DTYPE.itemsize
+        if params_offset + employees * params * DTYPE.itemsize != metadata_offset or (
+            metadata_offset + metadata_length != len(self._mmap)
+        ):
+            raise ValueError(f"{self.file_path} is truncated or corrupt")
+
+        self.metadata = json.loads(self._mmap[metadata_offset:metadata_offset + metadata_length])
+        self.histories = np.frombuffer(
+            self._mmap, dtype=DTYPE, count=employees * fields * years, offset=PREAMBLE.size
+        ).reshape(employees, fields, years)
+        self.params = np.frombuffer(
+            self._mmap, dtype=DTYPE, count=employees * params, offset=params_offset
+        ).reshape(employees, params)
+        self.employee_ids: List[str] = self.metadata["employee_ids"]
+        self.fields: Tuple[str, ...] = tuple(self.metadata["fields"])
+        self.param_fields: Tuple[str, ...] = tuple(self.metadata["param_fields"])
+        self.engine_version: str = self.metadata["engine_version"]
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.histories.shape[0]
+
+    @property
+    def years(self) -> int:
+        return self.histories.shape[2]
+
+    def index_of(self, employee_id) -> int:
+        """Position of an employee id; the lookup table is built on first use."""
+        if self._index is None:
+            self._index = {employee_id: index for index, employee_id in enumerate(self.employee_ids)}
+        return self._index[str(employee_id)]
+
+    def history(self, index: int) -> np.ndarray:
+        """(fields, years) view of one employee, in `fields` order."""
+        return self.histories[index]
+
+    def column(self, name: str) -> np.ndarray:
+        """(employees, years) view of one field across every employee."""
+        return self.histories[:, self.fields.index(name), :]
+
+    def corpus_info(self, index: int) -> CorpusInfo:
+        """One employee's history as a CorpusInfo."""
+        history = CorpusInfo()
+        block = self.histories[index]
+        years = int(np.count_nonzero(~np.isnan(block[self.fields.index("year")])))
+        for year in range(years):
+            values = dict(zip(self.fields, block[:, year].tolist()))
+            values["year"] = int(values["year"])
+            history.add(YearlyCorpusInfo(**values))
+        return history
+
+    def params_of(self, index: int) -> PensionCompareParams:
+        values = dict(zip(self.param_fields, self.params[index].tolist()))
+        for name in ("current_service", "years_to_retire"):
+            values[name] = int(values[name])
+        return PensionCompareParams(**values)
+
+    def close(self) -> None:
+        """
+        Release the mapping. Views returned by history() or column() stay
+        valid: while any is alive the mapping is left open and is released
+        when the last one is garbage collected.
+        """
+        if self._mmap is None:
+            return
+        # Drop our own views first; the mapping cannot close while exported
+        self.histories = self.params = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._mmap = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_cohort_snapshot(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    chunk_size: int = 10000,
+    years: int = SNAPSHOT_YEARS,
+) -> int:
+    """
+    Simulate the full history of every profile of a cohort CSV/JSONL file
+    (see cohort.iter_profile_chunks) into a snapshot. Returns the number of
+    employees written.
+    """
+    # Imported here: cohort keeps NumPy out of its module scope
+    from .cohort import iter_profile_chunks
+    from .salary_trajectory import simulate_history_columns
+
+    with SnapshotWriter(output_path, years, metadata={"input": os.fspath(input_path)}) as writer:
+        for ids, columns in iter_profile_chunks(input_path, chunk_size):
+            params = PensionCompareParamsBatch.from_columns(**columns)
+            writer.write_columns(ids, params, simulate_history_columns(params))
+    return len(writer.employee_ids)
+
+
+# ------------------------------------------
+# Snapshot Diff
+# ------------------------------------------
+@dataclass
+class FieldDiff:
+    changed_values: int = 0
+    max_abs_diff: float = 0.0
+
+
+@dataclass
+class SnapshotDiff:
+    """
+    Differences between two snapshots, matching employees by id. Values
+    equal within the tolerances, and NaN in both, count as unchanged.
+    `changed_ids` lists at most `limit` changed employees, in new order.
+    """
+
+    old_engine_version: str
+    new_engine_version: str
+    compared: int = 0
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed_employees: int = 0
+    changed_ids: List[str] = field(default_factory=list)
+    params_changed: int = 0
+    fields: Dict[str, FieldDiff] = field(default_factory=dict)
+
+    @property
+    def identical(self) -> bool:
+        return not (self.added or self.removed or self.changed_employees)
+
+    def report(self) -> str:
+        lines = [
+            f"Compared {self.compared:,} employees: {self.changed_employees:,} changed "
+            f"({self.params_changed:,} with changed params), {len(self.added):,} added, "
+            f"{len(self.removed):,} removed",
+        ]
+        if self.old_engine_version != self.new_engine_version:
+            lines.append(f"Engine version changed: {self.old_engine_version} -> {self.new_engine_version}")
+        changed_fields = [(name, diff) for name, diff in self.fields.items() if diff.changed_values]
+        if changed_fields:
+            lines.append(f"{'field':<28} {'changed values':>15} {'max abs diff':>15}")
+            for name, diff in changed_fields:
+                lines.append(f"{name:<28} {diff.changed_values:>15,} {diff.max_abs_diff:>15.6g}")
+        if self.changed_ids:
+            lines.append(f"Changed employees: {', '.join(self.changed_ids)}")
+        return "\n".join(lines)
+
+
+def _differs(old: np.ndarray, new: np.ndarray, rtol: float, atol: float) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        close = np.abs(old - new) <= atol + rtol * np.abs(new)
+    return ~(close | (np.isnan(old) & np.isnan(new)))
+
+
+def diff_snapshots(
+    old: Snapshot,
+    new: Snapshot,
+    rtol: float = 0.0,
+    atol: float = 0.0,
+    limit: int = 20,
+    chunk_size: int = 65536,
+) -> SnapshotDiff:
+    """
+    Compare two snapshots chunk by chunk, so memory stays bounded for
+    archives larger than RAM. Fields present in only one snapshot are
+    ignored; years beyond the shorter snapshot count as changed where the
+    longer one holds a value.
+    """
+    result = SnapshotDiff(old.engine_version, new.engine_version)
+    if old.employee_ids == new.employee_ids:
+        old_rows = new_rows = None
+        compared = len(new)
+    else:
+        new_ids = set(new.employee_ids)
+        old_index = {employee_id: index for index, employee_id in enumerate(old.employee_ids)}
+        result.removed = [employee_id for employee_id in old.employee_ids if employee_id not in new_ids]
+        result.added = [employee_id for employee_id in new.employee_ids if employee_id not in old_index]
+        pairs = [(old_index[employee_id], index) for index, employee_id in enumerate(new.employee_ids)
+                 if employee_id in old_index]
+        old_rows = np.array([pair[0] for pair in pairs], dtype=np.int64)
+        new_rows = np.array([pair[1] for pair in pairs], dtype=np.int64)
+        compared = len(pairs)
+    result.compared = compared
+
+    names = [name for name in new.fields if name in old.fields]
+    old_fields = [old.fields.index(name) for name in names]
+    new_fields = [new.fields.index(name) for name in names]
+    param_names = [name for name in new.param_fields if name in old.param_fields]
+    old_params = [old.param_fields.index(name) for name in param_names]
+    new_params = [new.param_fields.index(name) for name in param_names]
+    years = min(old.years, new.years)
+    result.fields = {name: FieldDiff() for name in names}
+    same_layout = (old.fields, old.param_fields, old.years) == (new.fields, new.param_fields, new.years)
+
+    for start in range(0, compared, chunk_size):
+        if old_rows is None:
+            rows = slice(start, min(start + chunk_size, compared))
+            old_block, new_block = old.histories[rows], new.histories[rows]
+            old_param_block, new_param_block = old.params[rows], new.params[rows]
+            ids = new.employee_ids[rows]
+        else:
+            old_chunk, new_chunk = old_rows[start:start + chunk_size], new_rows[start:start + chunk_size]
+            old_block, new_block = old.histories[old_chunk], new.histories[new_chunk]
+            old_param_block, new_param_block = old.params[old_chunk], new.params[new_chunk]
+            ids = [new.employee_ids[index] for index in new_chunk]
+
+        if same_layout and np.array_equal(old_block, new_block, equal_nan=True) and np.array_equal(
+            old_param_block, new_param_block, equal_nan=True
+        ):
+            # Identical chunks are the common case between nightly runs
+            continue
+
+        old_values = old_block[:, old_fields, :years]
+        new_values = new_block[:, new_fields, :years]
+        differs = _differs(old_values, new_values, rtol, atol)
+        with np.errstate(invalid="ignore"):
+            abs_diff = np.where(differs, np.abs(old_values - new_values), 0.0)
+        # A value against NaN is an unbounded change
+        abs_diff[np.isnan(abs_diff)] = np.inf
+        changed_values = differs.sum(axis=(0, 2))
+        max_abs_diff = abs_diff.max(axis=(0, 2), initial=0.0)
+        changed = differs.any(axis=2)
+        for block, fields in ((old_block, old_fields), (new_block, new_fields)):
+            if block.shape[2] > years:
+                extra = ~np.isnan(block[:, fields, years:])
+                changed_values += extra.sum(axis=(0, 2))
+                max_abs_diff[extra.any(axis=(0, 2))] = np.inf
+                changed |= extra.any(axis=2)
+
+        for name, values, max_diff in zip(names, changed_values.tolist(), max_abs_diff.tolist()):
+            result.fields[name].changed_values += values
+            result.fields[name].max_abs_diff = max(result.fields[name].max_abs_diff, max_diff)
+
+        params_differ = _differs(
+            old_param_block[:, old_params], new_param_block[:, new_params], rtol, atol
+        ).any(axis=1)
+        employee_changed = changed.any(axis=1) | params_differ
+        result.params_changed += int(np.count_nonzero(params_differ))
+        result.changed_employees += int(np.count_nonzero(employee_changed))
+        room = limit - len(result.changed_ids)
+        if room > 0:
+            result.changed_ids.extend(ids[i] for i in np.flatnonzero(employee_changed)[:room])
+    return result
@@ -0,0 +1,163 @@
+import csv
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Mapping, Sequence, TextIO
+
+import numpy as np
+
+from .pension_compare_params import PensionCompareParams
+from .batch_corpus_calculation import INT_PARAM_FIELDS, PARAM_FIELDS, PensionCompareParamsBatch
+from .corpus_growth_calculation import NPS_CONTRIB_RATE, UPS_CONTRIB_RATE
+from .salary_trajectory import TRAJECTORY_FIELDS, accumulate_corpus, build_salary_trajectory
+
+
+SWEEP_OUTPUTS = (
+    "nps_corpus",
+    "ups_corpus",
+    "benchmark_corpus",
+    "nps_annuity",
+    "ups_pension",
+    "nps_minus_ups_pension",
+)
+
+
+# ------------------------------------------
+# Sweep Result
+# ------------------------------------------
+@dataclass
+class SweepResult:
+    """
+    Dense result grid of a parameter sweep. Every array in `values` has one
+    dimension per axis, in the order the axes were given.
+    """
+
+    axes: Dict[str, np.ndarray]
+    values: Dict[str, np.ndarray]
+
+    @property
+    def shape(self):
+        return tuple(len(axis) for axis in self.axes.values())
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Yield the grid as tidy rows: one dict per grid point."""
+        for index in np.ndindex(*self.shape):
+            row = {name: axis[i].item() for (name, axis), i in zip(self.axes.items(), index)}
+            row.update((name, values[index].item()) for name, values in self.values.items())
+            yield row
+
+    def write_csv(self, output: TextIO) -> None:
+        writer = csv.writer(output)
+        writer.writerow(list(self.axes) + list(self.values))
+        for row in self.iter_rows():
+            writer.writerow(row.values())
+
+
+# ------------------------------------------
+# Sweep Engine
+# ------------------------------------------
+def _grid_columns(axes: Mapping[str, np.ndarray], names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Flattened cartesian product of the named axes (first axis slowest)."""
+    grids = np.meshgrid(*(axes[name] for name in names), indexing="ij")
+    return {name: grid.ravel() for name, grid in zip(names, grids)}
+
+
+def sweep(params: PensionCompareParams, axes: Mapping[str, Sequence[float]]) -> SweepResult:
+    """
+    Evaluate `params` over the cartesian product of `axes`, a mapping of
+    PensionCompareParams field name to the values to try.
+
+    The salary trajectory is built once per combination of the axes in
+    TRAJECTORY_FIELDS and shared by all combinations of the other axes
+    (return rates, annuity rate, withdrawal percentage, ...), which are
+    evaluated together as vectorized scenarios.
+    """
+    for name, values in axes.items():
+        validate_axis(name, values)
+    axes = {
+        name: np.asarray(values, dtype=np.int64 if name in INT_PARAM_FIELDS else np.float64)
+        for name, values in axes.items()
+    }
+    if any(axis.ndim != 1 or not len(axis) for axis in axes.values()):
+        raise ValueError("Every sweep axis must be a non-empty sequence of values.")
+
+    trajectory_axes = [name for name in axes if name in TRAJECTORY_FIELDS]
+    scenario_axes = [name for name in axes if name not in TRAJECTORY_FIELDS]
+    trajectory_grid = _grid_columns(axes, trajectory_axes)
+    scenario_grid = _grid_columns(axes, scenario_axes)
+    n_trajectories = np.prod([len(axes[name]) for name in trajectory_axes], dtype=np.int64)
+    n_scenarios = np.prod([len(axes[name]) for name in scenario_axes], dtype=np.int64)
+
+    base = asdict(params)
+    trajectory = build_salary_trajectory(
+        PensionCompareParamsBatch.from_columns(
+            **{name: trajectory_grid.get(name, base[name]) for name in PARAM_FIELDS}
+        )
+    )
+
+    def scenario_values(name: str) -> np.ndarray:
+        # Shaped (1, scenarios) so it broadcasts across trajectories
+        return np.asarray(scenario_grid.get(name, base[name]), dtype=np.float64).reshape(1, -1)
+
+    initial_corpus = scenario_values("current_total_nps_corpus")
+    nps_return = scenario_values("expected_nps_return")
+    benchmark_return = scenario_values("expected_benchmark_corpus_return")
+    corpus_info = trajectory.final_corpus_info(
+        accumulate_corpus(trajectory, initial_corpus, nps_return, NPS_CONTRIB_RATE),
+        accumulate_corpus(trajectory, initial_corpus, nps_return, UPS_CONTRIB_RATE),
+        accumulate_corpus(trajectory, initial_corpus, benchmark_return, UPS_CONTRIB_RATE),
+    )
+
+    # Full parameter grid, trajectory-major to match final_corpus_info
+    columns = {}
+    for name in PARAM_FIELDS:
+        if name in trajectory_grid:
+            columns[name] = np.repeat(trajectory_grid[name], n_scenarios)
+        elif name in scenario_grid:
+            columns[name] = np.tile(scenario_grid[name], n_trajectories)
+        else:
+            columns[name] = base[name]
+    full_params = PensionCompareParamsBatch.from_columns(**columns)
+
+    benchmark_corpus = corpus_info.benchmark_corpus
+    corpus_info.calculate_pension(full_params)
+    flat = {
+        "nps_corpus": corpus_info.nps_corpus,
+        "ups_corpus": corpus_info.ups_corpus,
+        "benchmark_corpus": benchmark_corpus,
+        "nps_annuity": corpus_info.nps_annuity,
+        "ups_pension": corpus_info.ups_pension,
+        "nps_minus_ups_pension": corpus_info.nps_annuity - corpus_info.ups_pension,
+    }
+
+    # Reshape (trajectory axes..., scenario axes...) back to the axes order
+    grid_order = trajectory_axes + scenario_axes
+    grid_shape = [len(axes[name]) for name in grid_order]
+    permutation = [grid_order.index(name) for name in axes]
+    values = {
+        name: np.transpose(array.reshape(grid_shape), permutation)
+        for name, array in flat.items()
+    }
+    return SweepResult(axes=axes, values=values)
+
+
+def validate_axis(name: str, values: Sequence[float]) -> None:
+    """Reject unknown fields and fractional values of integer fields."""
+    if name not in PARAM_FIELDS:
+        raise ValueError(f"Unknown sweep field: {name}")
+    if name in INT_PARAM_FIELDS:
+        fractional = [value for value in values if value % 1]
+        if fractional:
+            raise ValueError(f"{name} takes whole numbers, got {fractional[0]!r}")
+
+
+def parse_axis(spec: str) -> List[float]:
+    """
+    Parse an axis value spec: either a comma separated list ("0,0.3,0.6")
+    or an inclusive range "start:stop:step" ("0.06:0.14:0.01").
+    """
+    if ":" in spec:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"Axis step must be positive: {spec}")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 12) for i in range(count)]
+    return [float(value) for value in spec.split(",") if value.strip()]
@@ -0,0 +1,77 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .batch_corpus_calculation import (
+    CORPUS_FIELDS,
+    PensionCompareParamsBatch,
+    get_corpus_info_batch,
+)
+
+
+class TestBatchCorpusCalculation(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.params_list = [
+            self.params,
+            replace(self.params, years_to_retire=28, current_service=6),
+            replace(self.params, years_to_retire=1, expected_nps_return=0),
+            replace(self.params, years_to_retire=12, withdrawal_percentage=0.0),
+            replace(self.params, years_to_retire=0),
+        ]
+
+    def test_from_columns_broadcasts_defaults(self):
+        batch = PensionCompareParamsBatch.from_columns(
+            current_service=[1, 2],
+            years_to_retire=[3, 4],
+            current_basic_pay=50000,
+            current_da_rate=0.5,
+            current_total_nps_corpus=0,
+            withdrawal_percentage=0.6,
+            current_annual_expense=1000,
+        )
+        self.assertEqual(len(batch), 2)
+        np.testing.assert_array_equal(batch.expected_nps_return, [0.10, 0.10])
+        self.assertEqual(batch[1].years_to_retire, 4)
+
+    def test_from_columns_rejects_missing_required(self):
+        with self.assertRaises(ValueError):
+            PensionCompareParamsBatch.from_columns(current_service=[1])
+
+    def test_from_columns_rejects_fractional_years(self):
+        columns = dict(
+            current_service=[10, 10], years_to_retire=[5.0, 12.9], current_basic_pay=50000,
+            current_da_rate=0.5, current_total_nps_corpus=0, withdrawal_percentage=0.6,
+            current_annual_expense=1000,
+        )
+        with self.assertRaisesRegex(ValueError, "profile 1"):
+            PensionCompareParamsBatch.from_columns(**columns)
+        columns["years_to_retire"] = [5.0, 12.0]
+        self.assertEqual(PensionCompareParamsBatch.from_columns(**columns).years_to_retire.tolist(), [5, 12])
+
+    def test_matches_scalar_path(self):
+        batch = PensionCompareParamsBatch.from_params(self.params_list)
+        corpus_info = get_corpus_info_batch(batch)
+        corpus_info.calculate_pension(batch)
+
+        for index, params in enumerate(self.params_list):
+            history = get_corpus_info(params)
+            expected = history.last()
+            actual = corpus_info[index]
+            with self.subTest(index=index):
+                if expected is None:
+                    self.assertIsNone(actual)
+                    continue
+                history.calculate_pension(params)
+                for name in CORPUS_FIELDS:
+                    self.assertTrue(
+                        np.isclose(getattr(actual, name), getattr(expected, name), rtol=1e-9, atol=0),
+                        name,
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .batch_corpus_calculation import PensionCompareParamsBatch
+from .break_even import find_break_even, find_break_even_batch, pension_gap
+
+
+class TestBreakEven(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.params = replace(self.params, years_to_retire=25, current_service=5)
+
+    def test_scalar_return_break_even(self):
+        root = find_break_even(self.params, "expected_nps_return", 0.0, 0.3)
+        gap = pension_gap(replace(self.params, expected_nps_return=root))
+        self.assertAlmostEqual(gap, 0, delta=1e-4)
+
+    def test_scalar_not_bracketed(self):
+        with self.assertRaises(ValueError):
+            find_break_even(self.params, "expected_nps_return", 0.0, 0.01)
+
+    def test_integer_field(self):
+        self.params = replace(self.params, current_total_nps_corpus=5e6)
+        years = find_break_even(self.params, "years_to_retire", 30, 40)
+        self.assertIsInstance(years, float)
+        self.assertTrue(years.is_integer())
+        before = pension_gap(replace(self.params, years_to_retire=int(years) - 1))
+        after = pension_gap(replace(self.params, years_to_retire=int(years)))
+        self.assertLess(before * after, 0)
+
+    def test_batch_matches_scalar(self):
+        profiles = [
+            self.params,
+            replace(self.params, current_basic_pay=45000),
+            replace(self.params, years_to_retire=0),
+        ]
+        batch = PensionCompareParamsBatch.from_params(profiles)
+        for field, low, high in (
+            ("expected_nps_return", 0.0, 0.3),
+            ("expected_basic_pay_hike", 0.0, 0.2),
+        ):
+            roots = find_break_even_batch(batch, field, low, high, xtol=1e-12)
+            with self.subTest(field=field):
+                self.assertTrue(np.isnan(roots[2]))
+                for root, params in zip(roots[:2], profiles):
+                    self.assertAlmostEqual(root, find_break_even(params, field, low, high), places=8)
+
+    def test_no_year_until_retirement_is_nan(self):
+        retired = replace(self.params, years_to_retire=0)
+        batch = PensionCompareParamsBatch.from_params([retired, self.params])
+        for field, low, high in (("expected_nps_return", 0.0, 0.3), ("years_to_retire", 0, 40)):
+            with self.subTest(field=field):
+                self.assertTrue(np.isnan(find_break_even(retired, field, low, high)))
+                self.assertTrue(np.isnan(find_break_even_batch(batch, field, low, high)[0]))
+        self.assertTrue(np.isnan(find_break_even(self.params, "years_to_retire", 0, 40)))
+        self.assertTrue(np.isnan(find_break_even_batch(batch, "years_to_retire", 0, 40)[1]))
+
+    def test_batch_integer_field(self):
+        self.params = replace(self.params, current_total_nps_corpus=5e6)
+        batch = PensionCompareParamsBatch.from_params([self.params])
+        years = find_break_even_batch(batch, "years_to_retire", 30, 40)
+        self.assertEqual(years[0], find_break_even(self.params, "years_to_retire", 30, 40))
+
+
+if __name__ == "__main__":
+    unittest.main()
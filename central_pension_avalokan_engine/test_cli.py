@@ -0,0 +1,49 @@
+import io
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from .test_base import BaseTest
+from .cli import main
+
+
+class TestCli(BaseTest):
+    def direct_args(self):
+        return ["direct"] + [
+            str(getattr(self.params, name))
+            for name in (
+                "current_service",
+                "years_to_retire",
+                "current_basic_pay",
+                "current_da_rate",
+                "current_total_nps_corpus",
+                "withdrawal_percentage",
+                "current_annual_expense",
+            )
+        ]
+
+    def test_import_keeps_heavy_modules_lazy(self):
+        lazy = ("csv", "configparser", "concurrent.futures", "multiprocessing", "numpy")
+        code = (
+            "import sys, central_pension_avalokan_engine.cli; "
+            f"print(','.join(m for m in {lazy!r} if m in sys.modules))"
+        )
+        loaded = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout.strip()
+        self.assertEqual(loaded, "")
+
+    def test_direct_fast_path_matches_full_parser(self):
+        outputs = []
+        for profile in ([], ["--profile"]):
+            output = io.StringIO()
+            with redirect_stdout(output), redirect_stderr(io.StringIO()):
+                main(profile + self.direct_args() + ["--expected_nps_return", "0.09"])
+            outputs.append(output.getvalue())
+        self.assertIn("NPS annuity", outputs[0])
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+from unittest import mock
+
+from . import cohort
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .cohort import (
+    SUMMARY_FIELDS,
+    CohortRunError,
+    checkpoint_path_for,
+    iter_profile_chunks,
+    pack_chunk,
+    run_cohort,
+    run_cohort_to_path,
+    summarize_chunk,
+    summarize_packed,
+    unpack_summary,
+)
+
+CRASH_MARKER_ENV = "COHORT_TEST_CRASH_MARKER"
+
+
+def _crash_once(buffer):
+    """summarize_packed whose first call in any worker kills the process."""
+    marker = os.environ[CRASH_MARKER_ENV]
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return summarize_packed(buffer)
+
+
+def _always_crash(buffer):
+    os._exit(1)
+
+
+def _poison_fourth_profile(buffer):
+    """summarize_packed that kills its worker on the chunk holding years_to_retire == 4."""
+    import numpy as np
+
+    columns = np.frombuffer(buffer, dtype=np.float64).reshape(len(cohort.PARAM_FIELDS), -1)
+    if 4 in columns[cohort.PARAM_FIELDS.index("years_to_retire")]:
+        os._exit(1)
+    return summarize_packed(buffer)
+
+
+class TestCohort(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.profiles = [
+            replace(self.params, years_to_retire=years, current_basic_pay=40000 + 1000 * years)
+            for years in range(1, 8)
+        ]
+        self.jsonl_path = os.path.join(self.tmp_dir.name, "profiles.jsonl")
+        with open(self.jsonl_path, "w", encoding="utf-8") as file:
+            for index, params in enumerate(self.profiles):
+                file.write(json.dumps(dict(asdict(params), employee_id=f"E{index}")) + "\n")
+
+    def test_iter_profile_chunks_csv_defaults(self):
+        csv_path = os.path.join(self.tmp_dir.name, "profiles.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as file:
+            file.write("current_service,years_to_retire,current_basic_pay,current_da_rate,"
+                       "current_total_nps_corpus,withdrawal_percentage,current_annual_expense,"
+                       "expected_nps_return,department\n")
+            file.write("10,5,50000,0.5,0,0.6,1000,,HR\n")
+        ((ids, columns),) = list(iter_profile_chunks(csv_path))
+        self.assertEqual(ids, ["1"])
+        self.assertEqual(columns["expected_nps_return"], [0.10])
+        self.assertNotIn("department", columns)
+
+    def test_iter_profile_chunks_rejects_missing_required(self):
+        csv_path = os.path.join(self.tmp_dir.name, "broken.csv")
+        with open(csv_path, "w", encoding="utf-8") as file:
+            file.write("current_service\n10\n")
+        with self.assertRaises(ValueError):
+            list(iter_profile_chunks(csv_path))
+
+    def test_iter_profile_chunks_rejects_fractional_years(self):
+        csv_path = os.path.join(self.tmp_dir.name, "fractional.csv")
+        with open(csv_path, "w", encoding="utf-8") as file:
+            file.write("current_service,years_to_retire,current_basic_pay,current_da_rate,"
+                       "current_total_nps_corpus,withdrawal_percentage,current_annual_expense\n")
+            file.write("10,5,50000,0.5,0,0.6,1000\n")
+            file.write("10.0,12.9,50000,0.5,0,0.6,1000\n")
+        with self.assertRaisesRegex(ValueError, "Row 2 .*years_to_retire"):
+            list(iter_profile_chunks(csv_path, chunk_size=1))
+
+    def test_run_cohort_matches_scalar_path(self):
+        for workers in (1, 2):
+            output = io.StringIO()
+            stats = run_cohort(self.jsonl_path, output, chunk_size=3, workers=workers)
+            rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+            with self.subTest(workers=workers):
+                self.assertEqual(stats.profiles, len(self.profiles))
+                self.assertEqual([row["employee_id"] for row in rows],
+                                 [f"E{i}" for i in range(len(self.profiles))])
+                for row, params in zip(rows, self.profiles):
+                    history = get_corpus_info(params)
+                    history.calculate_pension(params)
+                    expected = history.last()
+                    for name in SUMMARY_FIELDS:
+                        self.assertAlmostEqual(float(row[name]) / getattr(expected, name), 1, places=9)
+
+    def test_packed_buffers_round_trip(self):
+        ((ids, columns),) = list(iter_profile_chunks(self.jsonl_path))
+        summary = unpack_summary(summarize_packed(pack_chunk(columns)), len(ids))
+        expected = summarize_chunk(columns)
+        for name in SUMMARY_FIELDS:
+            self.assertEqual(list(summary[name]), expected[name])
+
+    def test_worker_crash_is_retried(self):
+        expected = io.StringIO()
+        run_cohort(self.jsonl_path, expected, chunk_size=3)
+        marker = os.path.join(self.tmp_dir.name, "crashed")
+        output = io.StringIO()
+        with mock.patch.dict(os.environ, {CRASH_MARKER_ENV: marker}):
+            stats = run_cohort(self.jsonl_path, output, chunk_size=3, workers=2, summarize=_crash_once)
+        self.assertGreater(stats.retries, 0)
+        self.assertEqual(output.getvalue(), expected.getvalue())
+
+    def test_repeated_crash_raises(self):
+        with self.assertRaises(CohortRunError) as context:
+            run_cohort(
+                self.jsonl_path, io.StringIO(), chunk_size=3, workers=2,
+                max_retries=1, summarize=_always_crash,
+            )
+        self.assertEqual(context.exception.chunk_index, 0)
+
+    def test_poison_chunk_is_charged_alone(self):
+        output = io.StringIO()
+        with self.assertRaises(CohortRunError) as context:
+            run_cohort(
+                self.jsonl_path, output, chunk_size=1, workers=2,
+                max_retries=1, summarize=_poison_fourth_profile,
+            )
+        # Healthy chunks lost alongside it neither fail nor get blamed
+        self.assertEqual(context.exception.chunk_index, 3)
+        self.assertIn("Chunk 3 failed after 2 attempts", str(context.exception))
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual([row[0] for row in rows[1:]], ["E0", "E1", "E2"])
+
+    def test_resume_after_failed_chunk(self):
+        expected_path = os.path.join(self.tmp_dir.name, "expected.csv")
+        output_path = os.path.join(self.tmp_dir.name, "summary.csv")
+        run_cohort_to_path(self.jsonl_path, expected_path, chunk_size=3)
+        self.assertFalse(checkpoint_path_for(expected_path).exists())
+
+        calls = []
+
+        def fail_on_second_chunk(columns):
+            calls.append(columns)
+            if len(calls) == 2:
+                raise RuntimeError("simulated failure")
+            return summarize_chunk(columns)
+
+        with mock.patch.object(cohort, "summarize_chunk", fail_on_second_chunk):
+            with self.assertRaises(CohortRunError) as context:
+                run_cohort_to_path(self.jsonl_path, output_path, chunk_size=3)
+        self.assertEqual(context.exception.chunk_index, 1)
+        self.assertTrue(checkpoint_path_for(output_path).exists())
+
+        with mock.patch.object(cohort, "summarize_chunk", side_effect=summarize_chunk) as resumed:
+            stats = run_cohort_to_path(self.jsonl_path, output_path, chunk_size=3, resume=True)
+        self.assertEqual(resumed.call_count, 2)
+        self.assertEqual(stats.profiles, len(self.profiles) - 3)
+        with open(output_path, encoding="utf-8") as output, open(expected_path, encoding="utf-8") as expected:
+            self.assertEqual(output.read(), expected.read())
+        self.assertFalse(checkpoint_path_for(output_path).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .cohort import run_cohort
+from .cohort_report import ALL_GROUPS, CohortAggregator, merge_report_states
+from .quantile_sketch import QuantileSketch
+from .cli import main
+
+
+class TestCohortReport(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        rng = np.random.default_rng(7)
+        self.profiles = [
+            replace(
+                self.params,
+                current_service=int(service),
+                years_to_retire=int(years),
+                current_basic_pay=float(pay),
+            )
+            for service, years, pay in zip(
+                rng.integers(0, 35, 300), rng.integers(0, 30, 300), rng.uniform(18000, 200000, 300)
+            )
+        ]
+        self.jsonl_path = os.path.join(self.tmp_dir.name, "profiles.jsonl")
+        with open(self.jsonl_path, "w", encoding="utf-8") as file:
+            for params in self.profiles:
+                file.write(json.dumps(asdict(params)) + "\n")
+
+    def aggregate(self, **kwargs):
+        aggregator = CohortAggregator()
+        run_cohort(self.jsonl_path, io.StringIO(), on_chunk_summary=aggregator.add_chunk, **kwargs)
+        return aggregator
+
+    def test_groups_match_direct_computation(self):
+        aggregator = self.aggregate(chunk_size=64)
+        summary = io.StringIO()
+        run_cohort(self.jsonl_path, summary)
+        rows = summary.getvalue().splitlines()[1:]
+        results = np.array([[float(value) for value in row.split(",")[1:]] for row in rows])
+        year, ups_pension, nps_annuity = results[:, 0], results[:, 4], results[:, 3]
+
+        report = {(row["pay_level"], row["service_band"]): row for row in aggregator.report()}
+        simulated = year > 0
+        total = report[(ALL_GROUPS, ALL_GROUPS)]
+        self.assertEqual(total["employees"], simulated.sum())
+        self.assertAlmostEqual(total["total_ups_pension"], ups_pension[simulated].sum(), places=3)
+        self.assertAlmostEqual(
+            total["ups_wins_share"], np.mean(ups_pension[simulated] > nps_annuity[simulated])
+        )
+
+        pay = np.array([p.current_basic_pay for p in self.profiles])
+        service = np.array([p.current_service for p in self.profiles])
+        group = simulated & (pay >= 50000) & (pay < 75000) & (service >= 10) & (service < 20)
+        row = report[("50000-75000", "10-20")]
+        self.assertEqual(row["employees"], group.sum())
+        difference = ups_pension[group] - nps_annuity[group]
+        self.assertAlmostEqual(row["mean_ups_minus_nps_pension"], difference.mean(), places=6)
+        expected_median = np.percentile(difference, 50, method="lower")
+        self.assertAlmostEqual(row["p50_ups_minus_nps_pension"] / expected_median, 1, delta=0.011)
+
+    def test_sharded_aggregates_merge(self):
+        whole = self.aggregate(chunk_size=50)
+        sharded = self.aggregate(chunk_size=50, workers=2)
+        self.assertEqual(sharded.report(), whole.report())
+
+        first, second = CohortAggregator(), CohortAggregator()
+        for aggregator, part in ((first, self.profiles[:100]), (second, self.profiles[100:])):
+            path = os.path.join(self.tmp_dir.name, f"part{len(part)}.jsonl")
+            with open(path, "w", encoding="utf-8") as file:
+                for params in part:
+                    file.write(json.dumps(asdict(params)) + "\n")
+            run_cohort(path, io.StringIO(), on_chunk_summary=aggregator.add_chunk)
+        state_paths = []
+        for index, aggregator in enumerate((first, second)):
+            state_paths.append(os.path.join(self.tmp_dir.name, f"state{index}.json"))
+            aggregator.save(state_paths[-1])
+        merged = merge_report_states(state_paths)
+        for merged_row, whole_row in zip(merged.report(), whole.report()):
+            for name, value in whole_row.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(merged_row[name], value, places=4)
+                else:
+                    self.assertEqual(merged_row[name], value)
+
+        with self.assertRaises(ValueError):
+            first.merge(CohortAggregator(pay_edges=(50000,)))
+
+    def test_sketch_round_trip(self):
+        sketch = QuantileSketch()
+        sketch.add([-5.0, 0.0, 3.0, 1200.5])
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        self.assertEqual(restored.quantiles([0, 0.5, 1]), sketch.quantiles([0, 0.5, 1]))
+        self.assertEqual((restored.count, restored.min, restored.max), (4, -5.0, 1200.5))
+
+    def test_cli_batch_report_and_merge(self):
+        report_path = os.path.join(self.tmp_dir.name, "report.csv")
+        state_path = os.path.join(self.tmp_dir.name, "state.json")
+        merged_path = os.path.join(self.tmp_dir.name, "merged.csv")
+        main([
+            "batch", self.jsonl_path, "--output", os.path.join(self.tmp_dir.name, "summary.csv"),
+            "--report", report_path, "--report-state", state_path, "--pay-edges", "50000,100000",
+        ])
+        main(["report", state_path, "--output", merged_path])
+        with open(report_path, encoding="utf-8") as report, open(merged_path, encoding="utf-8") as merged:
+            content = report.read()
+            self.assertEqual(merged.read(), content)
+        self.assertIn("50000-100000,10-20,", content)
+
+    def test_cli_report_rejects_mismatched_or_malformed_states(self):
+        paths = [os.path.join(self.tmp_dir.name, f"state{i}.json") for i in range(3)]
+        CohortAggregator(pay_edges=(50000,)).save(paths[0])
+        CohortAggregator(pay_edges=(60000,)).save(paths[1])
+        with open(paths[2], "w", encoding="utf-8") as file:
+            file.write("{}")
+        for states in (paths[:2], paths[2:]):
+            with self.subTest(states=states), self.assertRaises(SystemExit) as context:
+                main(["report", *states])
+            self.assertIsInstance(context.exception.code, str)
+
+
+if __name__ == "__main__":
+    unittest.main()
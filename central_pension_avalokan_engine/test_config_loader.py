@@ -0,0 +1,123 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+from .test_base import BaseTest
+from .cli import load_params_from_file, main
+from .core import get_corpus_info
+from .config_loader import (
+    ConfigCache,
+    find_config_files,
+    load_config_files,
+    read_params_file,
+    run_params,
+)
+
+
+class TestConfigLoader(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.paths = [self.write_ini(f"E{i}", replace(self.params, years_to_retire=3 + i)) for i in range(4)]
+
+    def write_ini(self, name, params, extra=""):
+        path = os.path.join(self.tmp_dir.name, f"{name}.ini")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(
+                "[personal_data]\n"
+                f"current_service = {params.current_service}\n"
+                f"years_to_retire = {params.years_to_retire}\n"
+                f"current_basic_pay = {params.current_basic_pay}\n"
+                f"current_da_rate = {params.current_da_rate}\n"
+                f"current_total_nps_corpus = {params.current_total_nps_corpus}\n"
+                f"withdrawal_percentage = {params.withdrawal_percentage}\n"
+                f"current_annual_expense = {params.current_annual_expense}\n"
+                "[assumptions]\n"
+                f"expected_nps_return = {params.expected_nps_return}\n"
+                f"expected_rate_of_inflation = {params.expected_rate_of_inflation}\n"
+                + extra
+            )
+        return path
+
+    def test_read_params_file_matches_argparse_path(self):
+        self.assertEqual(read_params_file(self.paths[0]), load_params_from_file(self.paths[0]))
+
+    def test_read_params_file_rejects_bad_files(self):
+        bad = self.write_ini("bad", self.params, "unknown_assumption = 1\n")
+        with self.assertRaises(ValueError):
+            read_params_file(bad)
+        with self.assertRaises(ValueError):
+            read_params_file(os.path.join(self.tmp_dir.name, "missing.ini"))
+
+    def test_find_config_files(self):
+        self.assertEqual(find_config_files(self.tmp_dir.name), sorted(self.paths))
+        self.assertEqual(find_config_files(os.path.join(self.tmp_dir.name, "E[01].ini")), self.paths[:2])
+
+    def test_cache_skips_unchanged_files(self):
+        cache_path = os.path.join(self.tmp_dir.name, "cache.json")
+        cache = ConfigCache(cache_path)
+        first = load_config_files(self.paths, cache=cache)
+        cache.save()
+        self.assertEqual((first.parsed, first.cached), (4, 0))
+
+        changed = replace(self.params, years_to_retire=20)
+        self.write_ini("E2", changed, "expected_da_hike = 0.04\n")
+        second = load_config_files(self.paths, cache=ConfigCache(cache_path))
+        self.assertEqual((second.parsed, second.cached), (1, 3))
+        self.assertEqual(second.params[2], replace(changed, expected_da_hike=0.04))
+        self.assertEqual(second.params[:2], first.params[:2])
+
+    def test_parallel_load_and_errors(self):
+        bad = self.write_ini("E9", self.params, "bogus = 1\n")
+        loaded = load_config_files(self.paths + [bad], workers=2, chunksize=1)
+        self.assertEqual(loaded.paths, self.paths)
+        self.assertIn(bad, loaded.errors)
+
+    def test_malformed_ini_files_are_reported(self):
+        headerless = os.path.join(self.tmp_dir.name, "headerless.ini")
+        with open(headerless, "w", encoding="utf-8") as file:
+            file.write("current_service = 5\n")
+        duplicate = self.write_ini("duplicate", self.params, "expected_nps_return = 0.1\n")
+        missing = os.path.join(self.tmp_dir.name, "missing.ini")
+        loaded = load_config_files(self.paths + [headerless, duplicate, missing])
+        self.assertEqual(loaded.paths, self.paths)
+        self.assertEqual(set(loaded.errors), {headerless, duplicate, missing})
+
+        # A cached file deleted before the rerun is reported, not raised
+        cache = ConfigCache()
+        load_config_files(self.paths, cache=cache)
+        os.remove(self.paths[0])
+        loaded = load_config_files(self.paths, cache=cache)
+        self.assertEqual(loaded.paths, self.paths[1:])
+        self.assertIn(self.paths[0], loaded.errors)
+
+    def test_from_dir_skips_malformed_files(self):
+        with open(os.path.join(self.tmp_dir.name, "headerless.ini"), "w", encoding="utf-8") as file:
+            file.write("current_service = 5\n")
+        output_path = os.path.join(self.tmp_dir.name, "summary.csv")
+        with mock.patch("sys.stderr", new_callable=io.StringIO) as stderr, self.assertRaises(SystemExit) as context:
+            main(["from-dir", self.tmp_dir.name, "--output", output_path])
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn("headerless.ini", stderr.getvalue())
+        with open(output_path, encoding="utf-8") as file:
+            self.assertEqual(len(file.read().splitlines()), 1 + len(self.paths))
+
+    def test_run_params_matches_scalar_path(self):
+        loaded = load_config_files(self.paths)
+        output = io.StringIO()
+        stats = run_params(["a", "b", "c", "d"], loaded.params, output, chunk_size=3)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(stats.profiles, 4)
+        for row, params in zip(rows, loaded.params):
+            history = get_corpus_info(params)
+            history.calculate_pension(params)
+            self.assertAlmostEqual(float(row["ups_pension"]) / history.last().ups_pension, 1, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
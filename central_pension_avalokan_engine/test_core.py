@@ -1,6 +1,15 @@
+import math
 import unittest
+from dataclasses import replace
 from .test_base import BaseTest
-from .core import get_corpus_info, CorpusInfo
+from .core import (
+    get_corpus_info,
+    CorpusInfo,
+    iter_corpus_info,
+    final_year,
+    max_year,
+    first_year_where,
+)
 
 class TestPensionFunctions(BaseTest):
     def test_get_corpus_info(self):
@@ -20,6 +29,73 @@ class TestPensionFunctions(BaseTest):
             places = 6,
         )
 
+    def test_get_corpus_info_final_only(self):
+        for years_to_retire in (0, 1, 5, 28, 40):
+            params = replace(self.params, years_to_retire=years_to_retire)
+            history = get_corpus_info(params)
+            summary = get_corpus_info(params, final_only=True)
+            with self.subTest(years_to_retire=years_to_retire):
+                if not history.last():
+                    self.assertEqual(len(summary), 0)
+                    continue
+                self.assertEqual(len(summary), 1)
+                expected = history.last().as_dict()
+                for key, value in summary.last().as_dict().items():
+                    self.assertTrue(math.isclose(value, expected[key], rel_tol=1e-9), key)
+
+    def test_schedule_pay_commission_jump(self):
+        schedule = {3: {"expected_basic_pay_hike": 0.25}}
+        history = get_corpus_info(self.params, schedule=schedule)
+        self.assertAlmostEqual(history[2].next_year_basic_pay, history[2].basic_pay * 1.25)
+        self.assertAlmostEqual(history[3].basic_pay, history[2].basic_pay * 1.25)
+        self.assertAlmostEqual(history[4].basic_pay, history[3].basic_pay * 1.05)
+        final_only = get_corpus_info(self.params, final_only=True, schedule=schedule)
+        self.assertEqual(final_only.last(), history.last())
+        with self.assertRaises(ValueError):
+            get_corpus_info(self.params, schedule={1: {"salary": 1}})
+
+    def test_resimulate_from_reuses_prefix(self):
+        override = {"basic_pay": 90000, "da_rate": 0.1}
+        expected = get_corpus_info(self.params, schedule={3: override})
+        for columnar in (False, True):
+            history = get_corpus_info(self.params, columnar=columnar)
+            prefix = history[1]
+            history.resimulate_from(3, self.params, overrides=override)
+            with self.subTest(columnar=columnar):
+                self.assertEqual(history.as_list_of_dict(), expected.as_list_of_dict())
+                if not columnar:
+                    self.assertIs(history[1], prefix)
+                with self.assertRaises(IndexError):
+                    history.resimulate_from(0, self.params)
+
+    def test_iter_corpus_info_matches_history(self):
+        history = get_corpus_info(self.params)
+        self.assertEqual(list(iter_corpus_info(self.params)), list(history))
+        self.assertEqual(final_year(iter_corpus_info(self.params)), history.last())
+        self.assertIsNone(final_year(iter_corpus_info(replace(self.params, years_to_retire=0))))
+        for columnar in (False, True):
+            rows = get_corpus_info(self.params, columnar=columnar)
+            self.assertEqual([row.year for row in rows], list(range(1, self.params.years_to_retire + 1)))
+
+    def test_reducers(self):
+        params = replace(self.params, years_to_retire=30)
+        history = get_corpus_info(params)
+        self.assertIs(max_year(history, "nps_corpus"), history.last())
+        self.assertEqual(max_year(history, lambda row: -row.year).year, 1)
+
+        target = history[12].nps_corpus
+        visited = []
+
+        def rows():
+            for row in iter_corpus_info(params):
+                visited.append(row.year)
+                yield row
+
+        found = first_year_where(rows(), lambda row: row.nps_corpus >= target)
+        self.assertEqual(found.year, 13)
+        self.assertEqual(visited[-1], 13)
+        self.assertIsNone(first_year_where(iter_corpus_info(params), lambda row: False))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .corpus_info import CORPUS_FIELDS
+from .corpus_export import CorpusCsvWriter, open_corpus_writer
+
+
+class TestCorpusExport(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.history = get_corpus_info(self.params)
+
+    def read_rows(self, file_path):
+        with open(file_path, newline="", encoding="utf-8") as file:
+            return list(csv.DictReader(file))
+
+    def test_save_to_csv_round_trip(self):
+        file_path = os.path.join(self.tmp_dir.name, "history.csv")
+        self.history.save_to_csv(file_path)
+        rows = self.read_rows(file_path)
+        self.assertEqual(len(rows), len(self.history))
+        for row, expected in zip(rows, self.history.as_list_of_dict()):
+            self.assertEqual(float(row["nps_corpus"]), expected["nps_corpus"])
+            self.assertEqual(int(row["year"]), expected["year"])
+
+    def test_append_many_employees(self):
+        file_path = os.path.join(self.tmp_dir.name, "cohort.csv")
+        columnar = get_corpus_info(self.params, columnar=True)
+        with CorpusCsvWriter(file_path, employee_id_column=True) as writer:
+            writer.write_history(self.history, employee_id="E1")
+        with CorpusCsvWriter(file_path, employee_id_column=True, append=True) as writer:
+            writer.write_columns(
+                {name: columnar.column(name) for name in CORPUS_FIELDS},
+                employee_id="E2",
+            )
+            with self.assertRaises(ValueError):
+                writer.write_rows(self.history.all())
+
+        rows = self.read_rows(file_path)
+        self.assertEqual(len(rows), 2 * len(self.history))
+        self.assertEqual([row["employee_id"] for row in rows[:: len(self.history)]], ["E1", "E2"])
+        self.assertEqual(rows[0]["salary"], rows[len(self.history)]["salary"])
+
+    def test_append_rejects_mismatched_header(self):
+        file_path = os.path.join(self.tmp_dir.name, "cohort.csv")
+        with CorpusCsvWriter(file_path, employee_id_column=True) as writer:
+            writer.write_history(self.history, employee_id="E1")
+        with open(file_path, encoding="utf-8") as file:
+            before = file.read()
+        with self.assertRaises(ValueError):
+            CorpusCsvWriter(file_path, append=True)
+        with open(file_path, encoding="utf-8") as file:
+            self.assertEqual(file.read(), before)
+
+    def test_parquet_export(self):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        file_path = os.path.join(self.tmp_dir.name, "cohort.parquet")
+        with open_corpus_writer(file_path, employee_id_column=True) as writer:
+            writer.batch_size = 3
+            writer.write_history(self.history, employee_id="E1")
+            writer.write_history(self.history, employee_id="E2")
+        table = pyarrow.parquet.read_table(file_path)
+        self.assertEqual(table.num_rows, 2 * len(self.history))
+        self.assertEqual(
+            table.column("nps_corpus").to_pylist()[: len(self.history)],
+            [row.nps_corpus for row in self.history.all()],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,9 @@ from .corpus_growth_calculation import (
     get_yearly_accumulated_corpus,
     calculate_salary,
     calculate_accumulated_corpus,
+    get_accumulated_corpus_after,
+    get_compounding_factors,
+    compounding_factor_cache_info,
 )
 
 class TestPensionFunctions(BaseTest):
@@ -54,6 +57,37 @@ class TestPensionFunctions(BaseTest):
         )
         self.assertEqual(result, initial_corpus + (12 * monthly_contrib))
 
+    def test_get_yearly_accumulated_corpus_compounding_periods(self):
+        # Quarterly compounding of the same yearly contribution grows less
+        monthly = get_yearly_accumulated_corpus(100000, 0.1, 1000)
+        quarterly = get_yearly_accumulated_corpus(100000, 0.1, 1000, periods_per_year=4)
+        annual = get_yearly_accumulated_corpus(100000, 0.1, 1000, periods_per_year=1)
+        self.assertAlmostEqual(annual, 100000 * 1.1 + 12000)
+        self.assertGreater(monthly, quarterly)
+        self.assertGreater(quarterly, annual)
+
+    def test_compounding_factor_cache_counters(self):
+        get_compounding_factors.cache_clear()
+        for _ in range(3):
+            get_yearly_accumulated_corpus(1000, 0.0731, 10)
+        info = compounding_factor_cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+    def test_get_accumulated_corpus_after_matches_yearly_steps(self):
+        for return_rate in (0.1, 0, -0.02):
+            corpus, basic_pay, da_rate = 100000, 50000, 0.5
+            for _ in range(7):
+                monthly_contrib = 0.2 * calculate_salary(basic_pay, da_rate)
+                corpus = get_yearly_accumulated_corpus(corpus, return_rate, monthly_contrib)
+                basic_pay *= 1.05
+                da_rate += 0.04
+            with self.subTest(return_rate=return_rate):
+                self.assertAlmostEqual(
+                    get_accumulated_corpus_after(7, 100000, return_rate, 0.2, 50000, 0.5, 0.05, 0.04),
+                    corpus,
+                    places=4,
+                )
+
     def test_calculate_accumulated_corpus_first_year(self):
         first_year_info = calculate_accumulated_corpus(0, self.params, None)
         self.assertIsInstance(first_year_info, YearlyCorpusInfo)
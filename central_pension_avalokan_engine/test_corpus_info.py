@@ -0,0 +1,66 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .batch_corpus_calculation import PensionCompareParamsBatch, get_corpus_info_batch
+from .corpus_info import ColumnarCorpusInfo, YearlyCorpusInfo
+
+
+class TestColumnarCorpusInfo(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.history = get_corpus_info(self.params)
+        self.columnar = get_corpus_info(self.params, columnar=True)
+
+    def test_rows_match_list_history(self):
+        self.assertIsInstance(self.columnar, ColumnarCorpusInfo)
+        self.assertEqual(len(self.columnar), len(self.history))
+        self.assertEqual(self.columnar.as_list_of_dict(), self.history.as_list_of_dict())
+        self.assertEqual(self.columnar[0], self.history[0])
+        self.assertEqual(self.columnar.last(), self.history.last())
+        self.assertIsInstance(self.columnar[-1].to_yearly_corpus_info(), YearlyCorpusInfo)
+        with self.assertRaises(IndexError):
+            self.columnar[len(self.history)]
+
+    def test_calculate_pension_writes_through_row_view(self):
+        self.history.calculate_pension(self.params)
+        self.columnar.calculate_pension(self.params)
+        self.assertEqual(self.columnar.last().as_dict(), self.history.last().as_dict())
+
+    def test_ups_lumpsum_is_exact(self):
+        # No withdrawal and an unreachable benchmark leave the lumpsum alone
+        # in ups_corpus; it must stay bit-identical to "/ 10"
+        profiles = [
+            replace(self.params, withdrawal_percentage=0, expected_benchmark_corpus_return=0.3,
+                    current_basic_pay=float(pay))
+            for pay in np.linspace(18000, 200000, 25)
+        ]
+        batch = PensionCompareParamsBatch.from_params(profiles)
+        batch_info = get_corpus_info_batch(batch)
+        batch_info.calculate_pension(batch)
+        for position, params in enumerate(profiles):
+            history = get_corpus_info(params)
+            final = history.last()
+            final_drawn_salary = final.next_year_basic_pay * (1 + final.next_year_da_rate)
+            expected = (params.years_to_retire + params.current_service) * 2 * final_drawn_salary / 10
+            history.calculate_pension(params)
+            with self.subTest(pay=params.current_basic_pay):
+                self.assertEqual(history.last().ups_corpus, expected)
+                self.assertEqual(batch_info.ups_corpus[position], expected)
+
+    def test_column_is_zero_copy(self):
+        column = np.asarray(self.columnar.column("nps_corpus"))
+        np.testing.assert_array_equal(
+            column, [row.nps_corpus for row in self.history.all()]
+        )
+        self.columnar.last().nps_corpus = 1.0
+        self.assertEqual(column[-1], 1.0)
+        with self.assertRaises(KeyError):
+            self.columnar.column("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .batch_corpus_calculation import PensionCompareParamsBatch, get_corpus_info_batch
+from .drawdown import DrawdownConfig, simulate_drawdown, simulate_drawdown_for
+
+
+class TestDrawdown(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.history = get_corpus_info(self.params)
+        self.history.calculate_pension(self.params)
+        self.config = DrawdownConfig(retirement_age=60, end_age=90)
+
+    def test_matches_year_by_year_projection(self):
+        result = simulate_drawdown_for(self.history, self.params, self.config)
+        final = self.history.last()
+        expense, nps_corpus, ups_corpus = final.annual_expense, final.nps_corpus, final.ups_corpus
+        return_rate = self.params.expected_rate_of_return_nps_corpus_after_retirement
+        for year in range(self.config.years):
+            expense *= 1 + self.params.expected_rate_of_inflation
+            ups_income = 12 * final.ups_pension * (1 + self.params.expected_ups_pension_growth) ** year
+            nps_corpus = nps_corpus * (1 + return_rate) + 12 * final.nps_annuity - expense
+            ups_corpus = ups_corpus * (1 + return_rate) + ups_income - expense
+            with self.subTest(year=year):
+                self.assertAlmostEqual(result.nps_corpus[0, year] / nps_corpus, 1, places=9)
+                self.assertAlmostEqual(result.ups_corpus[0, year] / ups_corpus, 1, places=9)
+        self.assertEqual(result.age[-1], 90)
+
+    def test_depletion_age(self):
+        # Expenses far above income exhaust both corpora
+        params = replace(self.params, current_annual_expense=5e5)
+        history = get_corpus_info(params)
+        history.calculate_pension(params)
+        result = simulate_drawdown_for(history, params, self.config)
+        depleted = np.argmax(result.nps_corpus[0] < 0)
+        self.assertGreater(depleted, 0)
+        self.assertEqual(result.nps_depletion_age[0], result.age[depleted])
+        self.assertGreater(result.nps_corpus[0, depleted - 1], 0)
+
+        # No expenses: the corpora never run out
+        rich_params = replace(self.params, current_annual_expense=0)
+        rich_history = get_corpus_info(rich_params)
+        rich_history.calculate_pension(rich_params)
+        self.assertEqual(rich_history.last().annual_expense, 0)
+        rich = simulate_drawdown_for(rich_history, rich_params, self.config)
+        self.assertTrue(np.isnan(rich.nps_depletion_age[0]))
+        self.assertTrue(np.isnan(rich.ups_depletion_age[0]))
+
+    def test_batch(self):
+        params = PensionCompareParamsBatch.from_params(
+            [self.params, replace(self.params, years_to_retire=20)]
+        )
+        corpus_info = get_corpus_info_batch(params)
+        corpus_info.calculate_pension(params)
+        result = simulate_drawdown(corpus_info, params, self.config)
+        self.assertEqual(result.nps_corpus.shape, (2, 30))
+        np.testing.assert_allclose(
+            result.ups_corpus[0], simulate_drawdown_for(self.history, self.params, self.config).ups_corpus[0]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
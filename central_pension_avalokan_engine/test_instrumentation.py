@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from . import instrumentation
+from .instrumentation import count, profiling, stage
+
+
+class TestInstrumentation(BaseTest):
+    def test_disabled_hooks_are_no_ops(self):
+        self.assertFalse(instrumentation.enabled())
+        with stage("ignored"):
+            count("ignored")
+        self.assertIs(stage("a"), stage("b"))
+
+    def test_records_simulation_stages_and_counters(self):
+        with profiling() as recorder:
+            history = get_corpus_info(self.params)
+            history.calculate_pension(self.params)
+            history.as_list_of_dict()
+        self.assertFalse(instrumentation.enabled())
+        self.assertEqual(recorder.counters["years_simulated"], self.params.years_to_retire)
+        self.assertEqual(recorder.counters["rows_built"], self.params.years_to_retire)
+        for name in ("simulate_years", "calculate_pension", "as_list_of_dict"):
+            self.assertEqual(recorder.stages[name].calls, 1)
+        self.assertIn("simulate_years", recorder.summary_table())
+
+    def test_counts_bytes_written(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "history.csv")
+            history = get_corpus_info(self.params)
+            with profiling() as recorder:
+                history.save_to_csv(path)
+            self.assertEqual(recorder.counters["bytes_written"], os.path.getsize(path))
+            self.assertEqual(recorder.counters["rows_written"], len(history))
+
+    def test_chrome_trace(self):
+        with profiling() as recorder:
+            with stage("outer"):
+                get_corpus_info(self.params, final_only=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.json")
+            recorder.write_chrome_trace(path)
+            with open(path, encoding="utf-8") as file:
+                events = json.load(file)["traceEvents"]
+        names = [event["name"] for event in events if event["ph"] == "X"]
+        self.assertEqual(names, ["final_corpus_closed_form", "outer"])
+
+    def test_nested_sessions_restore_previous(self):
+        with profiling(trace_events=False) as outer:
+            with profiling() as inner:
+                count("inner_only")
+            count("outer_only")
+        self.assertIn("inner_only", inner.counters)
+        self.assertNotIn("inner_only", outer.counters)
+        self.assertEqual(outer.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .quantile_sketch import QuantileSketch
+from .monte_carlo import (
+    MonteCarloConfig,
+    NormalDistribution,
+    UniformDistribution,
+    run_monte_carlo,
+)
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        values = np.random.default_rng(1).normal(0, 1000, 20000)
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        sketch.add(values)
+        for q in (0.05, 0.5, 0.95):
+            with self.subTest(q=q):
+                expected = np.quantile(values, q, method="lower")
+                self.assertLessEqual(
+                    abs(sketch.quantile(q) - expected), 0.011 * abs(expected) + 1
+                )
+
+    def test_merge_matches_single_sketch(self):
+        values = np.random.default_rng(2).uniform(-5, 50, 1000)
+        whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        whole.add(values)
+        first.add(values[:300])
+        second.add(values[300:])
+        first.merge(second)
+        self.assertEqual(first.count, whole.count)
+        self.assertEqual(first.quantiles([0.1, 0.5, 0.9]), whole.quantiles([0.1, 0.5, 0.9]))
+
+
+class TestMonteCarlo(BaseTest):
+    def test_deterministic_distributions_match_scalar_path(self):
+        config = MonteCarloConfig(
+            n_paths=50,
+            chunk_size=20,
+            distributions={"expected_nps_return": NormalDistribution(0.10, 0.0)},
+        )
+        result = run_monte_carlo(self.params, config)
+
+        history = get_corpus_info(self.params)
+        history.calculate_pension(self.params)
+        final = history.last()
+        for metric in ("nps_corpus", "ups_pension", "nps_annuity"):
+            with self.subTest(metric=metric):
+                self.assertEqual(result.sketches[metric].count, 50)
+                median = result.percentiles(metric, [50])[50]
+                self.assertAlmostEqual(median / getattr(final, metric), 1, delta=0.006)
+
+    def test_seeded_runs_are_reproducible_across_workers(self):
+        config = MonteCarloConfig(
+            n_paths=300,
+            chunk_size=100,
+            seed=42,
+            distributions={
+                "expected_nps_return": NormalDistribution(0.10, 0.05),
+                "expected_da_hike": UniformDistribution(0.03, 0.06),
+            },
+        )
+        single = run_monte_carlo(self.params, config).summary()
+        config.workers = 2
+        sharded = run_monte_carlo(self.params, config).summary()
+        self.assertEqual(single, sharded)
+        self.assertLess(single["nps_corpus"][5], single["nps_corpus"][95])
+
+    def test_rejects_unknown_field(self):
+        config = MonteCarloConfig(distributions={"withdrawal_percentage": NormalDistribution(0.5, 0.1)})
+        with self.assertRaises(ValueError):
+            run_monte_carlo(self.params, config)
+
+
+if __name__ == "__main__":
+    unittest.main()
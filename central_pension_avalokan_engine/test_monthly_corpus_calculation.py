@@ -0,0 +1,71 @@
+import math
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .batch_corpus_calculation import PensionCompareParamsBatch, get_corpus_info_batch
+from .monthly_corpus_calculation import (
+    ANNUAL_EQUIVALENT_CONFIG,
+    MonthlyConfig,
+    get_monthly_corpus_info,
+    simulate_monthly,
+)
+
+
+class TestMonthlyCorpusCalculation(BaseTest):
+    def test_annual_equivalent_config_matches_annual_model(self):
+        history = get_corpus_info(self.params)
+        monthly = get_monthly_corpus_info(self.params, ANNUAL_EQUIVALENT_CONFIG)
+        self.assertEqual(len(monthly), len(history))
+        for expected, actual in zip(history, monthly):
+            for name, value in expected.as_dict().items():
+                with self.subTest(year=expected.year, field=name):
+                    self.assertTrue(math.isclose(getattr(actual, name), value, rel_tol=1e-9))
+
+    def test_half_yearly_da_and_july_increment(self):
+        params = replace(self.params, expected_da_hike=0.04, expected_basic_pay_hike=0.03)
+        result = simulate_monthly(PensionCompareParamsBatch.from_params([params]), MonthlyConfig())
+        da_rate, basic_pay = result.da_rate[0], result.basic_pay[0]
+        self.assertEqual(da_rate[5], params.current_da_rate)
+        self.assertAlmostEqual(da_rate[6], params.current_da_rate + 0.02)
+        self.assertAlmostEqual(da_rate[12], params.current_da_rate + 0.04)
+        self.assertEqual(basic_pay[5], params.current_basic_pay)
+        self.assertAlmostEqual(basic_pay[6], params.current_basic_pay * 1.03)
+
+        # Corpus follows the month-by-month recurrence
+        corpus = params.current_total_nps_corpus
+        for month in range(12 * params.years_to_retire):
+            corpus = corpus * (1 + params.expected_nps_return / 12) + 0.24 * result.salary[0, month]
+        self.assertAlmostEqual(result.nps_corpus[0, -1] / corpus, 1, places=10)
+        self.assertEqual(result.corpus_info(0).last().nps_corpus, result.nps_corpus[0, -1])
+
+    def test_ragged_batch_matches_single_profiles(self):
+        profiles = [replace(self.params, years_to_retire=years) for years in (0, 2, 7)]
+        result = simulate_monthly(PensionCompareParamsBatch.from_params(profiles))
+        final = result.final_corpus_info()
+        self.assertEqual(final.year.tolist(), [0, 2, 7])
+        self.assertTrue(np.isnan(result.nps_corpus[1, 24:]).all())
+        for index, params in enumerate(profiles[1:], start=1):
+            expected = get_monthly_corpus_info(params).last()
+            self.assertEqual(final[index], expected)
+
+    def test_pension_on_monthly_roll_up(self):
+        batch = PensionCompareParamsBatch.from_params([self.params])
+        annual = get_corpus_info_batch(batch)
+        final = simulate_monthly(batch, ANNUAL_EQUIVALENT_CONFIG).final_corpus_info()
+        annual.calculate_pension(batch)
+        final.calculate_pension(batch)
+        self.assertAlmostEqual(final.ups_pension[0] / annual.ups_pension[0], 1, places=9)
+
+    def test_config_validation(self):
+        with self.assertRaises(ValueError):
+            MonthlyConfig(increment_month=13)
+        with self.assertRaises(ValueError):
+            MonthlyConfig(da_revision_months=())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+from unittest import mock
+
+import numpy as np
+
+from .test_base import BaseTest
+from . import corpus_growth_calculation, corpus_info
+from .core import get_corpus_info
+from .batch_corpus_calculation import PensionCompareParamsBatch
+from .pension_rules import DEFAULT_RULES, PensionRuleSet, compile_rules, load_rule_sets, score_rule_sets
+from .cli import main
+
+
+def final_values(params):
+    history = get_corpus_info(params)
+    history.calculate_pension(params)
+    return history.last()
+
+
+class TestPensionRules(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        rng = np.random.default_rng(11)
+        self.profiles = [
+            replace(
+                self.params,
+                current_service=int(service),
+                years_to_retire=int(years),
+                current_basic_pay=float(pay),
+                expected_benchmark_corpus_return=float(benchmark_return),
+            )
+            for service, years, pay, benchmark_return in zip(
+                rng.integers(0, 35, 40),
+                rng.integers(1, 30, 40),
+                rng.uniform(18000, 200000, 40),
+                rng.uniform(0.06, 0.12, 40),
+            )
+        ]
+        self.batch = PensionCompareParamsBatch.from_params(self.profiles)
+
+    def assert_matches_engine(self, values, index):
+        for position, params in enumerate(self.profiles):
+            expected = final_values(params)
+            for name in ("ups_pension", "nps_annuity", "ups_corpus", "nps_corpus"):
+                with self.subTest(profile=position, output=name):
+                    np.testing.assert_allclose(
+                        getattr(values, name)[index, position], getattr(expected, name), rtol=1e-10
+                    )
+
+    def test_default_rules_match_engine(self):
+        evaluation = compile_rules([DEFAULT_RULES]).evaluate(self.batch)
+        self.assertEqual(evaluation.ups_pension.shape, (1, len(self.profiles)))
+        self.assert_matches_engine(evaluation, 0)
+
+    def test_variants_match_patched_engine(self):
+        variant = PensionRuleSet(
+            name="variant",
+            nps_contrib_rate=0.2,
+            ups_contrib_rate=0.185,
+            benchmark_contrib_rate=0.185,
+            full_pension_service_months=240,
+            minimum_ups_pension=12000,
+            ups_lumpsum_divisor=20,
+        )
+        evaluation = compile_rules([DEFAULT_RULES, variant, DEFAULT_RULES]).evaluate(self.batch)
+        self.assertEqual(evaluation.nps_annuity.shape, (3, len(self.profiles)))
+        np.testing.assert_array_equal(evaluation.ups_pension[0], evaluation.ups_pension[2])
+
+        with mock.patch.multiple(corpus_growth_calculation, NPS_CONTRIB_RATE=0.2, UPS_CONTRIB_RATE=0.185), \
+                mock.patch.multiple(
+                    corpus_info,
+                    FULL_PENSION_SERVICE_MONTHS=240,
+                    MINIMUM_UPS_PENSION=12000,
+                    UPS_LUMPSUM_DIVISOR=20,
+                ):
+            self.assert_matches_engine(evaluation, 1)
+
+    def test_without_benchmark_reduction_pays_full_pension(self):
+        rule_sets = [DEFAULT_RULES, replace(DEFAULT_RULES, name="no_reduction", benchmark_reduction=False)]
+        evaluation = compile_rules(rule_sets).evaluate(self.batch)
+        self.assertTrue((evaluation.ups_pension[1] >= evaluation.ups_pension[0]).all())
+        self.assertTrue((evaluation.ups_pension[1] > evaluation.ups_pension[0]).any())
+        np.testing.assert_array_equal(evaluation.ups_corpus[1], evaluation.ups_corpus[0])
+
+    def test_load_rule_sets(self):
+        path = os.path.join(self.tmp_dir.name, "rules.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump([{}, {"name": "floor_12k", "minimum_ups_pension": 12000}], file)
+        self.assertEqual(
+            load_rule_sets(path), [DEFAULT_RULES, replace(DEFAULT_RULES, name="floor_12k", minimum_ups_pension=12000)]
+        )
+
+        for entries in ([], [{"minimum_pension": 1}], [{}, {}]):
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            with self.subTest(entries=entries), self.assertRaises(ValueError):
+                load_rule_sets(path)
+
+    def test_score_and_cli(self):
+        profiles_path = os.path.join(self.tmp_dir.name, "profiles.jsonl")
+        with open(profiles_path, "w", encoding="utf-8") as file:
+            for params in self.profiles + [replace(self.params, years_to_retire=0)]:
+                file.write(json.dumps(asdict(params)) + "\n")
+        rules_path = os.path.join(self.tmp_dir.name, "rules.json")
+        with open(rules_path, "w", encoding="utf-8") as file:
+            json.dump([{}, {"name": "floor_12k", "minimum_ups_pension": 12000}], file)
+
+        rows = score_rule_sets(profiles_path, load_rule_sets(rules_path), chunk_size=7)
+        evaluation = compile_rules([DEFAULT_RULES]).evaluate(self.batch)
+        self.assertEqual([row["rule_set"] for row in rows], ["current", "floor_12k"])
+        self.assertEqual(rows[0]["employees"], len(self.profiles))
+        self.assertAlmostEqual(rows[0]["total_ups_pension"] / evaluation.ups_pension.sum(), 1, places=12)
+        self.assertGreaterEqual(rows[1]["mean_ups_pension"], rows[0]["mean_ups_pension"])
+
+        output_path = os.path.join(self.tmp_dir.name, "scores.csv")
+        main(["rules", profiles_path, "--rules", rules_path, "--output", output_path])
+        with open(output_path, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("rule_set,employees,ups_wins_share"))
+
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            main(["rules", profiles_path, "--rules", rules_path])
+        self.assertEqual(stdout.getvalue().splitlines(), lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
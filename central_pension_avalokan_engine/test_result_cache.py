@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .result_cache import ResultCache, params_key, project
+
+
+class TestResultCache(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "results.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_is_canonical(self):
+        same = replace(self.params, current_basic_pay=50000.0, years_to_retire=5.0)
+        self.assertEqual(params_key(self.params), params_key(same))
+        self.assertNotEqual(params_key(self.params), params_key(self.params, history=True))
+        self.assertNotEqual(params_key(self.params), params_key(replace(self.params, expected_nps_return=0.11)))
+        self.assertNotEqual(params_key(self.params), params_key(self.params, engine_version="other"))
+
+    def test_key_keeps_fractional_years(self):
+        for name in ("current_service", "years_to_retire"):
+            value = getattr(self.params, name)
+            with self.subTest(field=name):
+                self.assertNotEqual(
+                    params_key(self.params), params_key(replace(self.params, **{name: value + 0.5}))
+                )
+
+    def test_key_rejects_non_numbers(self):
+        for value in ("5", None, True):
+            with self.subTest(value=value), self.assertRaises(TypeError):
+                params_key(replace(self.params, years_to_retire=value))
+
+    def test_project_matches_core(self):
+        history = get_corpus_info(self.params)
+        history.calculate_pension(self.params)
+        result = project(self.params, history=True)
+        self.assertAlmostEqual(result["summary"]["ups_pension"], history.last().ups_pension, places=6)
+        self.assertEqual(result["history"], history.as_list_of_dict())
+
+    def test_memory_lru(self):
+        cache = ResultCache(max_entries=1)
+        first = cache.project(self.params)
+        self.assertIs(cache.project(self.params), first)
+        cache.project(replace(self.params, years_to_retire=6))
+        cache.project(self.params)
+        self.assertEqual(cache.stats(), {"hits": 1, "disk_hits": 0, "misses": 3, "size": 1})
+
+    def test_disk_tier_survives_restart(self):
+        with ResultCache(path=self.path) as cache:
+            expected = cache.project(self.params, history=True)
+        with ResultCache(path=self.path) as cache:
+            self.assertEqual(cache.project(self.params, history=True), expected)
+            self.assertEqual(cache.disk_hits, 1)
+
+    def test_engine_version_invalidates_disk_tier(self):
+        with ResultCache(path=self.path, engine_version="old") as cache:
+            cache.put("key", {"stale": True})
+        with ResultCache(path=self.path, engine_version="new") as cache:
+            self.assertIsNone(cache.get("key"))
+        with ResultCache(path=self.path, engine_version="old") as cache:
+            self.assertIsNone(cache.get("key"))
+
+    def test_put_many_commits_once(self):
+        class CountingConnection:
+            def __init__(self, db):
+                self.db = db
+                self.commits = 0
+
+            def commit(self):
+                self.commits += 1
+                self.db.commit()
+
+            def __getattr__(self, name):
+                return getattr(self.db, name)
+
+        items = [(f"key{i}", {"value": i}) for i in range(50)]
+        with ResultCache(path=self.path) as cache:
+            cache._db = CountingConnection(cache._db)
+            cache.put_many(items)
+            self.assertEqual(cache._db.commits, 1)
+            cache._db = cache._db.db
+        with ResultCache(path=self.path) as cache:
+            self.assertEqual([cache.get(key) for key, _ in items], [value for _, value in items])
+            self.assertEqual(cache.disk_hits, len(items))
+
+
+if __name__ == "__main__":
+    unittest.main()
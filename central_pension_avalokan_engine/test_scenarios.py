@@ -0,0 +1,57 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .scenarios import compare_scenarios
+
+
+class TestScenarios(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.params = replace(self.params, years_to_retire=12)
+        self.scenarios = [
+            {},
+            {"expected_nps_return": 0.06},
+            {"expected_nps_return": 0.12, "expected_benchmark_corpus_return": 0.09},
+            {"withdrawal_percentage": 0.2, "expected_annuity_rate": 0.07},
+            {"current_total_nps_corpus": 0},
+        ]
+
+    def test_matches_scalar_runs(self):
+        comparison = compare_scenarios(self.params, self.scenarios)
+        self.assertEqual(comparison.nps_corpus.shape, (len(self.scenarios), 12))
+        np.testing.assert_array_equal(comparison.years, np.arange(1, 13))
+        for index, scenario in enumerate(self.scenarios):
+            params = replace(self.params, **scenario)
+            history = get_corpus_info(params)
+            with self.subTest(scenario=scenario):
+                for name in ("nps_corpus", "ups_corpus", "benchmark_corpus"):
+                    expected = [getattr(row, name) for row in history]
+                    np.testing.assert_allclose(getattr(comparison, name)[index], expected, rtol=1e-10)
+                history.calculate_pension(params)
+                final = history.last()
+                self.assertAlmostEqual(comparison.retirement.nps_annuity[index] / final.nps_annuity, 1, places=9)
+                self.assertAlmostEqual(comparison.retirement.ups_pension[index] / final.ups_pension, 1, places=9)
+                self.assertAlmostEqual(
+                    comparison.nps_minus_ups_pension[index], final.nps_annuity - final.ups_pension, places=4
+                )
+
+    def test_rejects_trajectory_and_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            compare_scenarios(self.params, [{"expected_basic_pay_hike": 0.1}])
+        with self.assertRaises(ValueError):
+            compare_scenarios(self.params, [{"salary": 1}])
+        with self.assertRaises(ValueError):
+            compare_scenarios(self.params, [])
+
+    def test_no_years_to_retire(self):
+        comparison = compare_scenarios(replace(self.params, years_to_retire=0), self.scenarios)
+        self.assertEqual(comparison.nps_corpus.shape, (len(self.scenarios), 0))
+        self.assertTrue(np.isnan(comparison.retirement.nps_annuity).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .batch_corpus_calculation import PensionCompareParamsBatch, get_corpus_info_batch
+from .sensitivity import SENSITIVITY_FIELDS, get_corpus_sensitivity, get_corpus_sensitivity_batch
+
+
+def final_values(params):
+    history = get_corpus_info(params)
+    history.calculate_pension(params)
+    return history.last()
+
+
+class TestSensitivity(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.params = replace(self.params, years_to_retire=12)
+
+    def assert_matches_finite_differences(
+        self, params, outputs=("ups_pension", "nps_annuity", "nps_corpus"), min_step=1e-9
+    ):
+        sensitivity = get_corpus_sensitivity(params)
+        for name in SENSITIVITY_FIELDS:
+            value = getattr(params, name)
+            step = 1 if name == "current_service" else max(1e-6 * abs(value), min_step)
+            up = final_values(replace(params, **{name: value + step}))
+            down = final_values(replace(params, **{name: value - step}))
+            for output in outputs:
+                expected = (getattr(up, output) - getattr(down, output)) / (2 * step)
+                with self.subTest(output=output, wrt=name):
+                    actual = sensitivity.derivative(output, name)[0]
+                    self.assertAlmostEqual(actual, expected, delta=1e-5 * max(abs(expected), 1))
+
+    def test_values_match_engine(self):
+        sensitivity = get_corpus_sensitivity(self.params)
+        expected = final_values(self.params)
+        for name, value in expected.as_dict().items():
+            self.assertAlmostEqual(getattr(sensitivity.info, name)[0] / (value or 1), 1 if value else 0, places=10)
+
+    def test_gradient_matches_finite_differences(self):
+        self.assert_matches_finite_differences(self.params)
+
+    def test_reduced_and_minimum_pension_branches(self):
+        # Benchmark beats the UPS corpus: the pension is scaled down
+        self.assert_matches_finite_differences(replace(self.params, expected_benchmark_corpus_return=0.2))
+        # Minimum pension: no dependency on pay
+        sensitivity = get_corpus_sensitivity(replace(self.params, current_basic_pay=5000, current_service=0))
+        self.assertEqual(sensitivity.derivative("ups_pension", "current_basic_pay")[0], 0)
+
+    def test_zero_return_is_smooth(self):
+        params = replace(self.params, expected_nps_return=0.0)
+        sensitivity = get_corpus_sensitivity(params)
+        self.assertTrue(np.isfinite(sensitivity.gradients["nps_corpus"]).all())
+        # The engine's quotient form cancels badly next to r = 0: step wider
+        self.assert_matches_finite_differences(params, outputs=("nps_annuity",), min_step=1e-4)
+
+    def test_batch_with_ragged_horizons(self):
+        profiles = [replace(self.params, years_to_retire=years, expected_nps_return=0.06 + 0.01 * years)
+                    for years in (0, 1, 7, 12)]
+        batch = PensionCompareParamsBatch.from_params(profiles)
+        sensitivity = get_corpus_sensitivity_batch(batch)
+        expected = get_corpus_info_batch(batch)
+        expected.calculate_pension(batch)
+        np.testing.assert_allclose(sensitivity.info.ups_pension, expected.ups_pension, rtol=1e-12)
+        np.testing.assert_array_equal(sensitivity.info.year, [0, 1, 7, 12])
+        self.assertTrue(np.isnan(sensitivity.gradients["nps_annuity"][0]).all())
+        for index, params in enumerate(profiles[1:], start=1):
+            single = get_corpus_sensitivity(params)
+            np.testing.assert_allclose(sensitivity.gradients["nps_annuity"][index], single.gradients["nps_annuity"][0])
+
+    def test_per_percent(self):
+        sensitivity = get_corpus_sensitivity(self.params)
+        self.assertEqual(
+            sensitivity.per_percent("nps_annuity", "expected_nps_return")[0],
+            0.01 * sensitivity.as_dict()["nps_annuity"]["expected_nps_return"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import unittest
+from dataclasses import asdict, replace
+from http import HTTPStatus
+from unittest import mock
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .server import RequestError, SimulationService, serve
+
+
+class TestSimulationService(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.service = SimulationService(cache_size=2)
+
+    def expected_summary(self, params):
+        history = get_corpus_info(params)
+        history.calculate_pension(params)
+        return history.last()
+
+    def test_simulate_matches_core(self):
+        result = self.service.simulate(self.params, history=True)
+        expected = self.expected_summary(self.params)
+        self.assertAlmostEqual(result["summary"]["nps_annuity"], expected.nps_annuity, places=6)
+        self.assertAlmostEqual(result["summary"]["ups_pension"], expected.ups_pension, places=6)
+        self.assertEqual(len(result["history"]), self.params.years_to_retire)
+        self.assertNotIn("history", self.service.simulate(self.params)["summary"])
+
+    def test_result_cache_is_lru(self):
+        other = replace(self.params, years_to_retire=6)
+        third = replace(self.params, years_to_retire=7)
+        self.service.simulate(self.params)
+        self.service.simulate(self.params)
+        self.assertEqual((self.service.cache.hits, self.service.cache.misses), (1, 1))
+        self.service.simulate(other)
+        self.service.simulate(third)
+        self.service.simulate(self.params)
+        self.assertEqual(self.service.cache.misses, 4)
+
+    def test_batch_matches_single(self):
+        profiles = [replace(self.params, years_to_retire=years) for years in (3, 5, 9)]
+        self.service.simulate(profiles[1])
+        results = self.service.simulate_batch(profiles)
+        for params, result in zip(profiles, results):
+            expected = self.expected_summary(params)
+            with self.subTest(years=params.years_to_retire):
+                self.assertEqual(result["summary"]["year"], params.years_to_retire)
+                self.assertAlmostEqual(result["summary"]["nps_annuity"] / expected.nps_annuity, 1, places=9)
+                self.assertAlmostEqual(result["summary"]["ups_pension"] / expected.ups_pension, 1, places=9)
+
+    def test_batch_stores_misses_together(self):
+        profiles = [replace(self.params, years_to_retire=years) for years in range(3, 8)]
+        self.service.simulate(profiles[0])
+        with mock.patch.object(self.service.cache, "put_many", wraps=self.service.cache.put_many) as put_many:
+            self.service.simulate_batch(profiles)
+        put_many.assert_called_once()
+        self.assertEqual(len(put_many.call_args[0][0]), len(profiles) - 1)
+
+    def test_handle_rejects_bad_requests(self):
+        with self.assertRaises(RequestError):
+            self.service.handle("POST", "/simulate", b"{not json")
+        with self.assertRaises(RequestError):
+            self.service.handle("POST", "/simulate", json.dumps({"bogus": 1}).encode())
+        with self.assertRaises(RequestError):
+            self.service.handle("POST", "/simulate", json.dumps({"years_to_retire": 5}).encode())
+        for history in ("false", 0, None):
+            with self.subTest(history=history), self.assertRaises(RequestError):
+                self.service.handle("POST", "/simulate", json.dumps(dict(asdict(self.params), history=history)).encode())
+        for override in (
+            {"current_basic_pay": "50000"},
+            {"expected_nps_return": float("nan")},
+            {"expected_nps_return": float("inf")},
+            {"years_to_retire": 2.5},
+            {"years_to_retire": 2000},
+        ):
+            profile = dict(asdict(self.params), **override)
+            with self.subTest(override=override), self.assertRaises(RequestError):
+                self.service.handle("POST", "/simulate", json.dumps(profile).encode())
+            with self.subTest(override=override, batch=True), self.assertRaises(RequestError):
+                self.service.handle("POST", "/simulate/batch", json.dumps({"profiles": [profile]}).encode())
+        status, _ = self.service.handle("GET", "/missing", b"")
+        self.assertEqual(status, HTTPStatus.NOT_FOUND)
+
+
+    def test_overflowing_projection_is_rejected(self):
+        profile = dict(asdict(self.params), years_to_retire=100, expected_nps_return=20)
+        # Single and batch paths, the latter also when served from the cache
+        for path, payload in (
+            ("/simulate/batch", {"profiles": [profile]}),
+            ("/simulate", profile),
+            ("/simulate/batch", {"profiles": [profile]}),
+        ):
+            with self.subTest(path=path), self.assertRaises(RequestError), np.errstate(over="ignore"):
+                self.service.handle("POST", path, json.dumps(payload).encode())
+
+
+class TestServer(BaseTest):
+    def test_round_trip(self):
+        async def exchange():
+            service = SimulationService()
+            server = await serve(service, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            async def request(method, path, payload=None):
+                body = json.dumps(payload).encode() if payload is not None else b""
+                writer.write(
+                    f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+            params = asdict(self.params)
+            responses = [
+                await request("POST", "/simulate", dict(params, history=True)),
+                await request("POST", "/simulate/batch", {"profiles": [params, params]}),
+                await request("POST", "/simulate", {"years_to_retire": "x"}),
+                await request("GET", "/stats"),
+            ]
+            writer.close()
+
+            # A malformed Content-Length is answered, then the connection closed
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /simulate HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+            await writer.drain()
+            responses.append(await reader.read())
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        single, batch, bad, stats, bad_length = asyncio.run(exchange())
+        self.assertEqual(single[0], 200)
+        self.assertEqual(len(single[1]["history"]), self.params.years_to_retire)
+        self.assertEqual(batch[0], 200)
+        self.assertEqual(len(batch[1]["results"]), 2)
+        self.assertEqual(bad[0], 400)
+        self.assertEqual(stats[0], 200)
+        self.assertEqual(stats[1]["requests"], 3)
+        self.assertIsNotNone(stats[1]["latency_ms"]["p99"])
+        self.assertTrue(bad_length.startswith(b"HTTP/1.1 400 "))
+        self.assertIn(b"Connection: close", bad_length)
+
+    def test_errors_are_answered_with_json(self):
+        async def exchange(service, payload):
+            server = await serve(service, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps(payload).encode()
+            writer.write(
+                f"POST /simulate HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            head, _, body = response.partition(b"\r\n\r\n")
+            return int(head.split()[1]), json.loads(body)
+
+        profile = asdict(self.params)
+        # OverflowError of the scalar engine
+        status, payload = asyncio.run(
+            exchange(SimulationService(), dict(profile, expected_nps_return=1e308))
+        )
+        self.assertEqual(status, 400)
+        self.assertIn("error", payload)
+
+        service = SimulationService()
+        with mock.patch("traceback.print_exc"):
+            with mock.patch.object(service, "handle", side_effect=RuntimeError("boom")):
+                self.assertEqual(
+                    asyncio.run(exchange(service, profile)), (500, {"error": "Internal server error"})
+                )
+            # Non-finite results are never encoded as invalid JSON
+            with mock.patch.object(service, "handle", return_value=(HTTPStatus.OK, {"value": float("inf")})):
+                self.assertEqual(asyncio.run(exchange(service, profile)), (500, {"error": "Result is not finite"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .corpus_info import CORPUS_FIELDS
+from .batch_corpus_calculation import PensionCompareParamsBatch
+from .salary_trajectory import simulate_history_columns
+from .snapshot import Snapshot, SnapshotWriter, diff_snapshots, write_cohort_snapshot
+from .cli import main
+
+
+class TestSnapshot(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.profiles = [
+            replace(self.params, years_to_retire=years, current_basic_pay=40000 + 1000 * years)
+            for years in (0, 1, 4, 9)
+        ]
+        self.ids = [f"E{index}" for index in range(len(self.profiles))]
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def write(self, name, profiles, ids=None, years=12):
+        params = PensionCompareParamsBatch.from_params(profiles)
+        with SnapshotWriter(self.path(name), years=years) as writer:
+            writer.write_columns(ids or self.ids, params, simulate_history_columns(params))
+        return self.path(name)
+
+    def test_history_columns_match_corpus_info(self):
+        params = PensionCompareParamsBatch.from_params(self.profiles)
+        columns = simulate_history_columns(params)
+        for index, profile in enumerate(self.profiles[1:], start=1):
+            history = get_corpus_info(profile)
+            history.calculate_pension(profile)
+            for name in CORPUS_FIELDS:
+                expected = [getattr(row, name) for row in history]
+                np.testing.assert_allclose(columns[name][index, :len(history)], expected, rtol=1e-10)
+                self.assertTrue(np.isnan(columns[name][index, len(history):]).all())
+
+    def test_round_trip_and_zero_copy_views(self):
+        path = self.write("run.snap", self.profiles)
+        with Snapshot(path) as snapshot:
+            self.assertEqual(len(snapshot), 4)
+            self.assertEqual(snapshot.years, 12)
+            index = snapshot.index_of("E3")
+            history = snapshot.corpus_info(index)
+            expected = get_corpus_info(self.profiles[3])
+            expected.calculate_pension(self.profiles[3])
+            self.assertEqual(len(history), 9)
+            for row, expected_row in zip(history, expected):
+                for name in CORPUS_FIELDS:
+                    self.assertAlmostEqual(getattr(row, name) / (getattr(expected_row, name) or 1),
+                                           1 if getattr(expected_row, name) else 0, places=10)
+            self.assertEqual(snapshot.params_of(index), self.profiles[3])
+            self.assertEqual(len(snapshot.corpus_info(0)), 0)
+
+            column = snapshot.column("nps_corpus")
+            self.assertFalse(column.flags.owndata)
+            self.assertFalse(column.flags.writeable)
+            self.assertEqual(column.shape, (4, 12))
+            self.assertTrue(np.shares_memory(column, snapshot.histories))
+            self.assertEqual(snapshot.history(index).shape, (len(CORPUS_FIELDS), 12))
+            expected_column = column.copy()
+        # Views outlive the snapshot; closing twice is harmless
+        snapshot.close()
+        np.testing.assert_array_equal(column, expected_column)
+
+    def test_write_history_and_errors(self):
+        history = get_corpus_info(self.profiles[2], columnar=True)
+        with SnapshotWriter(self.path("single.snap"), years=5) as writer:
+            writer.write_history("E2", self.profiles[2], history)
+            with self.assertRaises(ValueError):
+                writer.write_history("E2", self.profiles[2], history)
+            with self.assertRaises(ValueError):
+                writer.write_history("E3", self.profiles[3], get_corpus_info(self.profiles[3]))
+        with Snapshot(self.path("single.snap")) as snapshot:
+            self.assertEqual(snapshot.employee_ids, ["E2"])
+
+        with self.assertRaises(RuntimeError):
+            with SnapshotWriter(self.path("aborted.snap")):
+                raise RuntimeError("interrupted")
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["single.snap"])
+
+        with open(self.path("bad.snap"), "wb") as file:
+            file.write(b"not a snapshot" * 10)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path("bad.snap"))
+
+    def test_diff(self):
+        old = self.write("old.snap", self.profiles)
+        same = self.write("same.snap", self.profiles)
+        changed_profiles = list(self.profiles)
+        changed_profiles[2] = replace(changed_profiles[2], expected_nps_return=0.11)
+        reordered = self.write(
+            "new.snap", changed_profiles[::-1] + [self.params], self.ids[::-1] + ["E9"], years=10
+        )
+
+        with Snapshot(old) as old_snapshot, Snapshot(same) as same_snapshot:
+            self.assertTrue(diff_snapshots(old_snapshot, same_snapshot).identical)
+        with Snapshot(old) as old_snapshot, Snapshot(reordered) as new_snapshot:
+            diff = diff_snapshots(old_snapshot, new_snapshot, rtol=1e-12, chunk_size=2)
+        self.assertEqual(diff.compared, 4)
+        self.assertEqual(diff.added, ["E9"])
+        self.assertEqual(diff.changed_ids, ["E2"])
+        self.assertEqual((diff.changed_employees, diff.params_changed), (1, 1))
+        self.assertEqual(diff.fields["nps_corpus"].changed_values, 4)
+        self.assertEqual(diff.fields["salary"].changed_values, 0)
+        self.assertGreater(diff.fields["nps_corpus"].max_abs_diff, 0)
+        self.assertIn("E2", diff.report())
+
+        same_layout = self.write("changed.snap", changed_profiles)
+        with Snapshot(old) as old_snapshot, Snapshot(same_layout) as new_snapshot:
+            diff = diff_snapshots(old_snapshot, new_snapshot, chunk_size=2)
+        self.assertEqual((diff.changed_ids, diff.added), (["E2"], []))
+        self.assertEqual(diff.fields["nps_corpus"].changed_values, 4)
+
+    def test_cli_snapshot_and_diff(self):
+        jsonl_path = self.path("profiles.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as file:
+            for employee_id, params in zip(self.ids, self.profiles):
+                file.write(json.dumps(dict(asdict(params), employee_id=employee_id)) + "\n")
+        first, second = self.path("first.snap"), self.path("second.snap")
+        main(["snapshot", jsonl_path, "--output", first, "--chunk-size", "3"])
+        main(["snapshot", jsonl_path, "--output", second])
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            main(["snapshot-diff", first, second])
+        self.assertIn("0 changed", output.getvalue())
+
+        with Snapshot(first) as snapshot:
+            self.assertEqual(snapshot.employee_ids, self.ids)
+            self.assertEqual(snapshot.years, 45)
+        # Narrower snapshots of the same histories compare equal
+        self.assertEqual(write_cohort_snapshot(jsonl_path, second, years=9), 4)
+        with Snapshot(first) as old, Snapshot(second) as new:
+            self.assertTrue(diff_snapshots(old, new).identical)
+
+        with open(jsonl_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(dict(asdict(self.params), employee_id="E9")) + "\n")
+        write_cohort_snapshot(jsonl_path, second)
+        with self.assertRaises(SystemExit) as context, contextlib.redirect_stdout(io.StringIO()):
+            main(["snapshot-diff", first, second])
+        self.assertEqual(context.exception.code, 1)
+
+        # Unreadable snapshots exit with a status of their own
+        truncated = self.path("truncated.snap")
+        with open(second, "rb") as source, open(truncated, "wb") as target:
+            target.write(source.read()[:100])
+        for old, new in ((first, truncated), (jsonl_path, first)):
+            with self.subTest(old=old, new=new), self.assertRaises(SystemExit) as context, \
+                    contextlib.redirect_stderr(io.StringIO()) as errors:
+                main(["snapshot-diff", old, new])
+            self.assertEqual(context.exception.code, 2)
+            self.assertIn("Cannot compare snapshots", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+import numpy as np
+
+from .test_base import BaseTest
+from .core import get_corpus_info
+from .sweep import parse_axis, sweep
+from .cli import main
+
+
+class TestSweep(BaseTest):
+    def test_grid_matches_scalar_path(self):
+        axes = {
+            "expected_nps_return": [0.06, 0.1],
+            "years_to_retire": [3, 5, 0],
+            "withdrawal_percentage": [0.0, 0.6],
+            "expected_basic_pay_hike": [0.03],
+        }
+        result = sweep(self.params, axes)
+        self.assertEqual(result.shape, (2, 3, 2, 1))
+
+        for row in result.iter_rows():
+            params = replace(self.params, **{name: row[name] for name in axes})
+            history = get_corpus_info(params)
+            with self.subTest(**{name: row[name] for name in axes}):
+                if not history.last():
+                    self.assertTrue(np.isnan(row["nps_annuity"]))
+                    continue
+                history.calculate_pension(params)
+                final = history.last()
+                for name in ("nps_corpus", "ups_corpus", "nps_annuity", "ups_pension"):
+                    self.assertTrue(np.isclose(row[name], getattr(final, name), rtol=1e-9, atol=0), name)
+
+    def test_rejects_unknown_axis(self):
+        with self.assertRaises(ValueError):
+            sweep(self.params, {"salary": [1, 2]})
+
+    def test_rejects_fractional_integer_axis(self):
+        with self.assertRaises(ValueError):
+            sweep(self.params, {"years_to_retire": [1.5, 2]})
+        self.assertEqual(sweep(self.params, {"years_to_retire": [1.0, 2]}).shape, (2,))
+
+    def test_cli_rejects_bad_axes(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        ini_path = os.path.join(tmp_dir.name, "profile.ini")
+        with open(ini_path, "w", encoding="utf-8") as file:
+            file.write("[personal_data]\ncurrent_service = 5\n")
+        for axis in ("bogus=1,2", "years_to_retire=1.5,2"):
+            with self.subTest(axis=axis), mock.patch("sys.stderr", new_callable=io.StringIO) as stderr, \
+                    self.assertRaises(SystemExit) as context:
+                main(["sweep", ini_path, "--axis", axis])
+            self.assertEqual(context.exception.code, 2)
+            self.assertIn("--axis", stderr.getvalue())
+
+    def test_parse_axis(self):
+        self.assertEqual(parse_axis("0:0.6:0.2"), [0.0, 0.2, 0.4, 0.6])
+        self.assertEqual(parse_axis("0.1,0.2"), [0.1, 0.2])
+
+
+if __name__ == "__main__":
+    unittest.main()